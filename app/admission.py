@@ -0,0 +1,148 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+# root fields that hit the database hard enough to need admission control
+CONTROLLED_FIELDS = frozenset(
+    field.strip() for field in os.getenv(
+        "ADMISSION_CONTROLLED_FIELDS",
+        "allDoctors,searchDoctors,searchDepartments,doctorStats,doctorChanges"
+    ).split(",") if field.strip()
+)
+# token bucket per client and field: sustained requests per second and burst size
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "5"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+# per worker and field: operations executing at once, operations allowed to wait
+# for a slot, and how long they may wait before being shed
+CONCURRENCY_LIMIT = int(os.getenv("ADMISSION_CONCURRENCY_LIMIT", "4"))
+QUEUE_LIMIT = int(os.getenv("ADMISSION_QUEUE_LIMIT", "16"))
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+MAX_TRACKED_BUCKETS = 10000
+
+
+class Rejected(Exception):
+    """An operation shed by admission control; maps to HTTP 429"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate else 60.0
+
+
+class FieldGate:
+    """Bounded concurrency for one root field, with a bounded wait queue"""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for expensive GraphQL root fields.
+
+    Each (client, field) pair has a token bucket; each field has a concurrency gate.
+    An operation is rejected at once when a bucket is empty or a gate's queue is full,
+    and after QUEUE_TIMEOUT when it could not get a slot in time.
+    """
+
+    def __init__(self):
+        self.buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.gates: Dict[str, FieldGate] = {}
+        self.admitted: Dict[str, int] = defaultdict(int)
+        self.shed: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def check_rate(self, client: str, fields: Iterable[str]):
+        for field in fields:
+            key = (client, field)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+                if len(self.buckets) > MAX_TRACKED_BUCKETS:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            wait = bucket.take()
+            if wait:
+                self.shed[field]["rate_limited"] += 1
+                raise Rejected(f"Rate limit exceeded for {field}", wait)
+
+    def gate(self, field: str) -> FieldGate:
+        gate = self.gates.get(field)
+        if gate is None:
+            gate = self.gates[field] = FieldGate(CONCURRENCY_LIMIT)
+        return gate
+
+    async def enter(self, field: str) -> FieldGate:
+        gate = self.gate(field)
+        if gate.semaphore.locked():
+            if gate.queued >= QUEUE_LIMIT:
+                self.shed[field]["queue_full"] += 1
+                raise Rejected(f"Too many concurrent {field} requests", QUEUE_TIMEOUT)
+            gate.queued += 1
+            try:
+                await asyncio.wait_for(gate.semaphore.acquire(), QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.shed[field]["queue_timeout"] += 1
+                raise Rejected(f"Timed out waiting to run {field}", QUEUE_TIMEOUT)
+            finally:
+                gate.queued -= 1
+        else:
+            await gate.semaphore.acquire()
+        gate.active += 1
+        self.admitted[field] += 1
+        return gate
+
+    def leave(self, gate: FieldGate):
+        gate.active -= 1
+        gate.semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        fields = set(self.admitted) | set(self.shed) | set(self.gates)
+        stats = {}
+        for field in sorted(fields):
+            gate = self.gates.get(field)
+            shed = self.shed.get(field, {})
+            stats[field] = {
+                "admitted": self.admitted.get(field, 0),
+                "rate_limited": shed.get("rate_limited", 0),
+                "queue_full": shed.get("queue_full", 0),
+                "queue_timeout": shed.get("queue_timeout", 0),
+                "active": gate.active if gate else 0,
+                "queued": gate.queued if gate else 0,
+            }
+        return stats
+
+
+def controlled_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted(set(fields) & CONTROLLED_FIELDS))
+
+
+def client_key(request) -> Optional[str]:
+    """Address of the caller (uvicorn applies X-Forwarded-For from trusted proxies)"""
+    client = getattr(request, "client", None)
+    return client.host if client else None
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,98 @@
+import gzip
+import os
+from typing import List
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# streamed bodies are passed through untouched
+STREAMING_CONTENT_TYPES = (b"application/x-ndjson", b"text/event-stream")
+
+
+def accepted_encoding(accept_encoding: str) -> str:
+    """Pick br or gzip from an Accept-Encoding header, preferring br when available"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete response bodies with brotli or gzip.
+
+    Responses below COMPRESSION_MIN_SIZE, already encoded responses and streamed
+    responses (NDJSON, server-sent events) are sent as they are.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = accepted_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers") or [])
+                content_type = response_headers.get(b"content-type", b"")
+                if b"content-encoding" in response_headers or content_type.startswith(STREAMING_CONTENT_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self.send_complete(send, start_message, b"".join(body), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def send_complete(self, send, start_message, content: bytes, encoding: str):
+        headers = [
+            (name, value) for name, value in start_message.get("headers") or []
+            if name.lower() != b"content-length"
+        ]
+        if len(content) >= self.minimum_size:
+            if encoding == "br":
+                content = brotli.compress(content, quality=BROTLI_QUALITY)
+            else:
+                content = gzip.compress(content, compresslevel=GZIP_LEVEL)
+            headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"vary", b"Accept-Encoding"))
+        headers.append((b"content-length", str(len(content)).encode()))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
@@ -1,84 +1,409 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.pool
+import itertools
 import os
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Callable, Iterator, Sequence, Tuple, Type, TypeVar
+from app import identity_map, read_routing
+from app.row_mapping import column_names, object_factory
+from app.statement_cache import StatementCache, StatementCacheStats
+
+T = TypeVar("T")
+
+
+class Cursor(psycopg2.extensions.cursor):
+    """Cursor that reports every statement and its row count to the statement listeners"""
+    # set by Database.transaction(), whose statements are reported as writes
+    query_listeners: Sequence[Callable[[str, str, Optional[tuple]], None]] = ()
+
+    def execute(self, query, vars=None):
+        for listener in self.query_listeners:
+            listener("write", query, vars)
+        result = super().execute(query, vars)
+        for listener in self.connection.statement_listeners:
+            listener(query, max(self.rowcount, 0))
+        return result
+
+
+class Connection(psycopg2.extensions.connection):
+    """psycopg2 connection carrying its own prepared statement cache"""
+    statement_cache: Optional[StatementCache] = None
+    statement_generation: int = 0
+    statement_listeners: List[Callable[[str, int], None]] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = Cursor
+
+
+class ConnectionPool:
+    """ThreadedConnectionPool where callers wait for a free slot instead of failing when exhausted"""
+
+    def __init__(self, dsn: str, min_size: int, max_size: int, timeout: float):
+        self.dsn = dsn
+        self.timeout = timeout
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            min_size, max_size, dsn, connection_factory=Connection
+        )
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.waiting = 0
+        # replicas only: unix time until which this pool is skipped after a failure
+        self.ejected_until = 0.0
+
+    @property
+    def closed(self) -> bool:
+        return self.pool.closed
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        self.waiting += 1
+        try:
+            if not self.slots.acquire(timeout=self.timeout):
+                raise psycopg2.pool.PoolError(
+                    f"No database connection available within {self.timeout}s"
+                )
+        finally:
+            self.waiting -= 1
+        try:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+            finally:
+                self.pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self.slots.release()
+
+    def closeall(self):
+        if not self.pool.closed:
+            self.pool.closeall()
+
+    def stats(self) -> Dict[str, int]:
+        if self.pool.closed:
+            return {"size": 0, "in_use": 0, "idle": 0, "waiting": 0, "max_size": 0}
+        in_use = len(self.pool._used)
+        idle = len(self.pool._pool)
+        return {
+            "size": in_use + idle,
+            "in_use": in_use,
+            "idle": idle,
+            "waiting": self.waiting,
+            "max_size": self.pool.maxconn
+        }
+
 
 class Database:
     def __init__(self):
         self.connection = None
+        self.pool: Optional[ConnectionPool] = None
+        self.replicas: List[ConnectionPool] = []
         self.database_url = os.getenv(
             "DATABASE_URL",
             "postgresql://docuser:docpass@db:5432/docdb"
         )
-    
+        self.pool_min_size = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+        self.pool_max_size = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+        self.replica_urls = [
+            url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+        ]
+        self.replica_eject_seconds = float(os.getenv("DB_REPLICA_EJECT_SECONDS", "30"))
+        self.replica_max_lag = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+        self.replica_counter = itertools.count()
+        self.prepare_statements = os.getenv("DB_PREPARED_STATEMENTS", "1") == "1"
+        self.prepared_cache_size = int(os.getenv("DB_PREPARED_CACHE_SIZE", "128"))
+        self.prepare_threshold = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+        self.statement_stats = StatementCacheStats()
+        self.statement_generation = 0
+        # called with ("read" | "write", query, params) for every statement run through
+        # the execute_* helpers or a transaction() cursor; used by the index advisor
+        self.query_listeners: List[Callable[[str, str, Optional[tuple]], None]] = []
+        # called with (query, rows) after every statement on any connection, including
+        # those in transaction(); rows is the row count returned or affected. Used by the
+        # query budget tests
+        self.statement_listeners: List[Callable[[str, int], None]] = []
+        # seconds from borrowing a connection to returning it, most recent last
+        self.recent_timings: deque = deque(maxlen=int(os.getenv("DB_TIMING_WINDOW", "1000")))
+
+    def _setup_connection(self, conn: Connection) -> Connection:
+        # reads run without an explicit transaction so a connection is never left
+        # idle in transaction; multi-statement writes go through transaction()
+        conn.autocommit = True
+        conn.statement_listeners = self.statement_listeners
+        if self.prepare_statements and conn.statement_cache is None:
+            conn.statement_cache = StatementCache(
+                self.statement_stats, self.prepared_cache_size, self.prepare_threshold
+            )
+            conn.statement_generation = self.statement_generation
+        return conn
+
     def connect(self):
         """Establish database connection"""
         if not self.connection or self.connection.closed:
-            self.connection = psycopg2.connect(
-                self.database_url,
-                cursor_factory=RealDictCursor
+            self.connection = self._setup_connection(
+                psycopg2.connect(self.database_url, connection_factory=Connection)
             )
         return self.connection
-    
+
+    def open_pool(self, min_size: Optional[int] = None, max_size: Optional[int] = None):
+        """Create this process's connection pools; call after forking, once per worker"""
+        if self.pool is None or self.pool.closed:
+            max_size = max_size or self.pool_max_size
+            self.pool = ConnectionPool(
+                self.database_url, min_size or self.pool_min_size, max_size, self.pool_timeout
+            )
+            # replica connections are opened lazily so a replica that is down at
+            # startup is simply ejected on first use
+            self.replicas = [
+                ConnectionPool(url, 0, max_size, self.pool_timeout) for url in self.replica_urls
+            ]
+        return self.pool
+
     def close(self):
         """Close database connection"""
+        for pool in [self.pool, *self.replicas]:
+            if pool is not None:
+                pool.closeall()
+        self.pool = None
+        self.replicas = []
         if self.connection and not self.connection.closed:
             self.connection.close()
-    
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Execute SELECT query and return results"""
-        conn = self.connect()
-        cursor = conn.cursor()
+
+    @contextmanager
+    def acquire(self, pool: Optional[ConnectionPool] = None) -> Iterator[Connection]:
+        """
+        Borrow a connection from `pool` (default: the primary pool), or use the shared
+        connection when no pool is open
+        """
+        started = time.perf_counter()
+        pool = pool or self.pool
         try:
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
+            if pool is None:
+                conn = self.connect()
+                self._check_statement_generation(conn)
+                yield conn
+                return
+            with pool.connection() as conn:
+                self._setup_connection(conn)
+                self._check_statement_generation(conn)
+                yield conn
         finally:
-            cursor.close()
-    
-    def execute_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
-        """Execute SELECT query and return single result"""
-        conn = self.connect()
-        cursor = conn.cursor()
+            self.recent_timings.append(time.perf_counter() - started)
+
+    def choose_replica(self) -> Optional[ConnectionPool]:
+        """Next healthy replica, round robin, if the current request may read from one"""
+        if not self.replicas or not read_routing.replica_reads_allowed():
+            return None
+        now = time.time()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self.replica_counter) % len(self.replicas)]
+            if replica.ejected_until <= now and not replica.closed:
+                return replica
+        return None
+
+    def eject_replica(self, replica: ConnectionPool, reason: Any):
+        replica.ejected_until = time.time() + self.replica_eject_seconds
+        print(f"⚠️ Read replica ejected for {self.replica_eject_seconds}s: {reason}")
+
+    def check_replicas(self) -> List[Dict[str, Any]]:
+        """Probe every replica; eject unreachable or lagging ones and readmit recovered ones"""
+        report = []
+        for index, replica in enumerate(self.replicas):
+            status: Dict[str, Any] = {"replica": index}
+            try:
+                with self.acquire(replica) as conn, conn.cursor() as cursor:
+                    # NULL on a primary used as a stand-in, 0 when fully caught up
+                    cursor.execute("""
+                        SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                               ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                               END
+                    """)
+                    lag = float(cursor.fetchone()[0] or 0)
+                status.update(connected=True, lag_seconds=round(lag, 3))
+                if lag > self.replica_max_lag:
+                    self.eject_replica(replica, f"replication lag {lag:.1f}s")
+                else:
+                    replica.ejected_until = 0.0
+            except psycopg2.Error as e:
+                status.update(connected=False, error=str(e).strip() or type(e).__name__)
+                self.eject_replica(replica, e)
+            status.update(replica.stats(), ejected=replica.ejected_until > time.time())
+            report.append(status)
+        return report
+
+    def run_read(self, read: Callable[[Connection, Any], T]) -> T:
+        """
+        Run `read(conn, cursor)` on a replica when allowed, else on the primary.
+
+        A replica whose connection cannot be opened or drops mid-query is ejected for
+        DB_REPLICA_EJECT_SECONDS and the read is retried on the primary; errors on a
+        live connection (bad SQL, timeouts) are raised as usual.
+        """
+        replica = self.choose_replica()
+        if replica is not None:
+            conn = None
+            try:
+                with self.acquire(replica) as conn, conn.cursor() as cursor:
+                    return read(conn, cursor)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if conn is not None and not conn.closed:
+                    raise
+                self.eject_replica(replica, e)
+        with self.acquire() as conn, conn.cursor() as cursor:
+            return read(conn, cursor)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """Run several statements atomically; yields a cursor and commits on success"""
+        identity_map.invalidate()
+        read_routing.record_write()
+        with self.acquire() as conn:
+            conn.autocommit = False
+            cursor = conn.cursor()
+            cursor.query_listeners = self.query_listeners
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+                if not conn.closed:
+                    conn.autocommit = True
+
+    @staticmethod
+    def fetch_row(cursor) -> Optional[Dict[str, Any]]:
+        """Next row of a transaction() cursor as a dict, like execute_mutation returns"""
+        result = cursor.fetchone()
+        return dict(zip(column_names(cursor), result)) if result else None
+
+    def _check_statement_generation(self, conn: Connection):
+        cache = conn.statement_cache
+        if cache is None or conn.statement_generation == self.statement_generation:
+            return
+        cache.clear()
+        with conn.cursor() as cursor:
+            cursor.execute("DEALLOCATE ALL")
+        conn.statement_generation = self.statement_generation
+
+    def _execute_read(self, conn: Connection, cursor, query: str, params: tuple = None):
+        """Run a read query, through a prepared statement once it has been seen often enough"""
+        for listener in self.query_listeners:
+            listener("read", query, params)
+        cache = conn.statement_cache
+        if cache is None:
+            cursor.execute(query, params)
+            return
+        name = cache.lookup(query)
+        if name is None and cache.should_prepare(query):
+            try:
+                name = cache.prepare(cursor, query)
+            except psycopg2.Error:
+                cache.mark_unpreparable(query)
+        if name is None:
+            cursor.execute(query, params)
+            return
+        arguments = f" ({', '.join(['%s'] * len(params))})" if params else ""
         try:
+            cursor.execute(f"EXECUTE {name}{arguments}", params)
+        except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported):
+            # the statement is gone (server-side DISCARD) or its plan no longer
+            # matches the schema; start over and run this query unprepared
+            self.invalidate_statement_cache()
+            self._check_statement_generation(conn)
             cursor.execute(query, params)
+
+    def invalidate_statement_cache(self):
+        """Drop every prepared statement, e.g. after running migrations"""
+        # each connection notices the new generation the next time it is acquired
+        self.statement_generation += 1
+
+    def statement_cache_stats(self) -> Dict[str, float]:
+        return self.statement_stats.as_dict()
+
+    def pool_stats(self) -> Dict[str, int]:
+        if self.pool is None:
+            return {"size": 0, "in_use": 0, "idle": 0, "waiting": 0, "max_size": 0}
+        return self.pool.stats()
+
+    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Execute SELECT query and return results"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            columns = column_names(cursor)
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.run_read(read)
+
+    def execute_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        """Execute SELECT query and return single result"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
             result = cursor.fetchone()
-            return dict(result) if result else None
-        finally:
-            cursor.close()
-    
+            return dict(zip(column_names(cursor), result)) if result else None
+        return self.run_read(read)
+
+    def execute_as(self, cls: Type[T], query: str, params: tuple = None) -> List[T]:
+        """Execute SELECT query and build one `cls` per row directly from the result tuples"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            build = object_factory(cls, column_names(cursor))
+            return [build(row) for row in cursor.fetchall()]
+        return self.run_read(read)
+
+    def execute_one_as(self, cls: Type[T], query: str, params: tuple = None) -> Optional[T]:
+        """Execute SELECT query and build `cls` from the first row"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            result = cursor.fetchone()
+            return object_factory(cls, column_names(cursor))(result) if result else None
+        return self.run_read(read)
+
+    def execute_keyed_as(self, cls: Type[T], query: str, params: tuple = None) -> List[Tuple[Any, T]]:
+        """Execute SELECT query whose first column is a grouping key, building `cls` from the rest"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            build = object_factory(cls, column_names(cursor), 1)
+            return [(row[0], build(row)) for row in cursor.fetchall()]
+        return self.run_read(read)
+
+    def execute_rows(self, query: str, params: tuple = None) -> List[tuple]:
+        """Execute SELECT query and return the raw result tuples"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            return cursor.fetchall()
+        return self.run_read(read)
+
+    def execute_column(self, query: str, params: tuple = None) -> List[Any]:
+        """Execute SELECT query and return the first column of every row"""
+        def read(conn, cursor):
+            self._execute_read(conn, cursor, query, params)
+            return [row[0] for row in cursor.fetchall()]
+        return self.run_read(read)
+
     def execute_mutation(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
         """Execute INSERT/UPDATE/DELETE and return result"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            print(query, params, 'mutation --- params\n\n')
+        identity_map.invalidate()
+        read_routing.record_write()
+        for listener in self.query_listeners:
+            listener("write", query, params)
+        with self.acquire() as conn, conn.cursor() as cursor:
+            # single statements commit on their own (autocommit)
             cursor.execute(query, params)
-            conn.commit()
-            try:
-                result = cursor.fetchone()
-                return dict(result) if result else None
-            except:
+            if cursor.description is None:
                 return None
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-    
+            result = cursor.fetchone()
+            return dict(zip(column_names(cursor), result)) if result else None
+
     def execute_batch(self, query: str, params_list: List[tuple]) -> None:
         """Execute batch INSERT operations"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
+        with self.transaction() as cursor:
             for params in params_list:
                 cursor.execute(query, params)
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
 
 
-db = Database()
\ No newline at end of file
+db = Database()
@@ -0,0 +1,10 @@
+from typing import Any
+from strawberry.fastapi import GraphQLRouter
+from app.json_codec import dumps
+
+
+class FastJSONGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter that serializes responses with app.json_codec (orjson when installed)"""
+
+    def encode_json(self, response_data: Any) -> bytes:
+        return dumps(response_data)
@@ -0,0 +1,24 @@
+"""gunicorn settings for APP_ENV=production (python -m app.server)"""
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# import the app (and build the GraphQL schema) once in the master; workers fork
+# from it and open their own database pool in the lifespan handler
+preload_app = True
+
+# on SIGTERM workers stop accepting, finish in-flight requests for up to this long,
+# then run the lifespan shutdown (pool close)
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# recycle workers now and then to cap slow leaks, staggered so they don't restart together
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = "-"
+errorlog = "-"
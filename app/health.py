@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+from app.database import db
+
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# optional: report not ready while this share of the pool is checked out
+POOL_SATURATION_LIMIT = float(os.getenv("READINESS_POOL_SATURATION_LIMIT", "0")) or None
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class HealthMonitor:
+    """
+    Readiness state refreshed by a background task, so probes never touch the database.
+
+    Every HEALTH_CHECK_INTERVAL seconds the monitor pings the database through the
+    pool and snapshots pool usage, recent query latency and statement cache warmth;
+    /readyz only reads the last snapshot. Read replicas are probed on the same tick
+    and ejected from routing while unreachable or lagging; they never affect readiness.
+    """
+
+    def __init__(self):
+        self.warmed = False
+        self.snapshot: Dict[str, Any] = {"ready": False, "reason": "starting"}
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    async def refresh(self):
+        checked_at = time.time()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(db.execute_one, "SELECT 1 AS status"), HEALTH_CHECK_TIMEOUT
+            )
+            database = {"connected": True, "ping_ms": round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            database = {"connected": False, "error": str(e) or type(e).__name__}
+
+        try:
+            replicas = await asyncio.wait_for(
+                asyncio.to_thread(db.check_replicas), HEALTH_CHECK_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            replicas = [{"error": "replica check timed out"}]
+
+        pool = db.pool_stats()
+        saturation = pool["in_use"] / pool["max_size"] if pool["max_size"] else 0.0
+        timings = sorted(db.recent_timings)
+        latency = {
+            "samples": len(timings),
+            "p50_ms": round(percentile(timings, 0.5) * 1000, 2),
+            "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+            "max_ms": round(timings[-1] * 1000, 2) if timings else 0.0,
+        }
+
+        reason = None
+        if not self.warmed:
+            reason = "warming up"
+        elif not database["connected"]:
+            reason = "database unreachable"
+        elif POOL_SATURATION_LIMIT and saturation >= POOL_SATURATION_LIMIT:
+            reason = "connection pool saturated"
+
+        self.snapshot = {
+            "ready": reason is None,
+            "reason": reason,
+            "checked_at": checked_at,
+            "database": database,
+            "pool": {**pool, "saturation": round(saturation, 3)},
+            "replicas": replicas,
+            "query_latency": latency,
+            "cache": {"warmed": self.warmed, "statements": db.statement_cache_stats()},
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        snapshot = dict(self.snapshot)
+        checked_at = snapshot.get("checked_at")
+        if snapshot["ready"] and checked_at and time.time() - checked_at > HEALTH_CHECK_INTERVAL * 3:
+            # the background check itself is stuck
+            snapshot.update(ready=False, reason="health check stale")
+        return snapshot
+
+
+health_monitor = HealthMonitor()
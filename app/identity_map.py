@@ -0,0 +1,104 @@
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+MISSING = object()
+
+
+class IdentityMap:
+    """Rows and assembled objects already loaded during the current request, by (kind, key)"""
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, Hashable], Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.queries_saved = 0
+        self.invalidations = 0
+
+    def clear(self):
+        if self.entries:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "queriesSaved": self.queries_saved,
+            "invalidations": self.invalidations,
+            "entries": len(self.entries),
+        }
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar("identity_map", default=None)
+
+
+def begin_request_scope() -> Tuple[IdentityMap, Token]:
+    identity_map = IdentityMap()
+    return identity_map, _current.set(identity_map)
+
+
+def end_request_scope(token: Token):
+    _current.reset(token)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    return _current.get()
+
+
+def invalidate():
+    """Forget everything loaded so far in this request; called on every write"""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.clear()
+
+
+def load(kind: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Return the cached value for (kind, key) or call `loader` once and remember it"""
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader()
+    value = identity_map.entries.get((kind, key), MISSING)
+    if value is not MISSING:
+        identity_map.hits += 1
+        identity_map.queries_saved += 1
+        return value
+    identity_map.misses += 1
+    value = loader()
+    identity_map.entries[(kind, key)] = value
+    return value
+
+
+def load_many(
+    kind: str, keys: Iterable[Hashable], loader: Callable[[list], Dict[Hashable, Any]]
+) -> Dict[Hashable, Any]:
+    """Like load() for many keys; `loader` receives only the missing keys and returns a dict"""
+    keys = list(keys)
+    if not keys:
+        return {}
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader(keys)
+    found: Dict[Hashable, Any] = {}
+    missing = []
+    for key in keys:
+        value = identity_map.entries.get((kind, key), MISSING)
+        if value is MISSING:
+            missing.append(key)
+        else:
+            found[key] = value
+    identity_map.hits += len(found)
+    identity_map.misses += len(missing)
+    if not missing:
+        identity_map.queries_saved += 1
+        return found
+    loaded = loader(missing)
+    for key, value in loaded.items():
+        identity_map.entries[(kind, key)] = value
+    found.update(loaded)
+    return found
+
+
+def remember(kind: str, key: Hashable, value: Any):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.entries[(kind, key)] = value
@@ -0,0 +1,336 @@
+"""
+Index advisor: python -m app.index_advisor [--seed 5000] [--min-rows 1000]
+
+Runs a representative GraphQL workload in every doctor assembly mode plus a write
+workload on throwaway doctors, captures each distinct statement the services issue
+(with the archive and cleanup batch statements, which are captured without being run),
+runs it again under EXPLAIN (ANALYZE, BUFFERS) in a transaction that is rolled back,
+and reports timings, buffer usage and the indexes used.
+Sequential scans of tables with at least --min-rows rows whose filter keeps at most
+--max-selectivity of the rows it reads are flagged and make the command exit with
+status 1; a filter that keeps most rows would not be served better by an index.
+
+--seed inserts that many synthetic doctors (with child rows) first; point
+DATABASE_URL at a scratch database when using it.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+import psycopg2.errors
+from app.database import db
+from app.services.archive_services import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_QUERY, ARCHIVE_BATCH_SIZE
+from app.services.cleanup_services import (
+    ABANDONED_AFTER_DAYS, ABANDONED_MAX_STEP, CLEANUP_BATCH_SIZE, DELETE_BATCH_QUERY,
+)
+from app.services.doctor_services import AssemblyMode
+
+CITIES = ["Kochi", "Chennai", "Mumbai", "Delhi", "Pune", "Kolkata", "Jaipur", "Lucknow"]
+# statements EXPLAIN accepts; transactions also run SET LOCAL and the like
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+ADDRESS = {"country": "India", "state": "Kerala", "city": "Kochi", "pincode": "682001"}
+SETTINGS = {
+    "consultationCharge": 500, "followUpCharge": 250, "followUpPeriodDays": 7,
+    "advanceBookingDays": 30, "avgDurationMinutes": 15,
+}
+SCHEDULES = [
+    {"dayOfWeek": day, "startTime": "09:00", "endTime": "17:00", "isAvailable": True}
+    for day in range(1, 6)
+]
+
+
+def seed(count: int):
+    tag = uuid.uuid4().hex[:8]
+    with db.transaction() as cursor:
+        cursor.execute("""
+            WITH new AS (
+                INSERT INTO doctors (register_no, email, name, bio, onboarding_status, current_step, created_at)
+                SELECT 'ADV-' || %(tag)s || '-' || n, 'adv-' || %(tag)s || '-' || n || '@example.com',
+                       'Doctor ' || n, 'Synthetic doctor ' || n || ' for the index advisor',
+                       (ARRAY['in_progress', 'completed', 'pending_review'])[1 + n %% 3],
+                       1 + n %% 8, CURRENT_TIMESTAMP - make_interval(mins => n)
+                FROM generate_series(1, %(count)s) n
+                RETURNING id
+            )
+            SELECT array_agg(id) FROM new
+        """, {"tag": tag, "count": count})
+        ids = cursor.fetchone()[0]
+        statements = [
+            """INSERT INTO doctor_mobile_numbers (doctor_id, mobile_number)
+               SELECT id, '9' || lpad(id::text, 9, '0') FROM unnest(%(ids)s::int[]) id""",
+            """INSERT INTO qualifications (doctor_id, qualification)
+               SELECT id, q FROM unnest(%(ids)s::int[]) id, unnest(ARRAY['MBBS', 'MD']) q""",
+            """INSERT INTO specializations (doctor_id, specialization)
+               SELECT id, (ARRAY['Cardiology', 'Surgery', 'Pediatrics', 'Neurology'])[1 + id %% 4]
+               FROM unnest(%(ids)s::int[]) id""",
+            """INSERT INTO doctor_departments (doctor_id, department_id)
+               SELECT id, deps[1 + id %% cardinality(deps)]
+               FROM unnest(%(ids)s::int[]) id, (SELECT array_agg(id ORDER BY id) AS deps FROM departments) dep
+               WHERE cardinality(deps) > 0
+               ON CONFLICT DO NOTHING""",
+            """INSERT INTO addresses (doctor_id, country, state, city, pincode)
+               SELECT id, 'India', 'State', (%(cities)s::text[])[1 + id %% cardinality(%(cities)s::text[])],
+                      lpad((id %% 999999)::text, 6, '0')
+               FROM unnest(%(ids)s::int[]) id""",
+            """INSERT INTO appointment_settings (doctor_id, consultation_charge, follow_up_charge,
+                   follow_up_period_days, advance_booking_days, avg_duration_minutes)
+               SELECT id, 500, 250, 7, 30, 15 FROM unnest(%(ids)s::int[]) id""",
+            """INSERT INTO schedules (doctor_id, day_of_week, start_time, end_time, is_available)
+               SELECT id, day, '09:00', '17:00', TRUE
+               FROM unnest(%(ids)s::int[]) id, generate_series(1, 5) day""",
+        ]
+        for statement in statements:
+            cursor.execute(statement, {"ids": ids, "cities": CITIES})
+    db.execute_mutation("ANALYZE")
+    print(f"🌱 Seeded {count} doctors (register_no ADV-{tag}-*)")
+
+
+def workload() -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    One call per read root field. Lookups target a single sample doctor and searches use
+    its name and `first:` pages, so a sequential scan shows up as selective when an index
+    is missing rather than hiding behind queries that want most of the table anyway.
+    """
+    sample = db.execute_one("""
+        SELECT d.id, d.email, d.name, dd.department_id, a.city
+        FROM doctors d
+        LEFT JOIN doctor_departments dd ON dd.doctor_id = d.id
+        LEFT JOIN addresses a ON a.doctor_id = d.id
+        ORDER BY d.id DESC LIMIT 1
+    """) or {"id": 0, "email": "nobody@example.com", "name": "nobody", "department_id": 1, "city": "Kochi"}
+    doctor_fields = """id name email mobileNumbers qualifications specializations profileImage
+        departments { id name } address { city } appointmentSettings { consultationCharge }
+        schedules { dayOfWeek startTime }"""
+    filters = {"departmentId": sample["department_id"] or 1, "city": sample["city"] or "Kochi"}
+    return [
+        ("{ departments { id name } }", {}),
+        ('query($q: String!) { searchDepartments(search: $q) { id } }', {"q": "card"}),
+        (f"{{ allDoctors {{ {doctor_fields} }} }}", {}),
+        (f'query($s: String) {{ allDoctors(status: $s) {{ {doctor_fields} }} }}', {"s": "in_progress"}),
+        (f"query($id: Int!) {{ doctor(id: $id) {{ {doctor_fields} }} }}", {"id": sample["id"]}),
+        ("query($e: String) { checkRegistration(email: $e) { id } }", {"e": sample["email"]}),
+        ("query($id: Int!) { onboardingMetadata(doctorId: $id) { completedSteps } }", {"id": sample["id"]}),
+        (f'query($t: String) {{ searchDoctors(text: $t, first: 20) {{ totalCount doctors {{ {doctor_fields} }} }} }}',
+         {"t": sample["name"] or "nobody"}),
+        (f'query($f: DoctorFilterInput) {{ searchDoctors(filters: $f, first: 20) {{ totalCount doctors {{ {doctor_fields} }} }} }}',
+         {"f": filters}),
+        ('query($f: DoctorFilterInput) { doctorStats(filters: $f) { total byStatus { value count } } }',
+         {"f": filters}),
+        ("{ doctorStats { total byCity { value count } byStep { value count } } }", {}),
+        (f"{{ doctorChanges(limit: 20) {{ cursor doctors {{ {doctor_fields} }} deletedIds }} }}", {}),
+    ]
+
+
+def write_workload(schema, doctor_ids: List[int]):
+    """
+    Onboard one throwaway doctor step by step (the per-step upserts) and submit another in
+    one go, adding their ids to `doctor_ids` for remove_doctors(). Neither is completed,
+    as completing queues emails.
+    """
+    tag = uuid.uuid4().hex[:8]
+    department_id = db.execute_one("SELECT id FROM departments ORDER BY id LIMIT 1")
+    department_ids = [department_id["id"]] if department_id else []
+
+    def run(document: str, variables: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        result = asyncio.run(schema.execute(document, variable_values=variables))
+        if result.errors:
+            print(f"⚠️ {' '.join(document.split())[:60]}: {result.errors[0].message}")
+            return None
+        return result.data
+
+    data = run(
+        "mutation($r: String!, $e: String!) { startOnboarding(registerNo: $r, email: $e, mobileNumbers: [\"9000000000\"]) { id } }",
+        {"r": f"ADV-WRITE-{tag}-1", "e": f"adv-write-{tag}-1@example.com"}
+    )
+    if data:
+        doctor_id = int(data["startOnboarding"]["id"])
+        doctor_ids.append(doctor_id)
+        steps = [
+            ('mutation($id: Int!) { updateDoctorName(doctorId: $id, name: "Dr. Advisor") { id } }', {}),
+            ("""mutation($id: Int!) { updateQualificationsAndBio(doctorId: $id, qualifications: ["MBBS", "MD"],
+                specializations: ["Cardiology"], bio: "Index advisor doctor") { id } }""", {}),
+            ("mutation($id: Int!, $a: AddressInput!) { updateAddress(doctorId: $id, addressInput: $a) { id } }",
+             {"a": ADDRESS}),
+            ("mutation($id: Int!, $s: AppointmentSettingsInput!) { updateAppointmentSettings(doctorId: $id, settings: $s) { id } }",
+             {"s": SETTINGS}),
+            ("mutation($id: Int!, $s: [ScheduleInput!]!) { updateSchedule(doctorId: $id, schedules: $s) { id } }",
+             {"s": SCHEDULES}),
+            ("mutation($id: Int!, $d: [Int!]!) { addDepartments(doctorId: $id, departmentIds: $d) { id } }",
+             {"d": department_ids}),
+            ('mutation($id: Int!) { updateProfileImage(doctorId: $id, imageUrl: "https://cdn.example.com/advisor.jpg") { id } }', {}),
+        ]
+        for document, variables in steps:
+            run(document, {"id": doctor_id, **variables})
+    data = run("mutation($i: OnboardingSubmissionInput!) { submitOnboarding(input: $i) { id } }", {"i": {
+        "registerNo": f"ADV-WRITE-{tag}-2", "email": f"adv-write-{tag}-2@example.com",
+        "mobileNumbers": ["9000000001"], "name": "Dr. Submitted", "qualifications": ["MBBS"],
+        "specializations": ["Surgery"], "address": ADDRESS, "appointmentSettings": SETTINGS,
+        "schedules": SCHEDULES, "departmentIds": department_ids, "complete": False,
+    }})
+    if data:
+        doctor_ids.append(int(data["submitOnboarding"]["id"]))
+
+
+def remove_doctors(doctor_ids: List[int]):
+    """Delete the write workload's doctors and the jobs they queued"""
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM jobs WHERE payload->>'doctor_id' = ANY(%s)", ([str(i) for i in doctor_ids],))
+        cursor.execute("DELETE FROM doctors WHERE id = ANY(%s)", (doctor_ids,))
+
+
+def capture_queries(doctor_ids: List[int]) -> Dict[str, Tuple[str, Optional[tuple]]]:
+    """
+    Run the read workload in every assembly mode and the write workload once (its doctors
+    go into `doctor_ids`); returns each distinct statement with its kind ("read" or
+    "write") and params
+    """
+    from app.schema import get_schema
+
+    schema = get_schema()
+    captured: Dict[str, Tuple[str, Optional[tuple]]] = {}
+
+    def listener(kind: str, query: str, params: Optional[tuple]):
+        if query.lstrip().split(None, 1)[0].upper() in EXPLAINABLE:
+            captured.setdefault(query, (kind, params))
+
+    configured_mode = os.environ.get("DOCTOR_ASSEMBLY_MODE")
+    db.query_listeners.append(listener)
+    try:
+        for mode in AssemblyMode:
+            os.environ["DOCTOR_ASSEMBLY_MODE"] = mode.value
+            for document, variables in workload():
+                result = asyncio.run(schema.execute(document, variable_values=variables))
+                if result.errors:
+                    print(f"⚠️ {' '.join(document.split())[:60]}: {result.errors[0].message}")
+        write_workload(schema, doctor_ids)
+    finally:
+        db.query_listeners.remove(listener)
+        if configured_mode is None:
+            os.environ.pop("DOCTOR_ASSEMBLY_MODE", None)
+        else:
+            os.environ["DOCTOR_ASSEMBLY_MODE"] = configured_mode
+    # running these would archive or delete real doctors; EXPLAIN ANALYZE rolls them back
+    captured.setdefault(ARCHIVE_BATCH_QUERY, ("write", (ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE)))
+    captured.setdefault(
+        DELETE_BATCH_QUERY, ("write", (ABANDONED_AFTER_DAYS, ABANDONED_MAX_STEP, CLEANUP_BATCH_SIZE))
+    )
+    return captured
+
+
+def walk(plan: Dict[str, Any]):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def kept_fraction(node: Dict[str, Any]) -> float:
+    """Share of the rows a filtered scan read that passed its filter"""
+    kept = node.get("Actual Rows", 0)
+    read = kept + node.get("Rows Removed by Filter", 0)
+    return kept / read if read else 1.0
+
+
+def explain(query: str, params: Optional[tuple], table_rows: Dict[str, float], min_rows: int,
+            max_selectivity: float, doctor_ids: List[int] = ()) -> Dict[str, Any]:
+    statement = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"
+    # ANALYZE executes the statement; rolling back undoes what a write did
+    with db.acquire() as conn:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SAVEPOINT explain")
+                try:
+                    cursor.execute(statement, params)
+                except psycopg2.errors.UniqueViolation:
+                    # the statement created one of the write workload's doctors, which
+                    # still hold its keys; plan it with them removed
+                    cursor.execute("ROLLBACK TO SAVEPOINT explain")
+                    cursor.execute("DELETE FROM doctors WHERE id = ANY(%s)", (list(doctor_ids),))
+                    cursor.execute(statement, params)
+                document = cursor.fetchone()[0][0]
+        finally:
+            conn.rollback()
+            conn.autocommit = True
+    plan = document["Plan"]
+    nodes = list(walk(plan))
+    large_scans = [
+        node for node in nodes
+        if node["Node Type"] == "Seq Scan" and node.get("Actual Loops", 0)
+        and table_rows.get(node["Relation Name"], 0) >= min_rows
+    ]
+    # a scan without a filter reads the whole table because the query wants every row,
+    # and one whose filter keeps most rows is cheaper than an index; only selective
+    # filtered scans can be replaced by an index
+    filtered = [node for node in large_scans if "Filter" in node]
+    seq_scans = sorted({
+        node["Relation Name"] for node in filtered if kept_fraction(node) <= max_selectivity
+    })
+    unselective = sorted({
+        f"{node['Relation Name']} ({kept_fraction(node):.0%} kept)"
+        for node in filtered if kept_fraction(node) > max_selectivity
+    })
+    full_reads = sorted({node["Relation Name"] for node in large_scans if "Filter" not in node})
+    return {
+        "time_ms": document["Execution Time"],
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+        "seq_scans": seq_scans,
+        "unselective": unselective,
+        "full_reads": full_reads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every service query and flag sequential scans")
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic doctors first")
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="only flag sequential scans of tables with at least this many rows")
+    parser.add_argument("--max-selectivity", type=float, default=0.1,
+                        help="only flag scans whose filter keeps at most this fraction of the rows read")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    doctor_ids: List[int] = []
+    try:
+        queries = capture_queries(doctor_ids)
+        table_rows = {
+            row["relname"]: row["reltuples"] for row in db.execute_query(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'm') AND relnamespace = 'public'::regnamespace"
+            )
+        }
+        reports = [
+            (query, kind, explain(query, params, table_rows, args.min_rows, args.max_selectivity, doctor_ids))
+            for query, (kind, params) in sorted(queries.items(), key=lambda item: (item[1][0], item[0]))
+        ]
+    finally:
+        if doctor_ids:
+            remove_doctors(doctor_ids)
+
+    flagged = 0
+    for query, kind, report in reports:
+        flagged += bool(report["seq_scans"])
+        marker = "SEQ" if report["seq_scans"] else "ok "
+        summary = " ".join(query.split())[:104]
+        print(f"[{marker}] {kind:<5} {report['time_ms']:8.2f} ms  hit={report['shared_hit']:<6} "
+              f"read={report['shared_read']:<6} {summary}")
+        if report["seq_scans"]:
+            print(f"        sequential scan of {', '.join(report['seq_scans'])}")
+        if report["unselective"]:
+            print(f"        unselective filter on {', '.join(report['unselective'])} (an index would not help)")
+        if report["full_reads"]:
+            print(f"        full read of {', '.join(report['full_reads'])} (no filter to index)")
+        if report["indexes"]:
+            print(f"        indexes: {', '.join(report['indexes'])}")
+    writes = sum(kind == "write" for kind, _ in queries.values())
+    print(f"\n{len(queries)} queries ({writes} writes), {flagged} with selective sequential scans "
+          f"of tables over {args.min_rows} rows")
+    db.close()
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
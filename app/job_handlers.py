@@ -0,0 +1,85 @@
+"""Handlers for the background jobs enqueued by the onboarding mutations (see app.jobs)"""
+import os
+import smtplib
+import urllib.error
+import urllib.parse
+import urllib.request
+from email.message import EmailMessage
+from typing import Any, Dict
+from app.database import db
+from app.jobs import handler, heartbeat
+from app.services.archive_services import ArchiveService
+from app.services.cleanup_services import CleanupService, print_cleanup_report
+from app.services.stats_services import StatsService
+
+# batches per job; both jobs heartbeat between batches to keep their lock
+ARCHIVE_MAX_BATCHES = int(os.getenv("ARCHIVE_MAX_BATCHES", "100"))
+CLEANUP_MAX_BATCHES = int(os.getenv("CLEANUP_MAX_BATCHES", "100"))
+# registry lookup, e.g. https://registry.example.org/doctors/{register_no}; a 404 means
+# the registration number is unknown and the doctor is sent to manual review
+REGISTRATION_VERIFY_URL = os.getenv("REGISTRATION_VERIFY_URL")
+REGISTRATION_VERIFY_TIMEOUT = float(os.getenv("REGISTRATION_VERIFY_TIMEOUT", "10"))
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+EMAIL_FROM = os.getenv("EMAIL_FROM", "onboarding@localhost")
+
+
+def get_doctor(doctor_id: int) -> Dict[str, Any]:
+    doctor = db.execute_one("SELECT * FROM doctors WHERE id = %s", (doctor_id,))
+    if not doctor:
+        raise ValueError(f"Doctor {doctor_id} not found")
+    return doctor
+
+
+@handler("onboarding.verify_registration")
+def verify_registration(payload: Dict[str, Any]):
+    if not REGISTRATION_VERIFY_URL:
+        return
+    doctor = get_doctor(payload['doctor_id'])
+    url = REGISTRATION_VERIFY_URL.format(register_no=urllib.parse.quote(doctor['register_no'] or ""))
+    try:
+        with urllib.request.urlopen(url, timeout=REGISTRATION_VERIFY_TIMEOUT):
+            return
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            raise
+    db.execute_mutation(
+        "UPDATE doctors SET onboarding_status = 'pending_review' WHERE id = %s AND onboarding_status = 'completed'",
+        (doctor['id'],)
+    )
+
+
+@handler("onboarding.send_confirmation")
+def send_confirmation(payload: Dict[str, Any]):
+    doctor = get_doctor(payload['doctor_id'])
+    if not doctor['email']:
+        return
+    message = EmailMessage()
+    message["From"] = EMAIL_FROM
+    message["To"] = doctor['email']
+    message["Subject"] = "Your onboarding is complete"
+    message.set_content(
+        f"Hello {doctor['name'] or 'Doctor'},\n\n"
+        "Thank you for completing your onboarding. Your profile is now being reviewed.\n"
+    )
+    if not SMTP_HOST:
+        print(f"📧 (SMTP_HOST not set) would email {doctor['email']}: {message['Subject']}")
+        return
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as smtp:
+        smtp.send_message(message)
+
+
+@handler("doctor_stats.refresh")
+def refresh_doctor_stats(payload: Dict[str, Any]):
+    StatsService.refresh_materialized_view()
+
+
+@handler("doctors.archive_completed")
+def archive_completed(payload: Dict[str, Any]):
+    moved = ArchiveService.archive_completed(max_batches=ARCHIVE_MAX_BATCHES, heartbeat=heartbeat)
+    print(f"🗄️ Archived {moved} completed doctors")
+
+
+@handler("doctors.cleanup_abandoned")
+def cleanup_abandoned(payload: Dict[str, Any]):
+    print_cleanup_report(CleanupService.delete_abandoned(max_batches=CLEANUP_MAX_BATCHES, heartbeat=heartbeat))
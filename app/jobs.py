@@ -0,0 +1,163 @@
+"""
+Postgres-backed job queue.
+
+Mutations enqueue follow-up work with enqueue(), passing their transaction's cursor so
+the job commits (and wakes a worker) together with the change it follows; worker processes (python -m app.worker)
+claim due jobs with FOR UPDATE SKIP LOCKED, run the handler registered for the job's
+kind and delete the job. Long handlers call heartbeat() between batches so the lock
+does not expire under them. Failed jobs are retried with exponential backoff and moved to
+dead_jobs after max_attempts.
+"""
+import os
+import random
+import traceback
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+import psycopg2.errors
+from app.database import db
+from app.json_codec import dumps
+
+JOB_CHANNEL = "job_queue"
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "10"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+# a running job whose worker has been silent this long is handed to another worker
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "300"))
+
+# the job run_job is running in this thread, for heartbeat()
+current_job: ContextVar[Optional[Dict[str, Any]]] = ContextVar("current_job", default=None)
+
+Handler = Callable[[Dict[str, Any]], None]
+HANDLERS: Dict[str, Handler] = {}
+
+
+class JobLost(Exception):
+    """The running job's lock expired and another worker has claimed it"""
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of `kind`"""
+    def register(function: Handler) -> Handler:
+        HANDLERS[kind] = function
+        return function
+    return register
+
+
+def enqueue(
+    kind: str, payload: Optional[Dict[str, Any]] = None, delay: float = 0,
+    dedupe_key: Optional[str] = None, max_attempts: Optional[int] = None, cursor=None
+) -> Optional[int]:
+    """
+    Queue a job and wake a worker; returns its id, or None when a job with the same
+    `dedupe_key` is already queued. With a db.transaction() `cursor` the job is part of
+    that transaction and the worker is only notified once it commits.
+    """
+    query = """
+        WITH job AS (
+            INSERT INTO jobs (kind, payload, run_at, dedupe_key, max_attempts)
+            VALUES (%s, %s::jsonb, CURRENT_TIMESTAMP + make_interval(secs => %s), %s, %s)
+            ON CONFLICT (dedupe_key) WHERE status = 'queued' DO NOTHING
+            RETURNING id
+        )
+        SELECT id, pg_notify(%s, %s) FROM job
+    """
+    params = (
+        kind, dumps(payload or {}).decode(), delay, dedupe_key, max_attempts or JOB_MAX_ATTEMPTS,
+        JOB_CHANNEL, kind
+    )
+    if cursor is None:
+        result = db.execute_mutation(query, params)
+    else:
+        cursor.execute(query, params)
+        result = db.fetch_row(cursor)
+    return result['id'] if result else None
+
+
+def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Take the next due job (or one abandoned by a dead worker) for `worker_id`"""
+    query = """
+        UPDATE jobs SET status = 'running', attempts = attempts + 1,
+            locked_at = CURRENT_TIMESTAMP, locked_by = %s
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE (status = 'queued' AND run_at <= CURRENT_TIMESTAMP)
+               OR (status = 'running' AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => %s))
+            ORDER BY run_at, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, kind, payload, attempts, max_attempts
+    """
+    return db.execute_mutation(query, (worker_id, JOB_LOCK_TIMEOUT))
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter: ~10s, 20s, 40s ... capped at JOB_BACKOFF_MAX_SECONDS"""
+    delay = min(JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), JOB_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def heartbeat():
+    """
+    Move the running job's locked_at forward so it is not reclaimed after
+    JOB_LOCK_TIMEOUT; raises JobLost when another worker already took it over. Does
+    nothing outside a job.
+    """
+    job = current_job.get()
+    if job is None:
+        return
+    # attempts changes on every claim, so it tells this run from a later reclaim
+    query = """
+        UPDATE jobs SET locked_at = CURRENT_TIMESTAMP
+        WHERE id = %s AND status = 'running' AND attempts = %s
+        RETURNING id
+    """
+    if not db.execute_mutation(query, (job['id'], job['attempts'])):
+        raise JobLost(f"Job {job['id']} ({job['kind']}) was reclaimed by another worker")
+
+
+def complete_job(job_id: int):
+    db.execute_mutation("DELETE FROM jobs WHERE id = %s", (job_id,))
+
+
+def fail_job(job: Dict[str, Any], error: str):
+    if job['attempts'] >= job['max_attempts']:
+        query = """
+            WITH dead AS (DELETE FROM jobs WHERE id = %s RETURNING *)
+            INSERT INTO dead_jobs (id, kind, payload, attempts, last_error, created_at)
+            SELECT id, kind, payload, attempts, %s, created_at FROM dead
+        """
+        db.execute_mutation(query, (job['id'], error))
+        print(f"☠️ Job {job['id']} ({job['kind']}) moved to dead_jobs after {job['attempts']} attempts")
+        return
+    query = """
+        UPDATE jobs SET status = 'queued', locked_at = NULL, locked_by = NULL, last_error = %s,
+            run_at = CURRENT_TIMESTAMP + make_interval(secs => %s)
+        WHERE id = %s
+    """
+    try:
+        db.execute_mutation(query, (error, backoff_seconds(job['attempts']), job['id']))
+    except psycopg2.errors.UniqueViolation:
+        # an identical job was queued meanwhile and will do the same work
+        complete_job(job['id'])
+
+
+def run_job(job: Dict[str, Any]):
+    function = HANDLERS.get(job['kind'])
+    if function is None:
+        fail_job({**job, "attempts": job['max_attempts']}, f"No handler for job kind {job['kind']}")
+        return
+    token = current_job.set(job)
+    try:
+        function(job['payload'])
+    except JobLost as e:
+        # the worker that reclaimed it completes or fails it
+        print(f"⚠️ {e}; stopping")
+        return
+    except Exception as e:
+        print(f"⚠️ Job {job['id']} ({job['kind']}) failed on attempt {job['attempts']}: {e}")
+        fail_job(job, "".join(traceback.format_exception_only(type(e), e)).strip())
+        return
+    finally:
+        current_job.reset(token)
+    complete_job(job['id'])
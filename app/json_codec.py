@@ -0,0 +1,20 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+import json
+from typing import Any
+
+if orjson is not None:
+    def loads(data) -> Any:
+        return orjson.loads(data)
+
+    def dumps(data: Any) -> bytes:
+        """Serialize to UTF-8 JSON; datetimes, dates, enums and dataclasses are handled natively"""
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def loads(data) -> Any:
+        return json.loads(data)
+
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, default=str, separators=(",", ":")).encode()
@@ -1,13 +1,48 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
-from app.schema import schema
+from fastapi.staticfiles import StaticFiles
+from app.schema import get_schema
+from app.schema.extensions import resolver_executor
+from app.graphql_router import FastJSONGraphQLRouter
+from app.compression import CompressionMiddleware
 from app.database import db
+from app.routers import changes, debug, health, media
+from app.health import health_monitor
+from app.media import MEDIA_ROOT, MEDIA_URL, image_processor
+from app.notifications import onboarding_listener
+from app.profiler import PROFILER_ENABLED
+from app.services import DepartmentService
+
+def warm_up():
+    """Open the pool's minimum connections and run the hottest lookups once"""
+    DepartmentService.get_all_departments()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup and shutdown: pool, warm caches, background tasks"""
+    db.open_pool()
+    await asyncio.to_thread(warm_up)
+    health_monitor.warmed = True
+    health_monitor.start()
+    print("✅ Database pool ready")
+    await onboarding_listener.start()
+    yield
+    # the server has stopped accepting requests and drained in-flight ones by now
+    health_monitor.stop()
+    await onboarding_listener.stop()
+    await image_processor.stop()
+    resolver_executor.shutdown()
+    db.close()
+    print("🔌 Database pool closed")
 
 app = FastAPI(
     title="Doctor Onboarding API",
     description="GraphQL API for doctor onboarding process",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -19,21 +54,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# br/gzip for large responses, negotiated per request
+app.add_middleware(CompressionMiddleware)
+
 # GraphQL router
-graphql_app = GraphQLRouter(schema)
+graphql_app = FastJSONGraphQLRouter(get_schema())
 app.include_router(graphql_app, prefix="/graphql")
+app.include_router(changes.router)
+app.include_router(health.router)
+app.include_router(media.router)
+# sampling profiler, only reachable when PROFILER_TOKEN is set
+if PROFILER_ENABLED:
+    app.include_router(debug.router)
 
-@app.on_event("startup")
-async def startup():
-    """Connect to database on startup"""
-    db.connect()
-    print("✅ Database connected successfully")
-
-@app.on_event("shutdown")
-async def shutdown():
-    """Close database connection on shutdown"""
-    db.close()
-    print("🔌 Database connection closed")
+# uploaded images and their thumbnails; put a CDN or object storage in front in production
+os.makedirs(MEDIA_ROOT, exist_ok=True)
+app.mount(MEDIA_URL, StaticFiles(directory=MEDIA_ROOT), name="media")
 
 @app.get("/")
 def root():
@@ -42,24 +78,11 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "graphql": "/graphql",
+            "changes": "/changes/doctors",
+            "profile_image_upload": "/doctors/{doctor_id}/profile-image",
             "docs": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "liveness": "/livez",
+            "readiness": "/readyz"
         }
     }
-
-@app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    try:
-        # Test database connection
-        result = db.execute_one("SELECT 1 as status")
-        return {
-            "status": "healthy",
-            "database": "connected" if result else "disconnected"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e)
-        }
\ No newline at end of file
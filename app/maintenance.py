@@ -0,0 +1,53 @@
+"""
+Maintenance tasks, also run on a schedule by the job worker:
+
+    python -m app.maintenance archive [--older-than-days 180] [--batch-size 500]
+    python -m app.maintenance cleanup [--older-than-days 30] [--max-step 8] [--batch-size 200] [--dry-run]
+"""
+import argparse
+import sys
+from app.database import db
+from app.services.archive_services import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ArchiveService
+from app.services.cleanup_services import (
+    ABANDONED_AFTER_DAYS, ABANDONED_MAX_STEP, CLEANUP_BATCH_SIZE, CleanupService, print_cleanup_report
+)
+
+
+def archive(args):
+    moved = ArchiveService.archive_completed(args.older_than_days, args.batch_size)
+    print(f"🗄️ Archived {moved} completed doctors not updated for {args.older_than_days} days")
+
+
+def cleanup(args):
+    report = CleanupService.delete_abandoned(
+        args.older_than_days, args.max_step, args.batch_size, dry_run=args.dry_run
+    )
+    print_cleanup_report(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doctor data maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive_parser = commands.add_parser("archive", help="move stale completed doctors to doctor_archive")
+    archive_parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    archive_parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    archive_parser.set_defaults(run=archive)
+
+    cleanup_parser = commands.add_parser("cleanup", help="export and delete abandoned in-progress onboardings")
+    cleanup_parser.add_argument("--older-than-days", type=int, default=ABANDONED_AFTER_DAYS)
+    cleanup_parser.add_argument("--max-step", type=int, default=ABANDONED_MAX_STEP,
+                                help="only doctors that stopped at this step or earlier")
+    cleanup_parser.add_argument("--batch-size", type=int, default=CLEANUP_BATCH_SIZE)
+    cleanup_parser.add_argument("--dry-run", action="store_true", help="only count what would be removed")
+    cleanup_parser.set_defaults(run=cleanup)
+
+    args = parser.parse_args()
+    try:
+        args.run(args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, Set
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+MEDIA_URL = os.getenv("MEDIA_URL", "/media").rstrip("/")
+# square webp variants generated for every uploaded profile image
+PROFILE_IMAGE_SIZES = tuple(sorted(
+    int(size) for size in os.getenv("PROFILE_IMAGE_SIZES", "64,256").split(",") if size.strip()
+))
+# profileImage without a size inside a list (allDoctors, searchDoctors, ...)
+LIST_THUMBNAIL_SIZE = int(os.getenv("PROFILE_IMAGE_LIST_SIZE", "64"))
+PROFILE_IMAGE_MAX_BYTES = int(os.getenv("PROFILE_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+CONTENT_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+# what Pillow must detect for each accepted extension
+IMAGE_FORMATS = {"jpg": "JPEG", "png": "PNG", "webp": "WEBP"}
+
+
+def media_path(key: str, name: str) -> str:
+    return os.path.join(MEDIA_ROOT, key, name)
+
+
+def media_url(key: str, name: str) -> str:
+    return f"{MEDIA_URL}/{key}/{name}"
+
+
+def remove_upload(key: Optional[str]):
+    """Delete a replaced upload's directory: its original and every variant"""
+    if key and key.startswith("profile_images/"):
+        shutil.rmtree(os.path.join(MEDIA_ROOT, key), ignore_errors=True)
+
+
+def variant_name(size: int) -> str:
+    return f"{size}.webp"
+
+
+def profile_image_url(
+    original: Optional[str], key: Optional[str], sizes: Optional[Sequence[int]], size: Optional[int]
+) -> Optional[str]:
+    """Smallest ready variant at least `size` px wide, else the original image"""
+    if size is None or not key or not sizes:
+        return original
+    fitting = [ready for ready in sizes if ready >= size]
+    if not fitting:
+        return original
+    return media_url(key, variant_name(min(fitting)))
+
+
+def verify_image(source: str, extension: str) -> bool:
+    """The file is a well-formed image of the declared type; runs in the process pool"""
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            if image.format != IMAGE_FORMATS.get(extension):
+                return False
+            image.verify()
+    except Exception:
+        return False
+    return True
+
+
+def resize_image(source: str, sizes: Sequence[int]) -> List[int]:
+    """Write a square webp thumbnail per size next to `source`; runs in the process pool"""
+    from PIL import Image, ImageOps
+
+    target_dir = os.path.dirname(source)
+    done = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for size in sizes:
+            thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            thumbnail.save(os.path.join(target_dir, variant_name(size)), "WEBP", quality=80, method=4)
+            done.append(size)
+    return done
+
+
+class ImageProcessor:
+    """
+    Resizes uploaded images in a process pool so decoding and scaling never block the
+    event loop or hold the GIL; `on_done(doctor_id, key, sizes)` runs in a thread once
+    the variants exist.
+    """
+
+    def __init__(self, workers: int = IMAGE_WORKERS):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+    def submit(self, doctor_id: int, key: str, source: str, on_done: Callable[[int, str, List[int]], None]):
+        task = asyncio.create_task(self.process(doctor_id, key, source, on_done))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+    async def verify(self, source: str, extension: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool(), verify_image, source, extension)
+
+    async def process(self, doctor_id: int, key: str, source: str, on_done: Callable):
+        loop = asyncio.get_running_loop()
+        try:
+            sizes = await loop.run_in_executor(self.pool(), resize_image, source, PROFILE_IMAGE_SIZES)
+            await asyncio.to_thread(on_done, doctor_id, key, sizes)
+        except FileNotFoundError:
+            # a newer upload replaced this one and removed it before it was resized
+            pass
+        except Exception as e:
+            print(f"⚠️ Profile image processing failed for doctor {doctor_id}: {e}")
+
+    async def stop(self):
+        """Let queued resizes finish, then shut the pool down"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+image_processor = ImageProcessor()
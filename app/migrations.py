@@ -0,0 +1,157 @@
+"""
+Versioned schema migrations: python -m app.migrations [migrate|status]
+
+Migrations are the numbered files in migrations/ (0001_initial.sql, ...), applied in
+order and recorded in schema_migrations. Each runs in its own transaction unless its
+first line is "-- migrate: no-transaction" (needed for CREATE INDEX CONCURRENTLY); such
+files are split on ";" at line ends and must only hold simple statements. Applying is
+serialized with an advisory lock, so every process may safely migrate on start.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+import psycopg2
+from app.database import db
+
+MIGRATIONS_DIR = Path(os.getenv("MIGRATIONS_DIR", Path(__file__).resolve().parent.parent / "migrations"))
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+NO_TRANSACTION = "-- migrate: no-transaction"
+ADVISORY_LOCK_ID = 4_207_001
+
+
+class Migration:
+    def __init__(self, path: Path):
+        version, name = MIGRATION_FILE.match(path.name).groups()
+        self.path = path
+        self.version = version
+        self.name = name
+        self.sql = path.read_text()
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+        self.transactional = not self.sql.lstrip().startswith(NO_TRANSACTION)
+
+    def statements(self) -> List[str]:
+        statements = re.split(r";\s*$", self.sql, flags=re.MULTILINE)
+        return [
+            statement.strip() for statement in statements
+            if any(line.strip() and not line.strip().startswith("--") for line in statement.splitlines())
+        ]
+
+
+def discover() -> List[Migration]:
+    return sorted(
+        (Migration(path) for path in MIGRATIONS_DIR.iterdir() if MIGRATION_FILE.match(path.name)),
+        key=lambda migration: migration.version
+    )
+
+
+def applied_checksums(cursor) -> Dict[str, str]:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def apply(conn, migration: Migration):
+    record = "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)"
+    if migration.transactional:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(migration.sql)
+                cursor.execute(record, (migration.version, migration.name, migration.checksum))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.autocommit = True
+        return
+    with conn.cursor() as cursor:
+        for statement in migration.statements():
+            cursor.execute(statement)
+        cursor.execute(record, (migration.version, migration.name, migration.checksum))
+
+
+def migrate() -> List[str]:
+    """Apply every pending migration; returns the versions applied"""
+    conn = psycopg2.connect(db.database_url)
+    conn.autocommit = True
+    applied: List[str] = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+            done = applied_checksums(cursor)
+        for migration in discover():
+            if migration.version in done:
+                if done[migration.version] != migration.checksum:
+                    print(f"⚠️ Migration {migration.path.name} changed after it was applied")
+                continue
+            print(f"⏩ Applying migration {migration.path.name}")
+            apply(conn, migration)
+            applied.append(migration.version)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+    finally:
+        conn.close()
+    if applied:
+        # plans prepared against the old schema may no longer be valid
+        db.invalidate_statement_cache()
+    return applied
+
+
+def status() -> List[Dict]:
+    conn = psycopg2.connect(db.database_url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            done = applied_checksums(cursor)
+            # left behind by a CREATE INDEX CONCURRENTLY that failed; IF NOT EXISTS would
+            # skip them on the next run, so they must be dropped by hand
+            cursor.execute("""
+                SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE NOT i.indisvalid
+            """)
+            invalid = [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    report = [
+        {
+            "version": migration.version,
+            "name": migration.name,
+            "state": (
+                "pending" if migration.version not in done
+                else "changed" if done[migration.version] != migration.checksum
+                else "applied"
+            )
+        }
+        for migration in discover()
+    ]
+    for index in invalid:
+        print(f"⚠️ Invalid index {index}: drop it and migrate again")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "status"])
+    args = parser.parse_args()
+    if args.command == "status":
+        for row in status():
+            print(f"{row['version']}  {row['state']:8}  {row['name']}")
+        return
+    applied = migrate()
+    print(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Database is up to date")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
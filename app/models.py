@@ -2,6 +2,8 @@ import strawberry
 from typing import Optional, List
 from enum import Enum
 from datetime import datetime
+from strawberry.types import Info
+from app.media import LIST_THUMBNAIL_SIZE, profile_image_url
 
 
 @strawberry.type
@@ -44,6 +46,15 @@ class OnboardingStatus(str, Enum):
     COMPLETED = "completed"
     PENDING_REVIEW = "pending_review"
 
+def in_list(info: Info) -> bool:
+    """Whether the field being resolved sits inside a list (its path has an index)"""
+    path = info.path
+    while path is not None:
+        if isinstance(path.key, int):
+            return True
+        path = path.prev
+    return False
+
 @strawberry.type
 class Doctor:
     id: int
@@ -63,6 +74,14 @@ class Doctor:
     schedules: Optional[List[Schedule]] = None
     created_at: Optional[datetime] = None 
     updated_at: Optional[datetime] = None
+    profile_image_key: strawberry.Private[Optional[str]] = None
+    profile_image_sizes: strawberry.Private[Optional[List[int]]] = None
+
+    @strawberry.field(description="Profile image URL, the smallest thumbnail at least `size` px wide when one is ready; lists default to a small thumbnail")
+    def profile_image(self, info: Info, size: Optional[int] = None) -> Optional[str]:
+        if size is None and in_list(info):
+            size = LIST_THUMBNAIL_SIZE
+        return profile_image_url(self.profile_image_url, self.profile_image_key, self.profile_image_sizes, size)
 
 @strawberry.input
 class ContactInfoInput:
@@ -113,9 +132,65 @@ class ScheduleInput:
     end_time: str
     is_available: bool = True
 
+@strawberry.input
+class OnboardingSubmissionInput:
+    register_no: str
+    email: str
+    mobile_numbers: List[str]
+    name: Optional[str] = None
+    bio: Optional[str] = None
+    qualifications: Optional[List[str]] = None
+    specializations: Optional[List[str]] = None
+    address: Optional[AddressInput] = None
+    appointment_settings: Optional[AppointmentSettingsInput] = None
+    schedules: Optional[List[ScheduleInput]] = None
+    department_ids: Optional[List[int]] = None
+    profile_image_url: Optional[str] = None
+    complete: bool = True
+
 @strawberry.type
 class DuplicateCheckResult:
     exists: bool
     matching_doctors: Optional[List[Doctor]] = None
     message: str
 
+@strawberry.input
+class DoctorFilterInput:
+    department_id: Optional[int] = None
+    city: Optional[str] = None
+    status: Optional[OnboardingStatus] = None
+
+@strawberry.type
+class FacetCount:
+    value: str
+    count: int
+
+@strawberry.type
+class DoctorSearchResult:
+    doctors: List[Doctor]
+    total_count: int
+    departments: List[FacetCount]
+    cities: List[FacetCount]
+    end_cursor: Optional[str] = None
+    has_next_page: bool = False
+
+@strawberry.type
+class DoctorStats:
+    total: int
+    by_status: List[FacetCount]
+    by_department: List[FacetCount]
+    by_city: List[FacetCount]
+    by_step: List[FacetCount]
+
+@strawberry.type
+class DoctorChangeFeed:
+    doctors: List[Doctor]
+    deleted_ids: List[int]
+    cursor: str
+    has_more: bool
+
+@strawberry.type
+class OnboardingProgressEvent:
+    doctor_id: int
+    current_step: int
+    onboarding_status: OnboardingStatus
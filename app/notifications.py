@@ -0,0 +1,107 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Optional, Set
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from app.database import db
+
+ONBOARDING_CHANNEL = "onboarding_progress"
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_DELAY_SECONDS = 5
+
+
+class NotificationListener:
+    """
+    One LISTEN connection per worker, fanned out to any number of in-process subscribers.
+
+    Payloads are JSON objects with a doctor_id; subscribers either follow a single doctor
+    or every doctor (doctor_id=None). A slow subscriber drops its oldest queued events
+    rather than holding back the others.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.connection = None
+        self.fileno: Optional[int] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.subscribers: Dict[Optional[int], Set[asyncio.Queue]] = {}
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            await asyncio.to_thread(self._connect)
+        except psycopg2.Error as e:
+            print(f"⚠️ LISTEN {self.channel} failed: {e}")
+            self._schedule_reconnect()
+            return
+        self.fileno = self.connection.fileno()
+        self.loop.add_reader(self.fileno, self._on_readable)
+
+    async def stop(self):
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._disconnect()
+
+    def _connect(self):
+        self.connection = psycopg2.connect(db.database_url)
+        self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+
+    def _disconnect(self):
+        if self.fileno is not None:
+            self.loop.remove_reader(self.fileno)
+            self.fileno = None
+        if self.connection is not None and not self.connection.closed:
+            self.connection.close()
+        self.connection = None
+
+    def _schedule_reconnect(self):
+        async def reconnect():
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            self._reconnect_task = None
+            await self.start()
+
+        if self._reconnect_task is None:
+            self._reconnect_task = self.loop.create_task(reconnect())
+
+    def _on_readable(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            print(f"⚠️ LISTEN {self.channel} connection lost: {e}")
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self._publish(payload)
+
+    def _publish(self, payload: dict):
+        queues = self.subscribers.get(payload.get('doctor_id'), set()) | self.subscribers.get(None, set())
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def subscribe(self, doctor_id: Optional[int] = None) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.setdefault(doctor_id, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            queues = self.subscribers.get(doctor_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[doctor_id]
+
+
+onboarding_listener = NotificationListener(ONBOARDING_CHANNEL)
@@ -0,0 +1,126 @@
+"""
+Sampling profiler for live workers, enabled by setting PROFILER_TOKEN.
+
+A Sampler thread reads every thread's stack with sys._current_frames() each
+PROFILER_INTERVAL seconds and counts the stacks it sees. collapsed() renders them in
+the folded format read by flamegraph.pl and speedscope, one "outer;inner;leaf count"
+line per stack. Nothing samples while no profile is being taken, and with
+PROFILER_TOKEN unset neither GET /debug/profile nor the per-operation extension is
+installed.
+"""
+import hmac
+import os
+import sys
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional, Set
+
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+PROFILER_ENABLED = bool(PROFILER_TOKEN)
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+# GraphQL requests sending "X-Profile: 1" with the token get their operation profiled
+PROFILE_HEADER = "x-profile"
+TOKEN_HEADER = "x-profile-token"
+
+# leaf frames of threads blocked waiting for work, left out of whole-worker profiles
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# threads working on the operation being profiled; resolver threads join while they run
+profiled_threads: ContextVar[Optional[Set[int]]] = ContextVar("profiled_threads", default=None)
+
+
+def authorized(headers: Mapping[str, str]) -> bool:
+    """The request carries PROFILER_TOKEN as X-Profile-Token or a bearer token"""
+    if not PROFILER_ENABLED:
+        return False
+    token = headers.get(TOKEN_HEADER, "")
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    return hmac.compare_digest(token.encode(), PROFILER_TOKEN.encode())
+
+
+@lru_cache(maxsize=4096)
+def frame_label(code) -> str:
+    path = code.co_filename.replace("\\", "/").split("/")
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ",")
+
+
+def is_idle(code) -> bool:
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def run_profiled(function: Callable, *args, **kwargs) -> Any:
+    """Call `function`, sampling this thread along with the operation if it is being profiled"""
+    threads = profiled_threads.get()
+    if threads is None:
+        return function(*args, **kwargs)
+    ident = threading.get_ident()
+    threads.add(ident)
+    try:
+        return function(*args, **kwargs)
+    finally:
+        threads.discard(ident)
+
+
+class Sampler:
+    """Counts the stacks of every thread, or only of those in `thread_ids`, until stopped"""
+
+    # sampler threads never sample each other
+    active: Set[int] = set()
+
+    def __init__(self, thread_ids: Optional[Set[int]] = None, include_idle: bool = False,
+                 interval: float = PROFILER_INTERVAL):
+        self.thread_ids = thread_ids
+        self.include_idle = include_idle
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self.thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self.stopping.set()
+        self.thread.join()
+        return self
+
+    def run(self):
+        ident = threading.get_ident()
+        Sampler.active.add(ident)
+        try:
+            while not self.stopping.wait(self.interval):
+                self.sample()
+        finally:
+            Sampler.active.discard(ident)
+
+    def sample(self):
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.samples += 1
+        for ident, frame in frames.items():
+            if ident in Sampler.active or (self.thread_ids is not None and ident not in self.thread_ids):
+                continue
+            if not self.include_idle and is_idle(frame.f_code):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
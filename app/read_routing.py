@@ -0,0 +1,65 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional, Tuple
+
+# after a write, the client's reads stay on the primary for this many seconds so it
+# never sees a replica that has not replayed its own change yet
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_COOKIE = "db_primary_until"
+
+
+class ReadRoute:
+    """Where the current request's reads may go; any write pins the rest of it to the primary"""
+
+    def __init__(self, replicas_allowed: bool):
+        self.replicas_allowed = replicas_allowed
+        self.wrote = False
+
+
+_current: ContextVar[Optional[ReadRoute]] = ContextVar("read_route", default=None)
+
+
+def begin_route(replicas_allowed: bool) -> Tuple[ReadRoute, Token]:
+    route = ReadRoute(replicas_allowed)
+    return route, _current.set(route)
+
+
+def end_route(token: Token):
+    _current.reset(token)
+
+
+@contextmanager
+def replica_reads(allowed: bool = True) -> Iterator[ReadRoute]:
+    """Let reads inside the block go to a replica (outside any route, reads use the primary)"""
+    route, token = begin_route(allowed)
+    try:
+        yield route
+    finally:
+        end_route(token)
+
+
+def replica_reads_allowed() -> bool:
+    route = _current.get()
+    return route is not None and route.replicas_allowed
+
+
+def record_write():
+    """Called on every write"""
+    route = _current.get()
+    if route is not None:
+        route.wrote = True
+        route.replicas_allowed = False
+
+
+def pinned_to_primary(cookie: Optional[str]) -> bool:
+    """Whether a client's PRIMARY_COOKIE still pins its reads to the primary"""
+    try:
+        return float(cookie) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+def primary_cookie_value() -> str:
+    return f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
@@ -0,0 +1,92 @@
+"""
+Compact in-memory records for assembled doctors.
+
+The doctor services build these instead of the strawberry output types in app.models.
+Strawberry resolves object fields with getattr, so a record only becomes output while
+the response is serialized; the schema still declares Doctor, Schedule and friends.
+Records are slotted dataclasses (no per-instance __dict__), list assembly shares one
+DepartmentRecord per department, and low-cardinality strings (times, places, statuses)
+are interned. See benchmarks/bench_doctor_memory.py for the per-doctor footprint.
+"""
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+
+def shared(value: Optional[str]) -> Optional[str]:
+    """One string object per distinct value, for columns that repeat across many rows"""
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class DepartmentRecord:
+    id: int
+    name: str
+    icon_name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class AddressRecord:
+    id: Optional[int] = None
+    country: Optional[str] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    pincode: Optional[str] = None
+    flat_house: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    def __post_init__(self):
+        self.country = shared(self.country)
+        self.state = shared(self.state)
+        self.city = shared(self.city)
+
+
+@dataclass(slots=True)
+class AppointmentSettingsRecord:
+    id: Optional[int] = None
+    consultation_charge: Optional[int] = None
+    follow_up_charge: Optional[int] = None
+    follow_up_period_days: Optional[int] = None
+    advance_booking_days: Optional[int] = None
+    avg_duration_minutes: Optional[int] = None
+
+
+@dataclass(slots=True, kw_only=True)
+class ScheduleRecord:
+    id: Optional[int] = None
+    day_of_week: int
+    start_time: str
+    end_time: str
+    is_available: bool = True
+
+    def __post_init__(self):
+        self.start_time = shared(self.start_time)
+        self.end_time = shared(self.end_time)
+
+
+@dataclass(slots=True)
+class DoctorRecord:
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    mobile_numbers: Optional[List[str]] = None
+    register_no: Optional[str] = None
+    bio: Optional[str] = None
+    profile_image_url: Optional[str] = None
+    onboarding_status: str = "in_progress"
+    current_step: int = 1
+    departments: Optional[List[DepartmentRecord]] = None
+    qualifications: Optional[List[str]] = None
+    specializations: Optional[List[str]] = None
+    address: Optional[AddressRecord] = None
+    appointment_settings: Optional[AppointmentSettingsRecord] = None
+    schedules: Optional[List[ScheduleRecord]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    profile_image_key: Optional[str] = None
+    profile_image_sizes: Optional[List[int]] = None
+
+    def __post_init__(self):
+        self.onboarding_status = shared(self.onboarding_status)
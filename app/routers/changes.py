@@ -0,0 +1,32 @@
+import dataclasses
+import json
+from typing import Iterator, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.read_routing import replica_reads
+from app.services import ChangeFeedService
+
+router = APIRouter()
+
+
+def ndjson_line(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+@router.get("/changes/doctors")
+def doctor_changes(since: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """NDJSON variant of the doctorChanges query: one line per changed or deleted doctor, cursor last"""
+    try:
+        with replica_reads():
+            feed = ChangeFeedService.get_doctor_changes(since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines() -> Iterator[str]:
+        for doctor in feed.doctors:
+            yield ndjson_line({"type": "doctor", "doctor": dataclasses.asdict(doctor)})
+        for doctor_id in feed.deleted_ids:
+            yield ndjson_line({"type": "deleted", "id": doctor_id})
+        yield ndjson_line({"type": "cursor", "cursor": feed.cursor, "has_more": feed.has_more})
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
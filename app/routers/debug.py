@@ -0,0 +1,36 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from app.profiler import PROFILER_MAX_SECONDS, Sampler, authorized
+
+router = APIRouter()
+
+# one whole-worker profile at a time
+profile_lock = asyncio.Lock()
+
+
+@router.get("/debug/profile", response_class=PlainTextResponse)
+async def profile(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    idle: bool = False
+):
+    """
+    Sample this worker's threads for `seconds` and return the collapsed stacks
+    (flamegraph.pl / speedscope input). Only registered when PROFILER_TOKEN is set.
+    """
+    if not authorized(request.headers):
+        raise HTTPException(status_code=401, detail="Profiler token required")
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    async with profile_lock:
+        sampler = Sampler(include_idle=idle).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={"X-Profile-Samples": str(sampler.samples), "X-Profile-Pid": str(os.getpid())}
+    )
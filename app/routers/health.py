@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.admission import admission_controller
+from app.health import health_monitor
+
+router = APIRouter()
+
+
+@router.get("/livez")
+async def liveness():
+    """The worker's event loop is responsive; never touches the database"""
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness():
+    """Last background health snapshot; 503 while the worker should not get traffic"""
+    snapshot = health_monitor.readiness()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@router.get("/health")
+async def health_check():
+    """Backwards compatible summary of /readyz, plus this worker's admission control counters"""
+    snapshot = health_monitor.readiness()
+    return {
+        "status": "healthy" if snapshot["ready"] else "unhealthy",
+        "database": "connected" if snapshot.get("database", {}).get("connected") else "disconnected",
+        **snapshot,
+        "admission": admission_controller.stats()
+    }
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import uuid
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from app.media import (
+    CONTENT_TYPES, PROFILE_IMAGE_MAX_BYTES, PROFILE_IMAGE_SIZES, image_processor, media_path, media_url,
+    remove_upload
+)
+from app.services import ArchiveService, DoctorService, OnboardingService, ProfileImageService
+
+router = APIRouter()
+
+
+def remove_quietly(path: str):
+    """Remove a rejected upload, and its directory once that is empty"""
+    try:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+@router.post("/doctors/{doctor_id}/profile-image")
+async def upload_profile_image(doctor_id: int, request: Request):
+    """
+    Upload a profile image as the raw request body (Content-Type image/jpeg, png or webp).
+
+    The body is streamed to storage chunk by chunk and must decode as the declared
+    image type before it is attached; thumbnails are generated in the background and show up through Doctor.profileImage(size:) once ready.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    extension = CONTENT_TYPES.get(content_type)
+    if extension is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported image type: {content_type or 'none'}")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > PROFILE_IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    if (
+        not await asyncio.to_thread(DoctorService.get_doctor_row, doctor_id)
+        and not await asyncio.to_thread(ArchiveService.restore, doctor_id)
+    ):
+        raise HTTPException(status_code=404, detail=f"Doctor {doctor_id} not found")
+
+    key = f"profile_images/{doctor_id}/{uuid.uuid4().hex}"
+    name = f"original.{extension}"
+    path = media_path(key, name)
+    partial = f"{path}.part"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    received = 0
+    try:
+        with open(partial, "wb") as target:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > PROFILE_IMAGE_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Image too large")
+                await asyncio.to_thread(target.write, chunk)
+        if not received:
+            raise HTTPException(status_code=400, detail="Empty upload")
+        # decode in the image pool before anything points at the file
+        if not await image_processor.verify(partial, extension):
+            raise HTTPException(status_code=415, detail=f"Upload is not a valid {content_type} image")
+        os.replace(partial, path)
+    except BaseException:
+        remove_quietly(partial)
+        raise
+
+    row = await asyncio.to_thread(ProfileImageService.attach_upload, doctor_id, media_url(key, name), key)
+    if not row:
+        remove_quietly(path)
+        raise HTTPException(status_code=404, detail=f"Doctor {doctor_id} not found")
+    image_processor.submit(doctor_id, key, path, ProfileImageService.mark_variants_ready)
+    # nothing points at the replaced upload once the new key is committed
+    await asyncio.to_thread(remove_upload, row["previous_key"])
+    await asyncio.to_thread(OnboardingService.after_step_saved, doctor_id)
+
+    return JSONResponse({
+        "doctor_id": doctor_id,
+        "profile_image_url": row["profile_image_url"],
+        "pending_sizes": list(PROFILE_IMAGE_SIZES)
+    }, status_code=202)
@@ -0,0 +1,28 @@
+import keyword
+from functools import lru_cache
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+RowFactory = Callable[[Sequence[Any]], Any]
+
+
+@lru_cache(maxsize=512)
+def object_factory(cls: type, columns: Tuple[str, ...], offset: int = 0) -> RowFactory:
+    """
+    Build `cls` straight from a result tuple.
+
+    The generated function passes each column by keyword from its tuple index, so a row
+    costs exactly one allocation (the object) instead of RealDictRow -> dict -> **kwargs.
+    Columns before `offset` are skipped (used for grouping keys such as doctor_id).
+    Column names that cannot be keywords in source ("?column?", "class") go through **kwargs.
+    """
+    fields = columns[offset:]
+    if not all(name.isidentifier() and not keyword.iskeyword(name) for name in fields):
+        return lambda row: cls(**dict(zip(fields, row[offset:])))
+    arguments = ", ".join(f"{name}=row[{index}]" for index, name in enumerate(fields, offset))
+    namespace: Dict[str, Any] = {"cls": cls}
+    exec(f"def build(row):\n    return cls({arguments})", namespace)
+    return namespace["build"]
+
+
+def column_names(cursor) -> Tuple[str, ...]:
+    return tuple(column.name for column in cursor.description)
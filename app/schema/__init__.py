@@ -1,5 +1,90 @@
+"""
+Schema registry.
+
+Root types are assembled from the resolver classes listed below, which are only
+imported when the schema is first built. get_schema() builds and validates the
+schema once per process; `from app.schema import schema` keeps working through
+the module __getattr__.
+"""
+import importlib
+from functools import lru_cache
+from typing import List, Tuple
+
 import strawberry
-from .queries import Query
-from .mutations import Mutation
+from graphql import validate_schema
+
+QUERY_TYPES = (
+    "app.schema.queries.department_queries:DepartmentQuery",
+    "app.schema.queries.doctor_queries:DoctorQuery",
+    "app.schema.queries.on_boarding_queries:OnboardingQuery",
+    "app.schema.queries.search_queries:SearchQuery",
+    "app.schema.queries.stats_queries:StatsQuery",
+    "app.schema.queries.change_feed_queries:ChangeFeedQuery",
+)
+
+MUTATION_TYPES = (
+    "app.schema.mutations.doctor_mutations:DoctorMutation",
+    "app.schema.mutations.onboarding_mutations:OnboardingMutation",
+)
+
+SUBSCRIPTION_TYPES = (
+    "app.schema.subscriptions.onboarding_subscriptions:OnboardingSubscription",
+)
+
+
+def load_types(paths: Tuple[str, ...]) -> List[type]:
+    types = []
+    for path in paths:
+        module_name, type_name = path.split(":")
+        types.append(getattr(importlib.import_module(module_name), type_name))
+    return types
+
+
+@lru_cache(maxsize=None)
+def get_schema() -> strawberry.Schema:
+    @strawberry.type
+    class Query(*load_types(QUERY_TYPES)):
+        pass
+
+    @strawberry.type
+    class Mutation(*load_types(MUTATION_TYPES)):
+        pass
+
+    @strawberry.type
+    class Subscription(*load_types(SUBSCRIPTION_TYPES)):
+        pass
+
+    from app.profiler import PROFILER_ENABLED
+    from .extensions import (
+        AdmissionControlExtension, IdentityMapExtension, ProfilerExtension, ReadRoutingExtension,
+        ThreadedResolverExtension
+    )
+
+    # root resolvers are sync and do blocking database work; keep it off the event loop.
+    # The fields are shared with the resolver classes, so a rebuild must not add a second one
+    for root in (Query, Mutation):
+        for field in root.__strawberry_definition__.fields:
+            threaded = any(isinstance(extension, ThreadedResolverExtension) for extension in field.extensions)
+            if not field.is_async and not threaded:
+                field.extensions.append(ThreadedResolverExtension())
+
+    extensions = [AdmissionControlExtension, IdentityMapExtension, ReadRoutingExtension]
+    if PROFILER_ENABLED:
+        extensions.insert(0, ProfilerExtension)
+    schema = strawberry.Schema(
+        query=Query,
+        mutation=Mutation,
+        subscription=Subscription,
+        extensions=extensions
+    )
+    # graphql-core validates lazily on the first request; do it now and fail fast
+    errors = validate_schema(schema._schema)
+    if errors:
+        raise RuntimeError(f"Invalid GraphQL schema: {errors}")
+    return schema
+
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
+def __getattr__(name: str):
+    if name == "schema":
+        return get_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
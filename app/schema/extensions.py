@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import functools
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from graphql import ExecutionResult, FieldNode, GraphQLError, OperationDefinitionNode
+from strawberry.types.graphql import OperationType
+from strawberry.extensions import FieldExtension, SchemaExtension
+from app import read_routing
+from app.admission import Rejected, admission_controller, client_key, controlled_fields
+from app.identity_map import begin_request_scope, end_request_scope
+from app.profiler import (
+    PROFILE_HEADER, PROFILER_INTERVAL, Sampler, authorized, profiled_threads, run_profiled
+)
+
+# expose per-request counters in the response "extensions" field
+DEBUG_EXTENSIONS = os.getenv("GRAPHQL_DEBUG_EXTENSIONS", "0") == "1"
+# threads running sync root resolvers; more than the DB pool would only wait for a connection
+RESOLVER_THREADS = int(os.getenv("GRAPHQL_RESOLVER_THREADS", os.getenv("DB_POOL_MAX_SIZE", "10")))
+resolver_executor = ThreadPoolExecutor(RESOLVER_THREADS, thread_name_prefix="resolver")
+
+
+class ThreadedResolverExtension(FieldExtension):
+    """
+    Run a sync root resolver on resolver_executor instead of the event loop.
+
+    Strawberry calls sync resolvers on the loop, so one slow database call stalled every
+    other request on the worker, /livez included, and admission control never saw more
+    than one operation at a time. The resolver runs with a copy of the operation's
+    context, so the identity map and read route set by the extensions below still
+    apply. Its own executor keeps the default one free for the health monitor.
+    """
+
+    def resolve(self, next_, source, info, **kwargs):
+        call = functools.partial(contextvars.copy_context().run, run_profiled, next_, source, info, **kwargs)
+        return asyncio.get_running_loop().run_in_executor(resolver_executor, call)
+
+    async def resolve_async(self, next_, source, info, **kwargs):
+        return await next_(source, info, **kwargs)
+
+
+class IdentityMapExtension(SchemaExtension):
+    """Give every GraphQL operation its own identity map"""
+
+    identity_map = None
+
+    def on_operation(self):
+        self.identity_map, token = begin_request_scope()
+        try:
+            yield
+        finally:
+            end_request_scope(token)
+
+    def get_results(self):
+        if not DEBUG_EXTENSIONS or self.identity_map is None:
+            return {}
+        return {"identityMap": self.identity_map.stats()}
+
+
+class ReadRoutingExtension(SchemaExtension):
+    """
+    Send the reads of query operations to read replicas.
+
+    Mutations read from the primary, and a request that wrote sets a cookie that
+    keeps the client's reads on the primary for DB_READ_YOUR_WRITES_SECONDS.
+    """
+
+    def on_execute(self):
+        context = self.execution_context.context or {}
+        request = context.get("request")
+        cookie = request.cookies.get(read_routing.PRIMARY_COOKIE) if request else None
+        allowed = (
+            self.execution_context.operation_type == OperationType.QUERY
+            and not read_routing.pinned_to_primary(cookie)
+        )
+        route, token = read_routing.begin_route(allowed)
+        try:
+            yield
+        finally:
+            read_routing.end_route(token)
+        response = context.get("response")
+        if route.wrote and response is not None:
+            response.set_cookie(
+                read_routing.PRIMARY_COOKIE,
+                read_routing.primary_cookie_value(),
+                max_age=int(read_routing.READ_YOUR_WRITES_SECONDS) + 1,
+                httponly=True,
+                samesite="lax"
+            )
+
+
+def root_field_names(execution_context) -> List[str]:
+    """Top-level fields selected by the operation being executed"""
+    document = execution_context.graphql_document
+    if document is None:
+        return []
+    names = []
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        name = definition.name.value if definition.name else None
+        if execution_context.operation_name not in (None, name):
+            continue
+        names.extend(
+            selection.name.value for selection in definition.selection_set.selections
+            if isinstance(selection, FieldNode)
+        )
+    return names
+
+
+class AdmissionControlExtension(SchemaExtension):
+    """
+    Rate limit and bound the concurrency of expensive root fields (see app.admission).
+
+    Shed operations are not executed; they get a RATE_LIMITED error, HTTP 429 and a
+    Retry-After header.
+    """
+
+    async def on_execute(self):
+        fields = controlled_fields(root_field_names(self.execution_context))
+        if not fields:
+            yield
+            return
+        context = self.execution_context.context or {}
+        gates = []
+        try:
+            admission_controller.check_rate(client_key(context.get("request")) or "unknown", fields)
+            for field in fields:
+                gates.append(await admission_controller.enter(field))
+        except Rejected as e:
+            for gate in gates:
+                admission_controller.leave(gate)
+            self.reject(context, e)
+            yield
+            return
+        try:
+            yield
+        finally:
+            for gate in gates:
+                admission_controller.leave(gate)
+
+    def reject(self, context, error: Rejected):
+        retry_after = max(math.ceil(error.retry_after), 1)
+        # a result set before execution makes strawberry skip executing the operation
+        self.execution_context.result = ExecutionResult(
+            data=None,
+            errors=[GraphQLError(
+                str(error), extensions={"code": "RATE_LIMITED", "retryAfter": retry_after}
+            )]
+        )
+        response = context.get("response")
+        if response is not None:
+            response.status_code = 429
+            response.headers["Retry-After"] = str(retry_after)
+
+
+class ProfilerExtension(SchemaExtension):
+    """
+    Profile one operation when the request sends "X-Profile: 1" and the profiler token;
+    the collapsed stacks are returned in the response "extensions". Only installed when
+    PROFILER_TOKEN is set.
+
+    The sampler follows the event loop thread and, while they work on this operation,
+    the resolver threads; loop-side work of concurrent requests can show up too.
+    """
+
+    sampler = None
+
+    def on_operation(self):
+        context = self.execution_context.context or {}
+        request = context.get("request")
+        if request is None or request.headers.get(PROFILE_HEADER) != "1" or not authorized(request.headers):
+            yield
+            return
+        threads = {threading.get_ident()}
+        token = profiled_threads.set(threads)
+        self.sampler = Sampler(thread_ids=threads, include_idle=True).start()
+        try:
+            yield
+        finally:
+            self.sampler.stop()
+            profiled_threads.reset(token)
+
+    def get_results(self):
+        if self.sampler is None:
+            return {}
+        return {"profile": {
+            "samples": self.sampler.samples,
+            "intervalMs": PROFILER_INTERVAL * 1000,
+            "collapsed": self.sampler.collapsed(),
+        }}
@@ -1,8 +1,9 @@
 import strawberry
 from typing import List, Optional
 from app.models import Doctor, AddressInput, AppointmentSettingsInput, ScheduleInput
-from app.services import DoctorService
+from app.services import ArchiveService, DoctorService, OnboardingService
 from app.database import db
+from app.media import remove_upload
 
 @strawberry.type
 class DoctorMutation:
@@ -14,8 +15,13 @@ class DoctorMutation:
         email: str, 
         mobile_numbers: List[str]
     ) -> Doctor:
-        check_query = "SELECT id FROM doctors WHERE email = %s OR register_no = %s"
-        existing = db.execute_one(check_query, (email, register_no))
+        check_query = """
+            SELECT id FROM doctors WHERE email = %s OR register_no = %s
+            UNION ALL
+            SELECT id FROM doctor_archive WHERE email = %s OR register_no = %s
+            LIMIT 1
+        """
+        existing = db.execute_one(check_query, (email, register_no, email, register_no))
         if existing:
             raise ValueError("Doctor already registered")
         query = """
@@ -30,6 +36,7 @@ class DoctorMutation:
                 VALUES (%s, %s)
             """
             db.execute_batch(mobile_query, [(doctor_id, mobile) for mobile in mobile_numbers])
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation
@@ -38,9 +45,8 @@ class DoctorMutation:
             UPDATE doctors SET name = %s, current_step = GREATEST(current_step, 2),
             updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
         """
-        result = db.execute_mutation(query, (name, doctor_id))
-        if not result:
-            raise ValueError(f"Doctor {doctor_id} not found")
+        result = ArchiveService.write_live(doctor_id, lambda: db.execute_mutation(query, (name, doctor_id)))
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation
@@ -49,126 +55,108 @@ class DoctorMutation:
         specializations: List[str], bio: Optional[str] = None
     ) -> Doctor:
         query = """
-            UPDATE doctors SET bio = %s, current_step = GREATEST(current_step, 3),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
+            WITH updated AS (
+                UPDATE doctors SET bio = %s, current_step = GREATEST(current_step, 3),
+                updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND (bio IS DISTINCT FROM %s OR current_step < 3) RETURNING *
+            )
+            SELECT * FROM updated
+            UNION ALL
+            SELECT * FROM doctors WHERE id = %s AND NOT EXISTS (SELECT 1 FROM updated)
         """
-        result = db.execute_mutation(query, (bio, doctor_id))
-        if not result:
-            raise ValueError(f"Doctor {doctor_id} not found")
-        db.execute_mutation("DELETE FROM qualifications WHERE doctor_id = %s", (doctor_id,))
-        db.execute_mutation("DELETE FROM specializations WHERE doctor_id = %s", (doctor_id,))
-        if qualifications:
-            qual_query = "INSERT INTO qualifications (doctor_id, qualification) VALUES (%s, %s)"
-            db.execute_batch(qual_query, [(doctor_id, q) for q in qualifications])
-        if specializations:
-            spec_query = "INSERT INTO specializations (doctor_id, specialization) VALUES (%s, %s)"
-            db.execute_batch(spec_query, [(doctor_id, s) for s in specializations])
+        result = ArchiveService.write_live(
+            doctor_id, lambda: db.execute_mutation(query, (bio, doctor_id, bio, doctor_id))
+        )
+        DoctorService.sync_qualifications(doctor_id, qualifications)
+        DoctorService.sync_specializations(doctor_id, specializations)
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation 
     def update_address(self, doctor_id: int, address_input: AddressInput) -> Doctor:
-        check = db.execute_one("SELECT id FROM addresses WHERE doctor_id = %s", (doctor_id,))
-        if check:
-            query = """
-                UPDATE addresses SET country = %s, state = %s, city = %s, pincode = %s,
-                flat_house = %s, latitude = %s, longitude = %s WHERE doctor_id = %s
-            """
-            db.execute_mutation(query, (
-                address_input.country, address_input.state, address_input.city,
-                address_input.pincode, address_input.flat_house,
-                address_input.latitude, address_input.longitude, doctor_id
-            ))
-        else:
-            query = """
-                INSERT INTO addresses (doctor_id, country, state, city, pincode, flat_house, latitude, longitude)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            db.execute_mutation(query, (
-                doctor_id, address_input.country, address_input.state, address_input.city,
-                address_input.pincode, address_input.flat_house,
-                address_input.latitude, address_input.longitude
-            ))
         query = """
+            WITH saved AS (
+                INSERT INTO addresses (doctor_id, country, state, city, pincode, flat_house, latitude, longitude)
+                SELECT id, %s, %s, %s, %s, %s, %s, %s FROM doctors WHERE id = %s
+                ON CONFLICT (doctor_id) DO UPDATE SET country = EXCLUDED.country,
+                state = EXCLUDED.state, city = EXCLUDED.city, pincode = EXCLUDED.pincode,
+                flat_house = EXCLUDED.flat_house, latitude = EXCLUDED.latitude,
+                longitude = EXCLUDED.longitude
+                RETURNING doctor_id
+            )
             UPDATE doctors SET current_step = GREATEST(current_step, 4),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
+            updated_at = CURRENT_TIMESTAMP WHERE id = (SELECT doctor_id FROM saved) RETURNING *
         """
-        result = db.execute_mutation(query, (doctor_id,))
+        params = (
+            address_input.country, address_input.state, address_input.city,
+            address_input.pincode, address_input.flat_house,
+            address_input.latitude, address_input.longitude, doctor_id
+        )
+        result = ArchiveService.write_live(doctor_id, lambda: db.execute_mutation(query, params))
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation
     def update_appointment_settings(
         self, doctor_id: int, settings: AppointmentSettingsInput
     ) -> Doctor:
-        check = db.execute_one("SELECT id FROM appointment_settings WHERE doctor_id = %s", (doctor_id,))
-        if check:
-            query = """
-                UPDATE appointment_settings SET consultation_charge = %s, follow_up_charge = %s,
-                follow_up_period_days = %s, advance_booking_days = %s, avg_duration_minutes = %s
-                WHERE doctor_id = %s
-            """
-            db.execute_mutation(query, (
-                settings.consultation_charge, settings.follow_up_charge,
-                settings.follow_up_period_days, settings.advance_booking_days,
-                settings.avg_duration_minutes, doctor_id
-            ))
-        else:
-            query = """
+        query = """
+            WITH saved AS (
                 INSERT INTO appointment_settings
                 (doctor_id, consultation_charge, follow_up_charge, follow_up_period_days,
                  advance_booking_days, avg_duration_minutes)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            db.execute_mutation(query, (
-                doctor_id, settings.consultation_charge, settings.follow_up_charge,
-                settings.follow_up_period_days, settings.advance_booking_days,
-                settings.avg_duration_minutes
-            ))
-        query = """
+                SELECT id, %s, %s, %s, %s, %s FROM doctors WHERE id = %s
+                ON CONFLICT (doctor_id) DO UPDATE SET
+                consultation_charge = EXCLUDED.consultation_charge,
+                follow_up_charge = EXCLUDED.follow_up_charge,
+                follow_up_period_days = EXCLUDED.follow_up_period_days,
+                advance_booking_days = EXCLUDED.advance_booking_days,
+                avg_duration_minutes = EXCLUDED.avg_duration_minutes
+                RETURNING doctor_id
+            )
             UPDATE doctors SET current_step = GREATEST(current_step, 5),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
+            updated_at = CURRENT_TIMESTAMP WHERE id = (SELECT doctor_id FROM saved) RETURNING *
         """
-        result = db.execute_mutation(query, (doctor_id,))
+        params = (
+            settings.consultation_charge, settings.follow_up_charge,
+            settings.follow_up_period_days, settings.advance_booking_days,
+            settings.avg_duration_minutes, doctor_id
+        )
+        result = ArchiveService.write_live(doctor_id, lambda: db.execute_mutation(query, params))
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation
     def update_schedule(self, doctor_id: int, schedules: List[ScheduleInput]) -> Doctor:
-        db.execute_mutation("DELETE FROM schedules WHERE doctor_id = %s", (doctor_id,))
-        if schedules:
-            query = """
-                INSERT INTO schedules (doctor_id, day_of_week, start_time, end_time, is_available)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            db.execute_batch(query, [
-                (doctor_id, s.day_of_week, s.start_time, s.end_time, s.is_available)
-                for s in schedules
-            ])
-        query = """
-            UPDATE doctors SET current_step = GREATEST(current_step, 6),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
-        """
-        result = db.execute_mutation(query, (doctor_id,))
+        def save():
+            DoctorService.sync_schedules(doctor_id, schedules)
+            return DoctorService.advance_step(doctor_id, 6)
+        result = ArchiveService.write_live(doctor_id, save)
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation
     def add_departments(self, doctor_id: int, department_ids: List[int]) -> Doctor:
-        db.execute_mutation("DELETE FROM doctor_departments WHERE doctor_id = %s", (doctor_id,))
-        if department_ids:
-            query = "INSERT INTO doctor_departments (doctor_id, department_id) VALUES (%s, %s)"
-            db.execute_batch(query, [(doctor_id, dept_id) for dept_id in department_ids])
-        query = """
-            UPDATE doctors SET current_step = GREATEST(current_step, 7),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
-        """
-        result = db.execute_mutation(query, (doctor_id,))
+        def save():
+            DoctorService.sync_departments(doctor_id, department_ids)
+            return DoctorService.advance_step(doctor_id, 7)
+        result = ArchiveService.write_live(doctor_id, save)
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
 
     @strawberry.mutation 
     def update_profile_image(self, doctor_id: int, image_url: str) -> Doctor:
         query = """
-            UPDATE doctors SET profile_image_url = %s, current_step = GREATEST(current_step, 8),
-            updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
+            WITH previous AS (
+                SELECT id, profile_image_key FROM doctors WHERE id = %s FOR UPDATE
+            )
+            UPDATE doctors d SET profile_image_url = %s, profile_image_key = NULL, profile_image_sizes = '{}',
+            current_step = GREATEST(d.current_step, 8), updated_at = CURRENT_TIMESTAMP
+            FROM previous WHERE d.id = previous.id
+            RETURNING d.*, previous.profile_image_key AS previous_key
         """
-        result = db.execute_mutation(query, (image_url, doctor_id))
-        if not result:
-            raise ValueError(f"Doctor {doctor_id} not found")
+        result = ArchiveService.write_live(doctor_id, lambda: db.execute_mutation(query, (doctor_id, image_url)))
+        # an external URL replaces any uploaded image, whose files are no longer used
+        remove_upload(result["previous_key"])
+        OnboardingService.after_step_saved(doctor_id)
         return DoctorService.build_complete_doctor(result)
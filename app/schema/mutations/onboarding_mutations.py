@@ -1,6 +1,6 @@
 import strawberry
-from app.models import Doctor
-from app.services import DoctorService
+from app.models import Doctor, OnboardingSubmissionInput
+from app.services import ArchiveService, DoctorService, OnboardingService
 from app.database import db
 
 @strawberry.type
@@ -12,7 +12,16 @@ class OnboardingMutation:
             UPDATE doctors SET onboarding_status = 'completed',
             updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *
         """
-        result = db.execute_mutation(query, (doctor_id,))
-        if not result:
-            raise ValueError(f"Doctor {doctor_id} not found")
+        def complete():
+            with db.transaction() as cursor:
+                cursor.execute(query, (doctor_id,))
+                result = db.fetch_row(cursor)
+                if result:
+                    OnboardingService.after_onboarding_completed(doctor_id, cursor)
+                return result
+        result = ArchiveService.write_live(doctor_id, complete)
         return DoctorService.build_complete_doctor(result)
+
+    @strawberry.mutation
+    def submit_onboarding(self, input: OnboardingSubmissionInput) -> Doctor:
+        return OnboardingService.submit_onboarding(input)
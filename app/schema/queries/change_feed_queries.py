@@ -0,0 +1,11 @@
+import strawberry
+from typing import Optional
+from app.models import DoctorChangeFeed
+from app.services import ChangeFeedService
+
+@strawberry.type
+class ChangeFeedQuery:
+
+    @strawberry.field
+    def doctor_changes(self, since: Optional[str] = None, limit: int = 100) -> DoctorChangeFeed:
+        return ChangeFeedService.get_doctor_changes(since, limit)
@@ -1,19 +1,18 @@
 import strawberry
 from typing import List, Optional
 from app.models import Doctor
-from app.services import DoctorService
-from app.database import db
+from app.services import ArchiveService, DoctorService
+from app.services.doctor_services import assembly_mode
 
 @strawberry.type
 class DoctorQuery:
 
     @strawberry.field
     def doctor(self, id: int) -> Optional[Doctor]:
-        query = "SELECT * FROM doctors WHERE id = %s"
-        result = db.execute_one(query, (id,))
-        if not result:
-            return None
-        return DoctorService.build_complete_doctor(result)
+        doctors = DoctorService.find_doctors(
+            "WHERE d.id = %s", (id,), mode=assembly_mode("doctor")
+        )
+        return doctors[0] if doctors else ArchiveService.get_archived_doctor(id)
     
     @strawberry.field
     def check_registration(
@@ -28,22 +27,28 @@ class DoctorQuery:
         params = []
         
         if email:
-            conditions.append("email = %s")
+            conditions.append("{alias}.email = %s")
             params.append(email)
         if register_no:
-            conditions.append("register_no = %s")
+            conditions.append("{alias}.register_no = %s")
             params.append(register_no)
+        where = f"WHERE {' OR '.join(conditions)}"
         
-        query = f"SELECT * FROM doctors WHERE {' OR '.join(conditions)}"
-        results = db.execute_query(query, tuple(params))
-        return [DoctorService.build_complete_doctor(row) for row in results]
+        return DoctorService.find_doctors(
+            where.format(alias="d"), tuple(params),
+            mode=assembly_mode("checkRegistration")
+        ) + ArchiveService.find_archived(where.format(alias="x"), tuple(params))
     
     @strawberry.field
-    def all_doctors(self, status: Optional[str] = None) -> List[Doctor]:
+    def all_doctors(self, status: Optional[str] = None, include_archived: bool = True) -> List[Doctor]:
+        mode = assembly_mode("allDoctors")
+        # only completed doctors are archived
+        if include_archived and status in (None, "completed"):
+            return ArchiveService.find_with_archive(
+                "WHERE {alias}.onboarding_status = %s" if status else "", (status,) if status else (), mode
+            )
         if status:
-            query = "SELECT * FROM doctors WHERE onboarding_status = %s ORDER BY created_at DESC"
-            results = db.execute_query(query, (status,))
-        else:
-            query = "SELECT * FROM doctors ORDER BY created_at DESC"
-            results = db.execute_query(query)
-        return [DoctorService.build_complete_doctor(row) for row in results]
+            return DoctorService.find_doctors(
+                "WHERE d.onboarding_status = %s", (status,), "ORDER BY d.created_at DESC", mode
+            )
+        return DoctorService.find_doctors(order_by="ORDER BY d.created_at DESC", mode=mode)
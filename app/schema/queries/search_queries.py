@@ -0,0 +1,17 @@
+import strawberry
+from typing import Optional
+from app.models import DoctorFilterInput, DoctorSearchResult
+from app.services import SearchService
+
+@strawberry.type
+class SearchQuery:
+
+    @strawberry.field
+    def search_doctors(
+        self,
+        text: Optional[str] = None,
+        filters: Optional[DoctorFilterInput] = None,
+        first: int = 20,
+        after: Optional[str] = None
+    ) -> DoctorSearchResult:
+        return SearchService.search_doctors(text, filters, first, after)
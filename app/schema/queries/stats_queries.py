@@ -0,0 +1,11 @@
+import strawberry
+from typing import Optional
+from app.models import DoctorFilterInput, DoctorStats
+from app.services import StatsService
+
+@strawberry.type
+class StatsQuery:
+
+    @strawberry.field
+    def doctor_stats(self, filters: Optional[DoctorFilterInput] = None) -> DoctorStats:
+        return StatsService.get_doctor_stats(filters)
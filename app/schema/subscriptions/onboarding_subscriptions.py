@@ -0,0 +1,18 @@
+import strawberry
+from typing import AsyncGenerator, Optional
+from app.models import OnboardingProgressEvent
+from app.notifications import onboarding_listener
+
+@strawberry.type
+class OnboardingSubscription:
+
+    @strawberry.subscription
+    async def onboarding_progress(
+        self, doctor_id: Optional[int] = None
+    ) -> AsyncGenerator[OnboardingProgressEvent, None]:
+        async for payload in onboarding_listener.subscribe(doctor_id):
+            yield OnboardingProgressEvent(
+                doctor_id=payload['doctor_id'],
+                current_step=payload['current_step'],
+                onboarding_status=payload['onboarding_status']
+            )
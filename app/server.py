@@ -0,0 +1,32 @@
+"""
+Entry point for both run modes, selected with APP_ENV:
+
+    APP_ENV=development  uvicorn, single process with --reload (default)
+    APP_ENV=production   gunicorn with one uvicorn worker per core, see app/gunicorn_conf.py
+
+    python -m app.server
+
+Pending schema migrations are applied first unless MIGRATE_ON_START=0.
+"""
+import os
+import sys
+
+APP_ENV = os.getenv("APP_ENV", "development")
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "1") == "1"
+
+
+def main():
+    if MIGRATE_ON_START:
+        from app.migrations import migrate
+        migrate()
+    if APP_ENV == "production":
+        args = ["gunicorn", "app.main:app", "--config", "python:app.gunicorn_conf"]
+        os.execvp(args[0], args + sys.argv[1:])
+    import uvicorn
+    uvicorn.run("app.main:app", host=HOST, port=PORT, reload=True)
+
+
+if __name__ == "__main__":
+    main()
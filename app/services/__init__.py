@@ -1,3 +1,9 @@
 from .doctor_services import DoctorService
 from .onboarding_services import OnboardingService
 from .department_services import DepartmentService
+from .search_services import SearchService
+from .stats_services import StatsService
+from .change_feed_services import ChangeFeedService
+from .profile_image_services import ProfileImageService
+from .archive_services import ArchiveService
+from .cleanup_services import CleanupService
@@ -0,0 +1,221 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2.errors
+from app.database import db
+from app.records import DepartmentRecord, DoctorRecord
+from app.services.doctor_services import DOCTOR_DOCUMENT_QUERY, AssemblyMode, DoctorService
+
+# completed doctors untouched for this long are moved to doctor_archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# pause between batches so archiving never holds locks for long or saturates I/O
+ARCHIVE_BATCH_PAUSE = float(os.getenv("ARCHIVE_BATCH_PAUSE", "0.5"))
+
+ARCHIVE_BATCH_QUERY = f"""
+    WITH batch AS (
+        SELECT id FROM doctors
+        WHERE onboarding_status = 'completed'
+          AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ),
+    documents AS (
+        SELECT document::jsonb AS document FROM ({DOCTOR_DOCUMENT_QUERY}
+            WHERE d.id IN (SELECT id FROM batch)) docs
+    ),
+    archived AS (
+        INSERT INTO doctor_archive (id, email, register_no, onboarding_status, created_at, updated_at, document)
+        SELECT (document->>'id')::int, document->>'email', document->>'register_no',
+               document->>'onboarding_status', (document->>'created_at')::timestamp,
+               (document->>'updated_at')::timestamp, document
+        FROM documents
+        RETURNING id
+    ),
+    deleted AS (
+        DELETE FROM doctors WHERE id IN (SELECT id FROM archived) RETURNING id
+    )
+    SELECT COUNT(*) FROM deleted
+"""
+
+# the reverse of ARCHIVE_BATCH_QUERY for one doctor, keeping its ids
+RESTORE_QUERY = """
+    WITH archived AS (
+        DELETE FROM doctor_archive WHERE id = %s RETURNING document
+    ),
+    doctor AS (
+        INSERT INTO doctors (id, register_no, email, name, bio, profile_image_url, profile_image_key,
+                             profile_image_sizes, onboarding_status, current_step, created_at, updated_at)
+        SELECT (document->>'id')::int, document->>'register_no', document->>'email',
+               document->>'name', document->>'bio', document->>'profile_image_url',
+               document->>'profile_image_key',
+               ARRAY(SELECT jsonb_array_elements_text(document->'profile_image_sizes'))::int[],
+               document->>'onboarding_status', (document->>'current_step')::int,
+               (document->>'created_at')::timestamp, (document->>'updated_at')::timestamp
+        FROM archived
+        RETURNING id
+    ),
+    mobiles AS (
+        INSERT INTO doctor_mobile_numbers (doctor_id, mobile_number)
+        SELECT doctor.id, value FROM doctor, archived,
+               jsonb_array_elements_text(archived.document->'mobile_numbers') value
+    ),
+    quals AS (
+        INSERT INTO qualifications (doctor_id, qualification, position)
+        SELECT doctor.id, value, position FROM doctor, archived,
+               jsonb_array_elements_text(archived.document->'qualifications') WITH ORDINALITY AS v(value, position)
+    ),
+    specs AS (
+        INSERT INTO specializations (doctor_id, specialization, position)
+        SELECT doctor.id, value, position FROM doctor, archived,
+               jsonb_array_elements_text(archived.document->'specializations') WITH ORDINALITY AS v(value, position)
+    ),
+    depts AS (
+        INSERT INTO doctor_departments (doctor_id, department_id)
+        SELECT doctor.id, (value->>'id')::int FROM doctor, archived,
+               jsonb_array_elements(archived.document->'departments') value
+        WHERE EXISTS (SELECT 1 FROM departments WHERE id = (value->>'id')::int)
+    ),
+    address AS (
+        INSERT INTO addresses (id, doctor_id, country, state, city, pincode, flat_house, latitude, longitude)
+        SELECT (a->>'id')::int, doctor.id, a->>'country', a->>'state', a->>'city', a->>'pincode',
+               a->>'flat_house', (a->>'latitude')::numeric, (a->>'longitude')::numeric
+        FROM doctor, archived, jsonb_extract_path(archived.document, 'address') a
+        WHERE jsonb_typeof(a) = 'object'
+    ),
+    settings AS (
+        INSERT INTO appointment_settings (id, doctor_id, consultation_charge, follow_up_charge,
+            follow_up_period_days, advance_booking_days, avg_duration_minutes)
+        SELECT (s->>'id')::int, doctor.id, (s->>'consultation_charge')::int,
+               (s->>'follow_up_charge')::int, (s->>'follow_up_period_days')::int,
+               (s->>'advance_booking_days')::int, (s->>'avg_duration_minutes')::int
+        FROM doctor, archived, jsonb_extract_path(archived.document, 'appointment_settings') s
+        WHERE jsonb_typeof(s) = 'object'
+    ),
+    schedule_rows AS (
+        INSERT INTO schedules (id, doctor_id, day_of_week, start_time, end_time, is_available)
+        SELECT (value->>'id')::int, doctor.id, (value->>'day_of_week')::int,
+               (value->>'start_time')::time, (value->>'end_time')::time,
+               (value->>'is_available')::boolean
+        FROM doctor, archived, jsonb_array_elements(archived.document->'schedules') value
+    )
+    SELECT id FROM doctor
+"""
+
+
+class ArchiveService:
+    @staticmethod
+    def archive_completed(
+        older_than_days: Optional[int] = None, batch_size: Optional[int] = None,
+        pause: Optional[float] = None, max_batches: Optional[int] = None,
+        heartbeat: Optional[Callable[[], None]] = None
+    ) -> int:
+        """
+        Move stale completed doctors into doctor_archive in batches; returns how many moved.
+
+        Each batch is one statement in its own short transaction: the doctors are
+        rendered with DOCTOR_DOCUMENT_QUERY, inserted into the archive and deleted
+        (child rows go with ON DELETE CASCADE). `heartbeat` is called after every batch.
+        """
+        older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or ARCHIVE_BATCH_SIZE
+        pause = ARCHIVE_BATCH_PAUSE if pause is None else pause
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with db.transaction() as cursor:
+                # read by record_doctor_deletion: no change feed tombstones for archived doctors
+                cursor.execute("SET LOCAL app.archiving = 'on'")
+                cursor.execute(ARCHIVE_BATCH_QUERY, (older_than_days, batch_size))
+                count = cursor.fetchone()[0]
+            moved += count
+            batches += 1
+            if heartbeat:
+                heartbeat()
+            if count < batch_size:
+                break
+            time.sleep(pause)
+        return moved
+
+    @staticmethod
+    def find_archived(where: str = "", params: tuple = (), order_by: str = "") -> List[DoctorRecord]:
+        """Archived doctors matching `where`/`order_by` (alias x)"""
+        query = f"SELECT x.document FROM doctor_archive x {where} {order_by}"
+        departments: Dict[int, DepartmentRecord] = {}
+        return [
+            DoctorService.doctor_from_document(document, departments)
+            for document in db.execute_column(query, params)
+        ]
+
+    @staticmethod
+    def get_archived_doctor(doctor_id: int) -> Optional[DoctorRecord]:
+        doctors = ArchiveService.find_archived("WHERE x.id = %s", (doctor_id,))
+        return doctors[0] if doctors else None
+
+    @staticmethod
+    def restore(doctor_id: int) -> bool:
+        """
+        Move an archived doctor back into doctors and its child tables so it can be
+        edited again; returns False when the doctor is not archived.
+        """
+        with db.transaction() as cursor:
+            cursor.execute(RESTORE_QUERY, (doctor_id,))
+            restored = cursor.fetchone() is not None
+        if restored:
+            print(f"📦 Restored doctor {doctor_id} from the archive")
+        return restored
+
+    @staticmethod
+    def write_live(doctor_id: int, write: Callable[[], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run a write that returns the doctor's row, restoring the doctor from the archive
+        and retrying when it finds no live doctor (or trips the doctors foreign key).
+        """
+        try:
+            result = write()
+        except psycopg2.errors.ForeignKeyViolation:
+            if not ArchiveService.restore(doctor_id):
+                raise
+            result = write()
+        else:
+            if result is None and ArchiveService.restore(doctor_id):
+                result = write()
+        if result is None:
+            raise ValueError(f"Doctor {doctor_id} not found")
+        return result
+
+    @staticmethod
+    def find_with_archive(
+        where: str = "", params: tuple = (), mode: AssemblyMode = AssemblyMode.BATCHED
+    ) -> List[DoctorRecord]:
+        """
+        Live and archived doctors matching `where` ({alias} is d or x), newest first.
+
+        One UNION ALL over both tables orders them; the live doctors are then assembled
+        with `mode` and archived ones come from their documents.
+        """
+        query = f"""
+            SELECT id, document FROM (
+                SELECT d.id, d.created_at, NULL::jsonb AS document FROM doctors d {where.format(alias="d")}
+                UNION ALL
+                SELECT x.id, x.created_at, x.document FROM doctor_archive x {where.format(alias="x")}
+            ) merged
+            ORDER BY created_at DESC NULLS LAST, id DESC
+        """
+        rows = db.execute_rows(query, params + params)
+        live_ids = [doctor_id for doctor_id, document in rows if document is None]
+        live = {
+            doctor.id: doctor for doctor in DoctorService.find_doctors(
+                "WHERE d.id = ANY(%s)", (live_ids,), mode=mode
+            )
+        } if live_ids else {}
+        departments: Dict[int, DepartmentRecord] = {}
+        doctors = []
+        for doctor_id, document in rows:
+            if document is None:
+                if doctor_id in live:
+                    doctors.append(live[doctor_id])
+            else:
+                doctors.append(DoctorService.doctor_from_document(document, departments))
+        return doctors
@@ -0,0 +1,70 @@
+from typing import Optional, Tuple
+from app.models import DoctorChangeFeed
+from app.database import db
+from app.services.doctor_services import DoctorService, assembly_mode
+
+MAX_CHANGES_LIMIT = 1000
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """
+    "<change_xid>.<version>" of the last change returned. Cursors from before change_xid
+    existed (a bare version) restart from the beginning rather than risk skipping changes.
+    """
+    if not cursor:
+        return 0, 0
+    try:
+        if "." not in cursor:
+            int(cursor)
+            return 0, 0
+        xid, version = cursor.split(".", 1)
+        return int(xid), int(version)
+    except ValueError:
+        raise ValueError(f"Invalid change cursor: {cursor}")
+
+
+class ChangeFeedService:
+    @staticmethod
+    def get_doctor_changes(since: Optional[str] = None, limit: int = 100) -> DoctorChangeFeed:
+        """
+        Doctors created, updated or deleted after the `since` cursor, oldest change first.
+
+        Every write to a doctor or one of its child rows stamps doctors.change_xid and
+        doctors.version, and deletes are recorded in doctor_deletions. Changes are paged in
+        (change_xid, version) order and only up to the oldest transaction still running,
+        so a write that commits late is returned on a later page instead of being skipped.
+        """
+        limit = min(max(limit, 1), MAX_CHANGES_LIMIT)
+        since_xid, since_version = decode_cursor(since)
+
+        # fetch one extra row from each source to know if there is more after this page
+        doctor_rows = db.execute_query("""
+            SELECT * FROM doctors
+            WHERE (change_xid, version) > (%s::xid8, %s)
+              AND change_xid < pg_snapshot_xmin(pg_current_snapshot())
+            ORDER BY change_xid, version LIMIT %s
+        """, (str(since_xid), since_version, limit + 1))
+        deletions = db.execute_query("""
+            SELECT doctor_id, change_xid, version FROM doctor_deletions
+            WHERE (change_xid, version) > (%s::xid8, %s)
+              AND change_xid < pg_snapshot_xmin(pg_current_snapshot())
+            ORDER BY change_xid, version LIMIT %s
+        """, (str(since_xid), since_version, limit + 1))
+
+        changes = sorted(
+            [('doctor', (int(row['change_xid']), row['version']), row) for row in doctor_rows]
+            + [('deleted', (int(row['change_xid']), row['version']), row) for row in deletions],
+            key=lambda change: change[1]
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        return DoctorChangeFeed(
+            doctors=DoctorService.assemble_doctors(
+                [row for kind, _, row in changes if kind == 'doctor'],
+                assembly_mode("doctorChanges")
+            ),
+            deleted_ids=[row['doctor_id'] for kind, _, row in changes if kind == 'deleted'],
+            cursor=".".join(map(str, changes[-1][1] if changes else (since_xid, since_version))),
+            has_more=has_more
+        )
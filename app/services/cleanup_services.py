@@ -0,0 +1,135 @@
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+import psycopg2.errors
+from app.database import db
+from app.media import MEDIA_ROOT
+from app.services.doctor_services import DOCTOR_DOCUMENT_QUERY
+
+# in-progress doctors untouched for this long (and at most at this step) are abandoned
+ABANDONED_AFTER_DAYS = int(os.getenv("ABANDONED_AFTER_DAYS", "30"))
+ABANDONED_MAX_STEP = int(os.getenv("ABANDONED_MAX_STEP", "8"))
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", "200"))
+# pause between batches, and how long a batch may wait for a row lock before backing off
+CLEANUP_BATCH_PAUSE = float(os.getenv("CLEANUP_BATCH_PAUSE", "0.5"))
+CLEANUP_LOCK_TIMEOUT = os.getenv("CLEANUP_LOCK_TIMEOUT", "2s")
+CLEANUP_EXPORT_DIR = os.getenv("CLEANUP_EXPORT_DIR", "exports")
+
+ABANDONED_CONDITION = """
+    onboarding_status = 'in_progress'
+    AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+    AND current_step <= %s
+"""
+
+DELETE_BATCH_QUERY = f"""
+    WITH batch AS (
+        SELECT id FROM doctors WHERE {ABANDONED_CONDITION}
+        ORDER BY updated_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ),
+    documents AS (
+        SELECT document::jsonb AS document FROM ({DOCTOR_DOCUMENT_QUERY}
+            WHERE d.id IN (SELECT id FROM batch)) docs
+    ),
+    deleted AS (
+        DELETE FROM doctors WHERE id IN (SELECT (document->>'id')::int FROM documents) RETURNING id
+    )
+    SELECT deleted.id, (documents.document->>'current_step')::int, documents.document::text
+    FROM documents JOIN deleted ON deleted.id = (documents.document->>'id')::int
+"""
+
+
+class CleanupService:
+    @staticmethod
+    def count_abandoned(older_than_days: int, max_step: int) -> Dict[int, int]:
+        """Abandoned doctors per current_step"""
+        query = f"""
+            SELECT current_step, COUNT(*) AS count FROM doctors
+            WHERE {ABANDONED_CONDITION}
+            GROUP BY current_step ORDER BY current_step
+        """
+        return {row['current_step']: row['count']
+                for row in db.execute_query(query, (older_than_days, max_step))}
+
+    @staticmethod
+    def delete_abandoned(
+        older_than_days: Optional[int] = None, max_step: Optional[int] = None,
+        batch_size: Optional[int] = None, pause: Optional[float] = None,
+        max_batches: Optional[int] = None, dry_run: bool = False,
+        heartbeat: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Export and delete abandoned onboardings in bounded batches; returns a report.
+
+        Each batch renders the doctors with DOCTOR_DOCUMENT_QUERY and deletes them in one
+        statement (child rows go with ON DELETE CASCADE). The documents are appended to an
+        NDJSON export and fsynced before the batch commits, so nothing is deleted that was
+        not exported. Batches skip locked rows, give up after CLEANUP_LOCK_TIMEOUT when a
+        child row is locked, and pause between each other; `heartbeat` is called after
+        every batch.
+        """
+        older_than_days = ABANDONED_AFTER_DAYS if older_than_days is None else older_than_days
+        max_step = ABANDONED_MAX_STEP if max_step is None else max_step
+        batch_size = batch_size or CLEANUP_BATCH_SIZE
+        pause = CLEANUP_BATCH_PAUSE if pause is None else pause
+        report: Dict[str, Any] = {
+            "older_than_days": older_than_days, "max_step": max_step, "dry_run": dry_run,
+            "deleted": 0, "batches": 0, "lock_timeouts": 0, "by_step": {}, "export": None,
+        }
+        if dry_run:
+            report["by_step"] = CleanupService.count_abandoned(older_than_days, max_step)
+            report["deleted"] = sum(report["by_step"].values())
+            return report
+
+        os.makedirs(CLEANUP_EXPORT_DIR, exist_ok=True)
+        export_path = os.path.join(
+            CLEANUP_EXPORT_DIR, f"abandoned-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson"
+        )
+        with open(export_path, "a") as export:
+            while max_batches is None or report["batches"] < max_batches:
+                try:
+                    with db.transaction() as cursor:
+                        cursor.execute("SET LOCAL lock_timeout = %s", (CLEANUP_LOCK_TIMEOUT,))
+                        cursor.execute(DELETE_BATCH_QUERY, (older_than_days, max_step, batch_size))
+                        rows = cursor.fetchall()
+                        for _, _, document in rows:
+                            export.write(document + "\n")
+                        export.flush()
+                        os.fsync(export.fileno())
+                except psycopg2.errors.LockNotAvailable:
+                    report["lock_timeouts"] += 1
+                    if report["lock_timeouts"] > 3:
+                        break
+                    if heartbeat:
+                        heartbeat()
+                    time.sleep(pause * 4)
+                    continue
+                report["batches"] += 1
+                report["deleted"] += len(rows)
+                for doctor_id, current_step, _ in rows:
+                    report["by_step"][current_step] = report["by_step"].get(current_step, 0) + 1
+                    shutil.rmtree(os.path.join(MEDIA_ROOT, "profile_images", str(doctor_id)), ignore_errors=True)
+                if heartbeat:
+                    heartbeat()
+                if len(rows) < batch_size:
+                    break
+                time.sleep(pause)
+        if report["deleted"]:
+            report["export"] = export_path
+        else:
+            os.remove(export_path)
+        return report
+
+
+def print_cleanup_report(report: Dict[str, Any]):
+    action = "Would delete" if report["dry_run"] else "Deleted"
+    steps = ", ".join(f"step {step}: {count}" for step, count in sorted(report["by_step"].items())) or "none"
+    print(f"🧹 {action} {report['deleted']} abandoned onboardings "
+          f"(in progress, idle {report['older_than_days']}+ days, step <= {report['max_step']}): {steps}")
+    if report["export"]:
+        print(f"   exported to {report['export']}")
+    if report["lock_timeouts"]:
+        print(f"   ⚠️ {report['lock_timeouts']} batch(es) gave up waiting for locks")
@@ -1,13 +1,13 @@
 from typing import List
 from app.models import Department
 from app.database import db
+from app.identity_map import load
 
 class DepartmentService:
     @staticmethod
     def get_all_departments() -> List[Department]:
         query = "SELECT id, name, icon_name FROM departments ORDER BY name"
-        results = db.execute_query(query)
-        return [Department(**row) for row in results]
+        return load("all_departments", None, lambda: db.execute_as(Department, query))
 
     @staticmethod
     def search_departments(search: str) -> List[Department]:
@@ -16,5 +16,7 @@ class DepartmentService:
             WHERE LOWER(name) LIKE LOWER(%s)
             ORDER BY name
         """
-        results = db.execute_query(query, (f'%{search}%',))
-        return [Department(**row) for row in results]
+        return load(
+            "department_search", search.lower(),
+            lambda: db.execute_as(Department, query, (f'%{search}%',))
+        )
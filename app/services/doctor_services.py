@@ -1,68 +1,164 @@
+import os
+from datetime import datetime
+from enum import Enum
 from typing import List, Optional, Dict
-from app.models import Doctor
 from app.database import db
-from app.models import Department, Address, AppointmentSettings, Schedule
+from app.json_codec import loads
+from app.identity_map import load, load_many, remember
+from app.models import ScheduleInput
+from app.records import (
+    AddressRecord, AppointmentSettingsRecord, DepartmentRecord, DoctorRecord, ScheduleRecord, shared
+)
+
+
+class AssemblyMode(str, Enum):
+    PER_ROW = "per_row"    # seven child queries per doctor
+    BATCHED = "batched"    # seven child queries per list of doctors
+    JSON = "json"          # one json_build_object query for the whole list
+
+
+def assembly_mode(resolver: str) -> AssemblyMode:
+    """Assembly mode for a resolver: DOCTOR_ASSEMBLY_MODE_<RESOLVER>, else DOCTOR_ASSEMBLY_MODE"""
+    default = os.getenv("DOCTOR_ASSEMBLY_MODE", AssemblyMode.BATCHED.value)
+    return AssemblyMode(os.getenv(f"DOCTOR_ASSEMBLY_MODE_{resolver.upper()}", default))
+
+
+DOCTOR_DOCUMENT_QUERY = """
+    SELECT json_build_object(
+        'id', d.id,
+        'name', d.name,
+        'email', d.email,
+        'register_no', d.register_no,
+        'bio', d.bio,
+        'profile_image_url', d.profile_image_url,
+        'profile_image_key', d.profile_image_key,
+        'profile_image_sizes', d.profile_image_sizes,
+        'onboarding_status', d.onboarding_status,
+        'current_step', d.current_step,
+        'created_at', d.created_at,
+        'updated_at', d.updated_at,
+        'mobile_numbers', COALESCE(m.items, '[]'),
+        'departments', COALESCE(dep.items, '[]'),
+        'qualifications', COALESCE(q.items, '[]'),
+        'specializations', COALESCE(sp.items, '[]'),
+        'address', a.item,
+        'appointment_settings', aps.item,
+        'schedules', COALESCE(sch.items, '[]')
+    )::text AS document
+    FROM doctors d
+    LEFT JOIN LATERAL (
+        SELECT json_agg(mobile_number ORDER BY id) AS items
+        FROM doctor_mobile_numbers WHERE doctor_id = d.id
+    ) m ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object('id', x.id, 'name', x.name, 'icon_name', x.icon_name)
+                        ORDER BY x.id) AS items
+        FROM departments x JOIN doctor_departments dd ON x.id = dd.department_id
+        WHERE dd.doctor_id = d.id
+    ) dep ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(qualification ORDER BY position, id) AS items
+        FROM qualifications WHERE doctor_id = d.id
+    ) q ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(specialization ORDER BY position, id) AS items
+        FROM specializations WHERE doctor_id = d.id
+    ) sp ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_build_object('id', id, 'country', country, 'state', state, 'city', city,
+                                 'pincode', pincode, 'flat_house', flat_house,
+                                 'latitude', latitude, 'longitude', longitude) AS item
+        FROM addresses WHERE doctor_id = d.id
+    ) a ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_build_object('id', id, 'consultation_charge', consultation_charge,
+                                 'follow_up_charge', follow_up_charge,
+                                 'follow_up_period_days', follow_up_period_days,
+                                 'advance_booking_days', advance_booking_days,
+                                 'avg_duration_minutes', avg_duration_minutes) AS item
+        FROM appointment_settings WHERE doctor_id = d.id
+    ) aps ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object('id', id, 'day_of_week', day_of_week,
+                                          'start_time', start_time::text,
+                                          'end_time', end_time::text,
+                                          'is_available', is_available)
+                        ORDER BY day_of_week) AS items
+        FROM schedules WHERE doctor_id = d.id
+    ) sch ON TRUE
+"""
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
 
 class DoctorService:
     @staticmethod
     def get_mobile_numbers(doctor_id: int) -> List[str]:
-        query = "SELECT mobile_number FROM doctor_mobile_numbers WHERE doctor_id = %s"
-        results = db.execute_query(query, (doctor_id,))
-        return [row['mobile_number'] for row in results]
+        query = "SELECT mobile_number FROM doctor_mobile_numbers WHERE doctor_id = %s ORDER BY id"
+        return load("mobile_numbers", doctor_id, lambda: db.execute_column(query, (doctor_id,)))
 
     @staticmethod
-    def get_departments(doctor_id: int) -> List[Department]:
+    def get_departments(doctor_id: int) -> List[DepartmentRecord]:
         query = """
             SELECT d.id, d.name, d.icon_name
             FROM departments d
             JOIN doctor_departments dd ON d.id = dd.department_id
             WHERE dd.doctor_id = %s
         """
-        results = db.execute_query(query, (doctor_id,))
-        return [Department(**row) for row in results]
+        return load("departments", doctor_id, lambda: db.execute_as(DepartmentRecord, query, (doctor_id,)))
 
     @staticmethod
     def get_qualifications(doctor_id: int) -> List[str]:
-        query = "SELECT qualification FROM qualifications WHERE doctor_id = %s"
-        results = db.execute_query(query, (doctor_id,))
-        return [row['qualification'] for row in results]
+        query = "SELECT qualification FROM qualifications WHERE doctor_id = %s ORDER BY position, id"
+        return load("qualifications", doctor_id, lambda: db.execute_column(query, (doctor_id,)))
 
     @staticmethod
     def get_specializations(doctor_id: int) -> List[str]:
-        query = "SELECT specialization FROM specializations WHERE doctor_id = %s"
-        results = db.execute_query(query, (doctor_id,))
-        return [row['specialization'] for row in results]
+        query = "SELECT specialization FROM specializations WHERE doctor_id = %s ORDER BY position, id"
+        return load("specializations", doctor_id, lambda: db.execute_column(query, (doctor_id,)))
 
     @staticmethod
-    def get_address(doctor_id: int) -> Optional[Address]:
+    def get_address(doctor_id: int) -> Optional[AddressRecord]:
         query = """SELECT id, country, state, city, pincode, flat_house, latitude, longitude
             FROM addresses WHERE doctor_id = %s"""
-        result = db.execute_one(query, (doctor_id,))
-        return Address(**result) if result else None
+        return load("address", doctor_id, lambda: db.execute_one_as(AddressRecord, query, (doctor_id,)))
 
     @staticmethod
-    def get_appointment_settings(doctor_id: int) -> Optional[AppointmentSettings]:
+    def get_appointment_settings(doctor_id: int) -> Optional[AppointmentSettingsRecord]:
         query = """
             SELECT id, consultation_charge, follow_up_charge, follow_up_period_days,
                    advance_booking_days, avg_duration_minutes
             FROM appointment_settings WHERE doctor_id = %s
         """
-        result = db.execute_one(query, (doctor_id,))
-        return AppointmentSettings(**result) if result else None
+        return load(
+            "appointment_settings", doctor_id,
+            lambda: db.execute_one_as(AppointmentSettingsRecord, query, (doctor_id,))
+        )
 
     @staticmethod
-    def get_schedules(doctor_id: int) -> List[Schedule]:
+    def get_schedules(doctor_id: int) -> List[ScheduleRecord]:
         query = """
             SELECT id, day_of_week, start_time::text, end_time::text, is_available
             FROM schedules WHERE doctor_id = %s ORDER BY day_of_week
         """
-        results = db.execute_query(query, (doctor_id,))
-        return [Schedule(**row) for row in results]
+        return load("schedules", doctor_id, lambda: db.execute_as(ScheduleRecord, query, (doctor_id,)))
 
     @staticmethod
-    def build_complete_doctor(doctor_data: Dict) -> Doctor:
+    def get_doctor_row(doctor_id: int) -> Optional[Dict]:
+        query = "SELECT * FROM doctors WHERE id = %s"
+        return load("doctor_row", doctor_id, lambda: db.execute_one(query, (doctor_id,)))
+
+    @staticmethod
+    def build_complete_doctor(doctor_data: Dict) -> DoctorRecord:
+        doctor_id = doctor_data['id']
+        return load("doctor", doctor_id, lambda: DoctorService.assemble_doctor(doctor_data))
+
+    @staticmethod
+    def assemble_doctor(doctor_data: Dict) -> DoctorRecord:
         doctor_id = doctor_data['id']
-        return Doctor(
+        return DoctorRecord(
             id=doctor_data['id'],
             name=doctor_data.get('name'),
             email=doctor_data.get('email'),
@@ -79,5 +175,321 @@ class DoctorService:
             appointment_settings=DoctorService.get_appointment_settings(doctor_id),
             schedules=DoctorService.get_schedules(doctor_id),
             created_at=doctor_data.get('created_at'),
-            updated_at=doctor_data.get('updated_at')
+            updated_at=doctor_data.get('updated_at'),
+            profile_image_key=doctor_data.get('profile_image_key'),
+            profile_image_sizes=doctor_data.get('profile_image_sizes')
         )
+
+    @staticmethod
+    def build_complete_doctors(doctor_rows: List[Dict]) -> List[DoctorRecord]:
+        """Assemble many doctors with one query per child table instead of per doctor"""
+        if not doctor_rows:
+            return []
+        rows_by_id = {row['id']: row for row in doctor_rows}
+        doctors = load_many(
+            "doctor", rows_by_id,
+            lambda missing: DoctorService.load_complete_doctors([rows_by_id[doctor_id] for doctor_id in missing])
+        )
+        return [doctors[row['id']] for row in doctor_rows]
+
+    @staticmethod
+    def load_complete_doctors(doctor_rows: List[Dict]) -> Dict[int, DoctorRecord]:
+        doctor_ids = [row['id'] for row in doctor_rows]
+
+        mobile_numbers: Dict[int, List[str]] = {}
+        query = "SELECT doctor_id, mobile_number FROM doctor_mobile_numbers WHERE doctor_id = ANY(%s) ORDER BY id"
+        for doctor_id, mobile_number in db.execute_rows(query, (doctor_ids,)):
+            mobile_numbers.setdefault(doctor_id, []).append(mobile_number)
+
+        departments: Dict[int, List[DepartmentRecord]] = {}
+        # every doctor in the list points at the same record for the same department
+        shared_departments: Dict[int, DepartmentRecord] = {}
+        query = """
+            SELECT dd.doctor_id, d.id, d.name, d.icon_name
+            FROM departments d
+            JOIN doctor_departments dd ON d.id = dd.department_id
+            WHERE dd.doctor_id = ANY(%s)
+        """
+        for doctor_id, department in db.execute_keyed_as(DepartmentRecord, query, (doctor_ids,)):
+            department = shared_departments.setdefault(department.id, department)
+            departments.setdefault(doctor_id, []).append(department)
+
+        qualifications: Dict[int, List[str]] = {}
+        query = """SELECT doctor_id, qualification FROM qualifications WHERE doctor_id = ANY(%s)
+            ORDER BY position, id"""
+        for doctor_id, qualification in db.execute_rows(query, (doctor_ids,)):
+            qualifications.setdefault(doctor_id, []).append(shared(qualification))
+
+        specializations: Dict[int, List[str]] = {}
+        query = """SELECT doctor_id, specialization FROM specializations WHERE doctor_id = ANY(%s)
+            ORDER BY position, id"""
+        for doctor_id, specialization in db.execute_rows(query, (doctor_ids,)):
+            specializations.setdefault(doctor_id, []).append(shared(specialization))
+
+        query = """SELECT doctor_id, id, country, state, city, pincode, flat_house, latitude, longitude
+            FROM addresses WHERE doctor_id = ANY(%s)"""
+        addresses: Dict[int, AddressRecord] = dict(db.execute_keyed_as(AddressRecord, query, (doctor_ids,)))
+
+        query = """
+            SELECT doctor_id, id, consultation_charge, follow_up_charge, follow_up_period_days,
+                   advance_booking_days, avg_duration_minutes
+            FROM appointment_settings WHERE doctor_id = ANY(%s)
+        """
+        appointment_settings: Dict[int, AppointmentSettingsRecord] = dict(
+            db.execute_keyed_as(AppointmentSettingsRecord, query, (doctor_ids,))
+        )
+
+        schedules: Dict[int, List[ScheduleRecord]] = {}
+        query = """
+            SELECT doctor_id, id, day_of_week, start_time::text, end_time::text, is_available
+            FROM schedules WHERE doctor_id = ANY(%s) ORDER BY day_of_week
+        """
+        for doctor_id, schedule in db.execute_keyed_as(ScheduleRecord, query, (doctor_ids,)):
+            schedules.setdefault(doctor_id, []).append(schedule)
+
+        return {
+            row['id']: DoctorRecord(
+                id=row['id'],
+                name=row.get('name'),
+                email=row.get('email'),
+                mobile_numbers=mobile_numbers.get(row['id'], []),
+                register_no=row.get('register_no'),
+                bio=row.get('bio'),
+                profile_image_url=row.get('profile_image_url'),
+                onboarding_status=row.get('onboarding_status', 'in_progress'),
+                current_step=row.get('current_step', 1),
+                departments=departments.get(row['id'], []),
+                qualifications=qualifications.get(row['id'], []),
+                specializations=specializations.get(row['id'], []),
+                address=addresses.get(row['id']),
+                appointment_settings=appointment_settings.get(row['id']),
+                schedules=schedules.get(row['id'], []),
+                created_at=row.get('created_at'),
+                updated_at=row.get('updated_at'),
+                profile_image_key=row.get('profile_image_key'),
+                profile_image_sizes=row.get('profile_image_sizes')
+            )
+            for row in doctor_rows
+        }
+
+    @staticmethod
+    def advance_step(doctor_id: int, step: int) -> Optional[Dict]:
+        """Raise current_step to `step` and return the doctor row, without writing if already there"""
+        query = """
+            WITH advanced AS (
+                UPDATE doctors SET current_step = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND current_step < %s RETURNING *
+            )
+            SELECT * FROM advanced
+            UNION ALL
+            SELECT * FROM doctors WHERE id = %s AND NOT EXISTS (SELECT 1 FROM advanced)
+        """
+        return db.execute_mutation(query, (step, doctor_id, step, doctor_id))
+
+    @staticmethod
+    def sync_values(table: str, column: str, doctor_id: int, values: List[str]) -> int:
+        """
+        Make the doctor's rows in an ordered child table (qualifications, specializations)
+        match `values`, order and duplicates included, in one statement.
+
+        Existing rows are matched to submitted values by value and occurrence; matched
+        rows only get their position updated when it moved, missing values are inserted
+        and unmatched rows deleted, so saving an unchanged list writes nothing. Returns
+        the number of rows changed.
+        """
+        query = f"""
+            WITH wanted AS (
+                SELECT value, position::int AS position,
+                       row_number() OVER (PARTITION BY value ORDER BY position) AS occurrence
+                FROM unnest(%s::text[]) WITH ORDINALITY AS v(value, position)
+            ),
+            existing AS (
+                SELECT id, {column} AS value, position,
+                       row_number() OVER (PARTITION BY {column} ORDER BY position, id) AS occurrence
+                FROM {table} WHERE doctor_id = %s
+            ),
+            matched AS (
+                SELECT e.id, e.position AS old_position, w.position
+                FROM existing e JOIN wanted w USING (value, occurrence)
+            ),
+            removed AS (
+                DELETE FROM {table} t
+                WHERE t.id IN (SELECT id FROM existing) AND t.id NOT IN (SELECT id FROM matched)
+                RETURNING 1
+            ),
+            moved AS (
+                UPDATE {table} t SET position = m.position
+                FROM matched m
+                WHERE t.id = m.id AND m.old_position <> m.position
+                RETURNING 1
+            ),
+            added AS (
+                INSERT INTO {table} (doctor_id, {column}, position)
+                SELECT %s, w.value, w.position FROM wanted w
+                WHERE NOT EXISTS (SELECT 1 FROM matched m WHERE m.position = w.position)
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM removed) + (SELECT COUNT(*) FROM moved)
+                 + (SELECT COUNT(*) FROM added) AS changes
+        """
+        result = db.execute_mutation(query, (list(values), doctor_id, doctor_id))
+        return result['changes'] if result else 0
+
+    @staticmethod
+    def sync_qualifications(doctor_id: int, qualifications: List[str]) -> int:
+        return DoctorService.sync_values("qualifications", "qualification", doctor_id, qualifications)
+
+    @staticmethod
+    def sync_specializations(doctor_id: int, specializations: List[str]) -> int:
+        return DoctorService.sync_values("specializations", "specialization", doctor_id, specializations)
+
+    @staticmethod
+    def sync_departments(doctor_id: int, department_ids: List[int]) -> int:
+        """
+        Make the doctor's departments the set `department_ids` in one statement; only
+        missing ones are inserted and unwanted ones deleted. Returns the rows changed.
+        """
+        query = """
+            WITH wanted AS (
+                SELECT DISTINCT unnest(%s::int[]) AS value
+            ),
+            removed AS (
+                DELETE FROM doctor_departments t
+                WHERE t.doctor_id = %s AND t.department_id NOT IN (SELECT value FROM wanted)
+                RETURNING 1
+            ),
+            added AS (
+                INSERT INTO doctor_departments (doctor_id, department_id)
+                SELECT %s, w.value FROM wanted w
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM doctor_departments t WHERE t.doctor_id = %s AND t.department_id = w.value
+                )
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM removed) + (SELECT COUNT(*) FROM added) AS changes
+        """
+        result = db.execute_mutation(query, (list(department_ids), doctor_id, doctor_id, doctor_id))
+        return result['changes'] if result else 0
+
+    @staticmethod
+    def sync_schedules(doctor_id: int, schedules: List[ScheduleInput]) -> int:
+        """Diff schedules on (day_of_week, start_time, end_time), updating is_available in place"""
+        query = """
+            WITH wanted AS (
+                SELECT DISTINCT ON (day_of_week, start_time, end_time) *
+                FROM unnest(%s::int[], %s::time[], %s::time[], %s::boolean[])
+                    AS w(day_of_week, start_time, end_time, is_available)
+            ),
+            removed AS (
+                DELETE FROM schedules s
+                WHERE s.doctor_id = %s AND NOT EXISTS (
+                    SELECT 1 FROM wanted w
+                    WHERE w.day_of_week = s.day_of_week
+                      AND w.start_time = s.start_time AND w.end_time = s.end_time
+                )
+                RETURNING 1
+            ),
+            changed AS (
+                UPDATE schedules s SET is_available = w.is_available
+                FROM wanted w
+                WHERE s.doctor_id = %s AND w.day_of_week = s.day_of_week
+                  AND w.start_time = s.start_time AND w.end_time = s.end_time
+                  AND s.is_available IS DISTINCT FROM w.is_available
+                RETURNING 1
+            ),
+            added AS (
+                INSERT INTO schedules (doctor_id, day_of_week, start_time, end_time, is_available)
+                SELECT %s, w.day_of_week, w.start_time, w.end_time, w.is_available
+                FROM wanted w
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM schedules s
+                    WHERE s.doctor_id = %s AND s.day_of_week = w.day_of_week
+                      AND s.start_time = w.start_time AND s.end_time = w.end_time
+                )
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM removed) + (SELECT COUNT(*) FROM changed)
+                 + (SELECT COUNT(*) FROM added) AS changes
+        """
+        result = db.execute_mutation(query, (
+            [s.day_of_week for s in schedules],
+            [s.start_time for s in schedules],
+            [s.end_time for s in schedules],
+            [s.is_available for s in schedules],
+            doctor_id, doctor_id, doctor_id, doctor_id
+        ))
+        return result['changes'] if result else 0
+
+    @staticmethod
+    def doctor_from_document(
+        document: Dict, departments: Optional[Dict[int, DepartmentRecord]] = None
+    ) -> DoctorRecord:
+        """
+        Build a DoctorRecord from a decoded DOCTOR_DOCUMENT_QUERY document; pass the same
+        `departments` dict for a whole list so its doctors share department records
+        """
+        departments = {} if departments is None else departments
+        address = document['address']
+        appointment_settings = document['appointment_settings']
+        return DoctorRecord(
+            id=document['id'],
+            name=document['name'],
+            email=document['email'],
+            mobile_numbers=document['mobile_numbers'],
+            register_no=document['register_no'],
+            bio=document['bio'],
+            profile_image_url=document['profile_image_url'],
+            onboarding_status=document['onboarding_status'] or 'in_progress',
+            current_step=document['current_step'] or 1,
+            departments=[
+                departments.get(item['id']) or departments.setdefault(item['id'], DepartmentRecord(**item))
+                for item in document['departments']
+            ],
+            qualifications=[shared(value) for value in document['qualifications']],
+            specializations=[shared(value) for value in document['specializations']],
+            address=AddressRecord(**address) if address else None,
+            appointment_settings=AppointmentSettingsRecord(**appointment_settings) if appointment_settings else None,
+            schedules=[ScheduleRecord(**item) for item in document['schedules']],
+            created_at=parse_timestamp(document['created_at']),
+            updated_at=parse_timestamp(document['updated_at']),
+            profile_image_key=document['profile_image_key'],
+            profile_image_sizes=document['profile_image_sizes']
+        )
+
+    @staticmethod
+    def query_doctor_documents(where: str = "", params: tuple = (), order_by: str = "") -> List[DoctorRecord]:
+        """Select and fully assemble doctors in a single statement (`where`/`order_by` use alias d)"""
+        documents = db.execute_column(f"{DOCTOR_DOCUMENT_QUERY} {where} {order_by}", params)
+        departments: Dict[int, DepartmentRecord] = {}
+        doctors = [DoctorService.doctor_from_document(loads(document), departments) for document in documents]
+        for doctor in doctors:
+            remember("doctor", doctor.id, doctor)
+        return doctors
+
+    @staticmethod
+    def find_doctors(
+        where: str = "", params: tuple = (), order_by: str = "",
+        mode: AssemblyMode = AssemblyMode.BATCHED
+    ) -> List[DoctorRecord]:
+        """Select doctors with `where`/`order_by` (alias d) and assemble them with `mode`"""
+        if mode == AssemblyMode.JSON:
+            return DoctorService.query_doctor_documents(where, params, order_by)
+        rows = db.execute_query(f"SELECT d.* FROM doctors d {where} {order_by}", params)
+        for row in rows:
+            remember("doctor_row", row['id'], row)
+        return DoctorService.assemble_doctors(rows, mode)
+
+    @staticmethod
+    def assemble_doctors(doctor_rows: List[Dict], mode: AssemblyMode = AssemblyMode.BATCHED) -> List[DoctorRecord]:
+        """Assemble already selected doctor rows with `mode`"""
+        if not doctor_rows:
+            return []
+        if mode == AssemblyMode.PER_ROW:
+            return [DoctorService.build_complete_doctor(row) for row in doctor_rows]
+        if mode == AssemblyMode.JSON:
+            by_id = load_many("doctor", [row['id'] for row in doctor_rows], lambda missing: {
+                doctor.id: doctor
+                for doctor in DoctorService.query_doctor_documents("WHERE d.id = ANY(%s)", (missing,))
+            })
+            return [by_id[row['id']] for row in doctor_rows if row['id'] in by_id]
+        return DoctorService.build_complete_doctors(doctor_rows)
@@ -1,15 +1,20 @@
-from typing import Optional, List
-from app.models import OnboardingMetadata
+from typing import Optional, List, Tuple
+import psycopg2.errors
+from app.models import OnboardingMetadata, OnboardingSubmissionInput
+from app.records import DoctorRecord
 from app.database import db
+from app.jobs import enqueue
+from app.services.archive_services import ArchiveService
 from app.services.doctor_services import DoctorService
+from app.services.stats_services import STATS_SOURCE
 
 class OnboardingService:
     @staticmethod
     def get_onboarding_metadata(doctor_id: int) -> Optional[OnboardingMetadata]:
-        query = "SELECT * FROM doctors WHERE id = %s"
-        doctor = db.execute_one(query, (doctor_id,))
+        doctor = DoctorService.get_doctor_row(doctor_id)
         if not doctor:
-            return None
+            archived = ArchiveService.get_archived_doctor(doctor_id)
+            return OnboardingService.metadata_from_doctor(archived) if archived else None
         
         completed_steps: List[int] = [1]
         
@@ -34,3 +39,166 @@ class OnboardingService:
             current_step=doctor.get('current_step', 1),
             is_complete=doctor.get('onboarding_status') == 'completed'
         )
+
+    @staticmethod
+    def metadata_from_doctor(doctor: DoctorRecord) -> OnboardingMetadata:
+        """Onboarding metadata of an already assembled (e.g. archived) doctor"""
+        filled = [doctor.name, doctor.qualifications, doctor.address, doctor.appointment_settings,
+                  doctor.schedules, doctor.departments, doctor.profile_image_url]
+        return OnboardingMetadata(
+            total_steps=8,
+            completed_steps=[1] + [step for step, value in enumerate(filled, 2) if value],
+            current_step=doctor.current_step,
+            is_complete=doctor.onboarding_status == 'completed'
+        )
+
+    @staticmethod
+    def after_step_saved(doctor_id: int, cursor=None):
+        """
+        Queue the follow-up work of a saved onboarding step (runs in app.worker), in the
+        step's transaction when given its cursor.
+
+        Without one the step has already committed, so a failure here is only logged:
+        the periodic stats refresh catches up and the client must not retry a saved step.
+        """
+        if STATS_SOURCE != "materialized":
+            return
+        # one pending refresh covers every step saved before it runs
+        if cursor is not None:
+            enqueue("doctor_stats.refresh", dedupe_key="doctor_stats.refresh", cursor=cursor)
+            return
+        try:
+            enqueue("doctor_stats.refresh", dedupe_key="doctor_stats.refresh")
+        except Exception as e:
+            print(f"⚠️ Could not queue the stats refresh for doctor {doctor_id}: {e}")
+
+    @staticmethod
+    def after_onboarding_completed(doctor_id: int, cursor):
+        """
+        Queue registration verification and the confirmation email for a completed doctor
+        in the transaction (`cursor`) that completed it, so neither is lost or sent early
+        """
+        enqueue("onboarding.verify_registration", {"doctor_id": doctor_id},
+                dedupe_key=f"onboarding.verify_registration:{doctor_id}", cursor=cursor)
+        enqueue("onboarding.send_confirmation", {"doctor_id": doctor_id},
+                dedupe_key=f"onboarding.send_confirmation:{doctor_id}", cursor=cursor)
+        OnboardingService.after_step_saved(doctor_id, cursor)
+
+    @staticmethod
+    def submitted_steps(submission: OnboardingSubmissionInput) -> List[int]:
+        """Onboarding steps covered by a submission, numbered like the step mutations"""
+        steps = [1]
+        if submission.name:
+            steps.append(2)
+        if submission.qualifications or submission.specializations or submission.bio:
+            steps.append(3)
+        if submission.address:
+            steps.append(4)
+        if submission.appointment_settings:
+            steps.append(5)
+        if submission.schedules:
+            steps.append(6)
+        if submission.department_ids:
+            steps.append(7)
+        if submission.profile_image_url:
+            steps.append(8)
+        return steps
+
+    @staticmethod
+    def build_submission_query(submission: OnboardingSubmissionInput) -> Tuple[str, tuple]:
+        """One INSERT ... RETURNING for the doctor plus a data-modifying CTE per child table"""
+        ctes = ["""
+            doctor AS (
+                INSERT INTO doctors (register_no, email, name, bio, profile_image_url,
+                                     current_step, onboarding_status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                RETURNING *
+            )"""]
+        params: list = [
+            submission.register_no, submission.email, submission.name, submission.bio,
+            submission.profile_image_url, max(OnboardingService.submitted_steps(submission)),
+            'completed' if submission.complete else 'in_progress'
+        ]
+
+        def insert_values(name: str, table: str, column: str, array_type: str, values: List):
+            ctes.append(f"""
+            {name} AS (
+                INSERT INTO {table} (doctor_id, {column})
+                SELECT doctor.id, value FROM doctor, unnest(%s::{array_type}) AS value
+            )""")
+            params.append(values)
+
+        def insert_ordered_values(name: str, table: str, column: str, values: List[str]):
+            ctes.append(f"""
+            {name} AS (
+                INSERT INTO {table} (doctor_id, {column}, position)
+                SELECT doctor.id, value, position
+                FROM doctor, unnest(%s::text[]) WITH ORDINALITY AS v(value, position)
+            )""")
+            params.append(values)
+
+        if submission.mobile_numbers:
+            insert_values("mobiles", "doctor_mobile_numbers", "mobile_number", "text[]",
+                          submission.mobile_numbers)
+        if submission.qualifications:
+            insert_ordered_values("quals", "qualifications", "qualification", submission.qualifications)
+        if submission.specializations:
+            insert_ordered_values("specs", "specializations", "specialization",
+                                  submission.specializations)
+        if submission.department_ids:
+            insert_values("depts", "doctor_departments", "department_id", "int[]",
+                          sorted(set(submission.department_ids)))
+        if submission.address:
+            address = submission.address
+            ctes.append("""
+            address AS (
+                INSERT INTO addresses (doctor_id, country, state, city, pincode, flat_house,
+                                       latitude, longitude)
+                SELECT doctor.id, %s, %s, %s, %s, %s, %s, %s FROM doctor
+            )""")
+            params += [address.country, address.state, address.city, address.pincode,
+                       address.flat_house, address.latitude, address.longitude]
+        if submission.appointment_settings:
+            settings = submission.appointment_settings
+            ctes.append("""
+            settings AS (
+                INSERT INTO appointment_settings (doctor_id, consultation_charge, follow_up_charge,
+                    follow_up_period_days, advance_booking_days, avg_duration_minutes)
+                SELECT doctor.id, %s, %s, %s, %s, %s FROM doctor
+            )""")
+            params += [settings.consultation_charge, settings.follow_up_charge,
+                       settings.follow_up_period_days, settings.advance_booking_days,
+                       settings.avg_duration_minutes]
+        if submission.schedules:
+            schedules = submission.schedules
+            ctes.append("""
+            schedule_rows AS (
+                INSERT INTO schedules (doctor_id, day_of_week, start_time, end_time, is_available)
+                SELECT doctor.id, s.day_of_week, s.start_time, s.end_time, s.is_available
+                FROM doctor, unnest(%s::int[], %s::time[], %s::time[], %s::boolean[])
+                    AS s(day_of_week, start_time, end_time, is_available)
+            )""")
+            params += [[s.day_of_week for s in schedules], [s.start_time for s in schedules],
+                       [s.end_time for s in schedules], [s.is_available for s in schedules]]
+
+        query = f"WITH {','.join(ctes)}\nSELECT * FROM doctor"
+        return query, tuple(params)
+
+    @staticmethod
+    def submit_onboarding(submission: OnboardingSubmissionInput) -> DoctorRecord:
+        """Create a doctor with every onboarding step in one statement and return it"""
+        query, params = OnboardingService.build_submission_query(submission)
+        try:
+            with db.transaction() as cursor:
+                cursor.execute(query, params)
+                result = db.fetch_row(cursor)
+                if submission.complete:
+                    OnboardingService.after_onboarding_completed(result['id'], cursor)
+                else:
+                    OnboardingService.after_step_saved(result['id'], cursor)
+        except psycopg2.errors.UniqueViolation:
+            raise ValueError("Doctor already registered")
+        except psycopg2.errors.ForeignKeyViolation:
+            raise ValueError("Unknown department in departmentIds")
+        doctors = DoctorService.query_doctor_documents("WHERE d.id = %s", (result['id'],))
+        return doctors[0]
@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+from app.database import db
+
+
+class ProfileImageService:
+    @staticmethod
+    def attach_upload(doctor_id: int, url: str, key: str) -> Optional[Dict]:
+        """
+        Point the doctor at a freshly uploaded original; variants follow once resized.
+        The row carries previous_key, the upload it replaced, for media.remove_upload
+        """
+        # the row lock makes concurrent uploads each see the key they replace
+        query = """
+            WITH previous AS (
+                SELECT id, profile_image_key FROM doctors WHERE id = %s FOR UPDATE
+            )
+            UPDATE doctors d SET profile_image_url = %s, profile_image_key = %s, profile_image_sizes = '{}',
+            current_step = GREATEST(d.current_step, 8), updated_at = CURRENT_TIMESTAMP
+            FROM previous WHERE d.id = previous.id
+            RETURNING d.*, previous.profile_image_key AS previous_key
+        """
+        return db.execute_mutation(query, (doctor_id, url, key))
+
+    @staticmethod
+    def mark_variants_ready(doctor_id: int, key: str, sizes: List[int]):
+        # skipped when another image was uploaded while this one was being resized
+        query = """
+            UPDATE doctors SET profile_image_sizes = %s
+            WHERE id = %s AND profile_image_key = %s
+        """
+        db.execute_mutation(query, (sizes, doctor_id, key))
@@ -0,0 +1,129 @@
+import base64
+import re
+from typing import List, Optional, Tuple
+from app.models import DoctorFilterInput, DoctorSearchResult, FacetCount
+from app.database import db
+from app.services.doctor_services import DoctorService, assembly_mode
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        kind, value = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        if kind != "offset":
+            raise ValueError
+        return max(int(value), 0)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def build_prefix_tsquery(text: Optional[str]) -> Optional[str]:
+    """Turn free text into a tsquery where every word is a prefix match ("car sur" -> "car:* & sur:*")"""
+    terms = re.findall(r"\w+", (text or "").lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+class SearchService:
+    @staticmethod
+    def build_filter_conditions(
+        filters: Optional[DoctorFilterInput], alias: str = "d"
+    ) -> Tuple[List[str], List]:
+        conditions: List[str] = []
+        params: List = []
+        if not filters:
+            return conditions, params
+        if filters.status:
+            conditions.append(f"{alias}.onboarding_status = %s")
+            params.append(filters.status.value)
+        if filters.department_id:
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM doctor_departments dd
+                WHERE dd.doctor_id = {alias}.id AND dd.department_id = %s)""")
+            params.append(filters.department_id)
+        if filters.city:
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM addresses a
+                WHERE a.doctor_id = {alias}.id AND LOWER(a.city) = LOWER(%s))""")
+            params.append(filters.city)
+        return conditions, params
+
+    @staticmethod
+    def search_doctors(
+        text: Optional[str] = None,
+        filters: Optional[DoctorFilterInput] = None,
+        first: int = 20,
+        after: Optional[str] = None
+    ) -> DoctorSearchResult:
+        first = min(max(first, 1), MAX_PAGE_SIZE)
+        offset = decode_cursor(after)
+        tsquery = build_prefix_tsquery(text)
+
+        conditions, params = SearchService.build_filter_conditions(filters)
+        if tsquery:
+            conditions.insert(0, "d.search_vector @@ to_tsquery('simple', %s)")
+            params.insert(0, tsquery)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if tsquery:
+            query = f"""
+                SELECT d.*, ts_rank_cd(d.search_vector, to_tsquery('simple', %s)) AS rank
+                FROM doctors d {where}
+                ORDER BY rank DESC, d.id
+                LIMIT %s OFFSET %s
+            """
+            page_params = (tsquery, *params, first + 1, offset)
+        else:
+            query = f"""
+                SELECT d.* FROM doctors d {where}
+                ORDER BY d.created_at DESC, d.id
+                LIMIT %s OFFSET %s
+            """
+            page_params = (*params, first + 1, offset)
+        rows = db.execute_query(query, page_params)
+        has_next_page = len(rows) > first
+        rows = rows[:first]
+
+        facet_query = f"""
+            WITH matched AS (SELECT d.id FROM doctors d {where})
+            SELECT 'department' AS facet, dep.name AS value, COUNT(*) AS count
+            FROM matched m
+            JOIN doctor_departments dd ON dd.doctor_id = m.id
+            JOIN departments dep ON dep.id = dd.department_id
+            GROUP BY dep.name
+            UNION ALL
+            SELECT 'city', a.city, COUNT(*)
+            FROM matched m JOIN addresses a ON a.doctor_id = m.id
+            WHERE a.city IS NOT NULL
+            GROUP BY a.city
+            UNION ALL
+            SELECT 'total', NULL, COUNT(*) FROM matched
+            ORDER BY count DESC, value
+        """
+        total_count = 0
+        departments: List[FacetCount] = []
+        cities: List[FacetCount] = []
+        for row in db.execute_query(facet_query, tuple(params)):
+            if row['facet'] == 'total':
+                total_count = row['count']
+            elif row['facet'] == 'department':
+                departments.append(FacetCount(value=row['value'], count=row['count']))
+            else:
+                cities.append(FacetCount(value=row['value'], count=row['count']))
+
+        return DoctorSearchResult(
+            doctors=DoctorService.assemble_doctors(rows, assembly_mode("searchDoctors")),
+            total_count=total_count,
+            departments=departments,
+            cities=cities,
+            end_cursor=encode_cursor(offset + len(rows)) if rows else after,
+            has_next_page=has_next_page
+        )
@@ -0,0 +1,81 @@
+import os
+from typing import List, Optional, Tuple
+from app.models import DoctorFilterInput, DoctorStats, FacetCount
+from app.database import db
+
+# "live" aggregates the base tables on every call, "materialized" reads the
+# doctor_stats_facts view which is refreshed in the background
+STATS_SOURCE = os.getenv("DOCTOR_STATS_SOURCE", "live")
+STATS_REFRESH_SECONDS = int(os.getenv("DOCTOR_STATS_REFRESH_SECONDS", "60"))
+
+LIVE_FACTS = """
+    SELECT d.id AS doctor_id, d.onboarding_status, d.current_step,
+           COALESCE(dd.department_id, 0) AS department_id, dep.name AS department, a.city
+    FROM doctors d
+    LEFT JOIN doctor_departments dd ON dd.doctor_id = d.id
+    LEFT JOIN departments dep ON dep.id = dd.department_id
+    LEFT JOIN LATERAL (
+        SELECT city FROM addresses WHERE doctor_id = d.id ORDER BY id LIMIT 1
+    ) a ON TRUE
+    UNION ALL
+    SELECT x.id, x.onboarding_status, (x.document->>'current_step')::int,
+           COALESCE((dep->>'id')::int, 0), dep->>'name', x.document->'address'->>'city'
+    FROM doctor_archive x
+    LEFT JOIN LATERAL jsonb_array_elements(x.document->'departments') dep ON TRUE
+"""
+
+# GROUPING(onboarding_status, department, city, current_step) for each grouping set
+STATUS_SET, DEPARTMENT_SET, CITY_SET, STEP_SET, TOTAL_SET = 7, 11, 13, 14, 15
+
+
+class StatsService:
+    @staticmethod
+    def build_filter_conditions(filters: Optional[DoctorFilterInput]) -> Tuple[List[str], List]:
+        conditions: List[str] = []
+        params: List = []
+        if not filters:
+            return conditions, params
+        if filters.status:
+            conditions.append("onboarding_status = %s")
+            params.append(filters.status.value)
+        if filters.department_id:
+            conditions.append("department_id = %s")
+            params.append(filters.department_id)
+        if filters.city:
+            conditions.append("LOWER(city) = LOWER(%s)")
+            params.append(filters.city)
+        return conditions, params
+
+    @staticmethod
+    def get_doctor_stats(filters: Optional[DoctorFilterInput] = None) -> DoctorStats:
+        source = "doctor_stats_facts" if STATS_SOURCE == "materialized" else f"({LIVE_FACTS}) f"
+        conditions, params = StatsService.build_filter_conditions(filters)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT onboarding_status, department, city, current_step,
+                   GROUPING(onboarding_status, department, city, current_step) AS grouping_set,
+                   COUNT(DISTINCT doctor_id) AS count
+            FROM {source} {where}
+            GROUP BY GROUPING SETS (
+                (onboarding_status), (department), (city), (current_step), ()
+            )
+            ORDER BY count DESC
+        """
+        stats = DoctorStats(total=0, by_status=[], by_department=[], by_city=[], by_step=[])
+        for row in db.execute_query(query, tuple(params)):
+            grouping_set = row['grouping_set']
+            if grouping_set == TOTAL_SET:
+                stats.total = row['count']
+            elif grouping_set == STATUS_SET:
+                stats.by_status.append(FacetCount(value=row['onboarding_status'], count=row['count']))
+            elif grouping_set == DEPARTMENT_SET and row['department'] is not None:
+                stats.by_department.append(FacetCount(value=row['department'], count=row['count']))
+            elif grouping_set == CITY_SET and row['city'] is not None:
+                stats.by_city.append(FacetCount(value=row['city'], count=row['count']))
+            elif grouping_set == STEP_SET:
+                stats.by_step.append(FacetCount(value=str(row['current_step']), count=row['count']))
+        return stats
+
+    @staticmethod
+    def refresh_materialized_view() -> None:
+        db.execute_mutation("REFRESH MATERIALIZED VIEW CONCURRENTLY doctor_stats_facts")
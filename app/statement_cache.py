@@ -0,0 +1,107 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+PLACEHOLDER = re.compile(r"%%|%s")
+
+
+def to_positional(query: str) -> str:
+    """Rewrite psycopg2 %s placeholders as the $1, $2 ... parameters PREPARE expects"""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group() == "%%":
+            return "%"
+        counter += 1
+        return f"${counter}"
+
+    return PLACEHOLDER.sub(replace, query)
+
+
+def statement_name(query: str) -> str:
+    return "stmt_" + hashlib.sha1(query.encode()).hexdigest()[:16]
+
+
+class StatementCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.prepares = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.failures = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prepares": self.prepares,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "failures": self.failures,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class StatementCache:
+    """
+    Server-side prepared statements of one connection, least recently used first.
+
+    A query is only prepared once it has been seen `threshold` times, so one-off
+    dynamic SQL never costs a PREPARE. Evicted statements are DEALLOCATEd on the
+    connection; statements Postgres refused to prepare are remembered and run
+    unprepared from then on.
+    """
+
+    def __init__(self, stats: StatementCacheStats, max_size: int = 128, threshold: int = 2):
+        self.stats = stats
+        self.max_size = max_size
+        self.threshold = threshold
+        self.statements: "OrderedDict[str, str]" = OrderedDict()
+        self.seen: "OrderedDict[str, int]" = OrderedDict()
+        self.unpreparable: Set[str] = set()
+
+    def lookup(self, query: str) -> Optional[str]:
+        name = self.statements.get(query)
+        if name is None:
+            self.stats.misses += 1
+            return None
+        self.statements.move_to_end(query)
+        self.stats.hits += 1
+        return name
+
+    def should_prepare(self, query: str) -> bool:
+        if query in self.unpreparable:
+            return False
+        count = self.seen.pop(query, 0) + 1
+        if count >= self.threshold:
+            return True
+        self.seen[query] = count
+        if len(self.seen) > self.max_size * 4:
+            self.seen.popitem(last=False)
+        return False
+
+    def prepare(self, cursor, query: str) -> str:
+        name = statement_name(query)
+        cursor.execute(f"PREPARE {name} AS {to_positional(query)}")
+        self.statements[query] = name
+        self.stats.prepares += 1
+        while len(self.statements) > self.max_size:
+            _, evicted = self.statements.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+            self.stats.evictions += 1
+        return name
+
+    def mark_unpreparable(self, query: str):
+        self.unpreparable.add(query)
+        self.stats.failures += 1
+
+    def clear(self):
+        """Forget every statement, e.g. after DDL or when the server dropped them"""
+        if self.statements:
+            self.stats.invalidations += 1
+        self.statements.clear()
+        self.seen.clear()
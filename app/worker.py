@@ -0,0 +1,121 @@
+"""
+Background job worker: python -m app.worker
+
+Starts JOB_WORKERS processes that each claim and run jobs from the jobs table. Workers
+sleep on LISTEN job_queue between jobs, so a new job starts within milliseconds, and
+poll every JOB_POLL_INTERVAL seconds for retries that became due. Dead processes are
+restarted; SIGTERM/SIGINT let running jobs finish before exiting. The supervisor also
+enqueues the PERIODIC_JOBS maintenance jobs on their intervals.
+"""
+import multiprocessing
+import os
+import select
+import signal
+import socket
+import time
+import psycopg2
+import psycopg2.extensions
+from app.database import db
+from app.jobs import JOB_CHANNEL, claim_job, enqueue, run_job
+import app.job_handlers  # noqa: F401  registers the handlers
+from app.services.stats_services import STATS_REFRESH_SECONDS, STATS_SOURCE
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(os.cpu_count() or 1, 4))))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+# job kind -> seconds between runs (0 disables)
+PERIODIC_JOBS = {
+    "doctors.archive_completed": float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400")),
+    "doctors.cleanup_abandoned": float(os.getenv("CLEANUP_INTERVAL_SECONDS", "86400")),
+    # the only scheduled refresh of doctor_stats_facts; API processes never refresh it
+    "doctor_stats.refresh": float(STATS_REFRESH_SECONDS if STATS_SOURCE == "materialized" else 0),
+}
+
+
+def listen_connection():
+    conn = psycopg2.connect(db.database_url)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {JOB_CHANNEL}")
+    return conn
+
+
+def work(index: int):
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    listener = None
+    print(f"👷 Job worker {index} started ({worker_id})")
+    while not stopping:
+        try:
+            if listener is None or listener.closed:
+                listener = listen_connection()
+            job = claim_job(worker_id)
+            if job:
+                run_job(job)
+                continue
+            if select.select([listener], [], [], JOB_POLL_INTERVAL)[0]:
+                listener.poll()
+                listener.notifies.clear()
+        except psycopg2.Error as e:
+            print(f"⚠️ Job worker {index} lost the database: {e}")
+            if listener is not None:
+                listener.close()
+                listener = None
+            db.close()
+            time.sleep(JOB_POLL_INTERVAL)
+    if listener is not None:
+        listener.close()
+    db.close()
+
+
+def enqueue_periodic_jobs(next_runs: dict):
+    now = time.monotonic()
+    for kind, interval in PERIODIC_JOBS.items():
+        if interval <= 0 or next_runs.get(kind, 0) > now:
+            continue
+        try:
+            # the dedupe key keeps several worker hosts from queueing the same run
+            enqueue(kind, dedupe_key=kind)
+            next_runs[kind] = now + interval
+        except psycopg2.Error as e:
+            print(f"⚠️ Could not enqueue {kind}: {e}")
+            db.close()
+
+
+def main():
+    # spawned, not forked: children must not inherit the supervisor's connection
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    next_runs = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while not stopping:
+        for index in range(JOB_WORKERS):
+            process = processes.get(index)
+            if process is None or not process.is_alive():
+                if process is not None:
+                    print(f"⚠️ Job worker {index} exited with {process.exitcode}, restarting")
+                processes[index] = process = context.Process(target=work, args=(index,))
+                process.start()
+        enqueue_periodic_jobs(next_runs)
+        time.sleep(1)
+    for process in processes.values():
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
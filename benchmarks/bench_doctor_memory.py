@@ -0,0 +1,135 @@
+"""
+Doctor list memory benchmark: bytes and allocations retained per assembled doctor when
+building strawberry output types (app.models) vs compact records (app.records), from
+synthetic DOCTOR_DOCUMENT_QUERY documents.
+
+    python -m benchmarks.bench_doctor_memory --doctors 10000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from app.models import Address, AppointmentSettings, Department, Doctor, Schedule
+from app.records import DepartmentRecord
+from app.services.doctor_services import DoctorService, parse_timestamp
+
+DEPARTMENTS = [
+    {"id": 1, "name": "Cardiology", "icon_name": "heart"},
+    {"id": 2, "name": "Neurology", "icon_name": "brain"},
+    {"id": 3, "name": "Pediatrics", "icon_name": "child"},
+]
+CITIES = ["Kochi", "Chennai", "Mumbai", "Delhi"]
+
+
+def doctor_document(i: int) -> str:
+    created = (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat()
+    return json.dumps({
+        "id": i,
+        "name": f"Dr. Doctor {i}",
+        "email": f"doctor{i}@example.com",
+        "register_no": f"REG{i:06d}",
+        "bio": "Consultant with fifteen years of experience in interventional procedures.",
+        "profile_image_url": f"https://cdn.example.com/doctors/{i}.jpg",
+        "profile_image_key": None,
+        "profile_image_sizes": [],
+        "onboarding_status": "completed" if i % 3 else "in_progress",
+        "current_step": 8,
+        "created_at": created,
+        "updated_at": created,
+        "mobile_numbers": [f"+9198765{i:05d}"],
+        "departments": [DEPARTMENTS[i % 3], DEPARTMENTS[(i + 1) % 3]],
+        "qualifications": ["MBBS", "MD"],
+        "specializations": ["Interventional Cardiology"],
+        "address": {
+            "id": i, "country": "India", "state": "Kerala", "city": CITIES[i % 4],
+            "pincode": "682001", "flat_house": f"House {i}", "latitude": 9.93, "longitude": 76.26,
+        },
+        "appointment_settings": {
+            "id": i, "consultation_charge": 500, "follow_up_charge": 200, "follow_up_period_days": 7,
+            "advance_booking_days": 30, "avg_duration_minutes": 15,
+        },
+        "schedules": [
+            {"id": i * 7 + day, "day_of_week": day, "start_time": "09:00:00",
+             "end_time": "17:00:00", "is_available": True}
+            for day in range(1, 6)
+        ],
+    })
+
+
+def output_types(documents: List[str]) -> List[Doctor]:
+    """How doctor lists were assembled before app.records: one output object per value"""
+    doctors = []
+    for raw in documents:
+        document = json.loads(raw)
+        address = document['address']
+        settings = document['appointment_settings']
+        doctors.append(Doctor(
+            id=document['id'],
+            name=document['name'],
+            email=document['email'],
+            mobile_numbers=document['mobile_numbers'],
+            register_no=document['register_no'],
+            bio=document['bio'],
+            profile_image_url=document['profile_image_url'],
+            onboarding_status=document['onboarding_status'],
+            current_step=document['current_step'],
+            departments=[Department(**item) for item in document['departments']],
+            qualifications=document['qualifications'],
+            specializations=document['specializations'],
+            address=Address(**address) if address else None,
+            appointment_settings=AppointmentSettings(**settings) if settings else None,
+            schedules=[Schedule(**item) for item in document['schedules']],
+            created_at=parse_timestamp(document['created_at']),
+            updated_at=parse_timestamp(document['updated_at']),
+            profile_image_key=document['profile_image_key'],
+            profile_image_sizes=document['profile_image_sizes']
+        ))
+    return doctors
+
+
+def records(documents: List[str]) -> list:
+    departments: Dict[int, DepartmentRecord] = {}
+    return [DoctorService.doctor_from_document(json.loads(raw), departments) for raw in documents]
+
+
+def measure(build: Callable[[List[str]], list], documents: List[str]) -> Dict[str, float]:
+    """Memory still held by the built list once the decoded documents are gone"""
+    start = time.perf_counter()
+    build(documents)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    doctors = build(documents)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    count = len(doctors)
+    del doctors
+    return {"bytes": size / count, "blocks": blocks / count, "ms": elapsed * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--doctors", type=int, default=10000)
+    args = parser.parse_args()
+
+    documents = [doctor_document(i) for i in range(args.doctors)]
+    print(f"{'representation':<18}{'bytes/doctor':>14}{'allocs/doctor':>15}{'build':>12}")
+    results = {}
+    for name, build in (("output types", output_types), ("records", records)):
+        results[name] = result = measure(build, documents)
+        print(f"{name:<18}{result['bytes']:>14,.0f}{result['blocks']:>15,.1f}{result['ms']:>9.1f} ms")
+    saved = 1 - results["records"]["bytes"] / results["output types"]["bytes"]
+    print(f"\nrecords hold {saved:.0%} less per doctor ({args.doctors} doctors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+GraphQL response encoding benchmark on a synthetic allDoctors result: stdlib json
+vs app.json_codec (orjson when installed), and gzip / brotli on top.
+
+    python -m benchmarks.bench_response_encoding --doctors 5000
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.json_codec import dumps
+
+
+def doctor_payload(i: int) -> dict:
+    created = datetime(2024, 1, 1) + timedelta(minutes=i)
+    return {
+        "id": i,
+        "name": f"Dr. Doctor {i}",
+        "email": f"doctor{i}@example.com",
+        "mobileNumbers": [f"+9198765{i:05d}"],
+        "registerNo": f"REG{i:06d}",
+        "bio": "Consultant with fifteen years of experience in interventional procedures.",
+        "profileImageUrl": f"https://cdn.example.com/doctors/{i}.jpg",
+        "onboardingStatus": "COMPLETED" if i % 3 else "IN_PROGRESS",
+        "currentStep": 8,
+        "departments": [{"id": 1, "name": "Cardiology", "iconName": "heart"}],
+        "qualifications": ["MBBS", "MD"],
+        "specializations": ["Interventional Cardiology"],
+        "address": {
+            "id": i, "country": "India", "state": "Kerala", "city": "Kochi",
+            "pincode": "682001", "flatHouse": f"House {i}", "latitude": 9.93, "longitude": 76.26,
+        },
+        "appointmentSettings": {
+            "id": i, "consultationCharge": 500, "followUpCharge": 200, "followUpPeriodDays": 7,
+            "advanceBookingDays": 30, "avgDurationMinutes": 15,
+        },
+        "schedules": [
+            {"id": i * 7 + day, "dayOfWeek": day, "startTime": "09:00:00",
+             "endTime": "17:00:00", "isAvailable": True}
+            for day in range(1, 6)
+        ],
+        "createdAt": created.isoformat(),
+        "updatedAt": created.isoformat(),
+    }
+
+
+def best_of(repeat: int, func, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--doctors", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    response = {"data": {"allDoctors": [doctor_payload(i) for i in range(args.doctors)]}}
+
+    stdlib_time, stdlib_body = best_of(args.repeat, lambda data: json.dumps(data).encode(), response)
+    codec_time, body = best_of(args.repeat, dumps, response)
+    print(f"{'step':<22}{'time':>12}{'bytes':>14}")
+    print(f"{'json.dumps':<22}{stdlib_time * 1000:>9.1f} ms{len(stdlib_body):>14,}")
+    print(f"{'json_codec.dumps':<22}{codec_time * 1000:>9.1f} ms{len(body):>14,}")
+
+    gzip_time, gzipped = best_of(args.repeat, lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL), body)
+    print(f"{'+ gzip':<22}{gzip_time * 1000:>9.1f} ms{len(gzipped):>14,}")
+    if brotli is not None:
+        br_time, compressed = best_of(args.repeat, lambda data: brotli.compress(data, quality=BROTLI_QUALITY), body)
+        print(f"{'+ brotli':<22}{br_time * 1000:>9.1f} ms{len(compressed):>14,}")
+    else:
+        print("+ brotli               not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Row mapping micro-benchmark: RealDictCursor rows copied into dicts and **-unpacked
+(the previous Database path) versus building objects straight from result tuples
+with app.row_mapping.object_factory, for the app.records classes the services build.
+
+Allocations are counted from a tracemalloc snapshot taken inside the mapping, just
+before it returns, so the intermediate rows and dicts it still holds are counted along
+with the objects it returns.
+
+Runs on synthetic result sets shaped like the service queries, so no database is
+needed:
+
+    python -m benchmarks.bench_row_mapping --rows 10000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import RealDictRow
+
+from app.records import AddressRecord, DepartmentRecord, ScheduleRecord
+from app.row_mapping import object_factory
+
+Checkpoint = Callable[[], None]
+
+CASES = {
+    "get_all_departments": (
+        DepartmentRecord, ("id", "name", "icon_name"),
+        lambda i: (i, f"Department {i}", "heart"),
+    ),
+    "get_schedules": (
+        ScheduleRecord, ("id", "day_of_week", "start_time", "end_time", "is_available"),
+        lambda i: (i, i % 7, "09:00:00", "17:00:00", True),
+    ),
+    "load_complete_doctors (addresses)": (
+        AddressRecord, ("id", "country", "state", "city", "pincode", "flat_house", "latitude", "longitude"),
+        lambda i: (i, "India", "Kerala", "Kochi", "682001", f"House {i}", 9.93, 76.26),
+    ),
+}
+
+
+def legacy_mapping(cls: type, columns: Sequence[str], rows: List[tuple],
+                   checkpoint: Optional[Checkpoint] = None) -> list:
+    dict_rows = []
+    for row in rows:
+        real_dict_row = RealDictRow()
+        real_dict_row.update(zip(columns, row))
+        dict_rows.append(real_dict_row)
+    # the dict(row) copies are kept until the checkpoint so that it counts them
+    copies = [dict(row) for row in dict_rows]
+    objects = [cls(**copy) for copy in copies]
+    if checkpoint:
+        checkpoint()
+    return objects
+
+
+def tuple_mapping(cls: type, columns: Sequence[str], rows: List[tuple],
+                  checkpoint: Optional[Checkpoint] = None) -> list:
+    build = object_factory(cls, tuple(columns))
+    objects = [build(row) for row in rows]
+    if checkpoint:
+        checkpoint()
+    return objects
+
+
+def count_allocations(mapper: Callable, cls: type, columns: Sequence[str], rows: List[tuple]) -> Tuple[int, int]:
+    """Blocks allocated by one mapping call and still held at its checkpoint, and the peak bytes"""
+    snapshots = []
+    ignore_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    mapper(cls, columns, rows, lambda: snapshots.append(tracemalloc.take_snapshot()))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    inside = snapshots[0].filter_traces(ignore_tracemalloc)
+    stats = inside.compare_to(before.filter_traces(ignore_tracemalloc), "filename")
+    return sum(max(stat.count_diff, 0) for stat in stats), peak
+
+
+def measure(mapper: Callable, cls: type, columns: Sequence[str], rows: List[tuple]) -> Tuple[float, int, int]:
+    best = float("inf")
+    for _ in range(5):
+        gc.collect()
+        start = time.perf_counter()
+        mapper(cls, columns, rows)
+        best = min(best, time.perf_counter() - start)
+    blocks, peak = count_allocations(mapper, cls, columns, rows)
+    return best, blocks, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'query':<38}{'mapper':<10}{'time/10k rows':>16}{'allocs/row':>12}{'peak KiB':>12}")
+    for name, (cls, columns, make_row) in CASES.items():
+        rows = [make_row(i) for i in range(args.rows)]
+        for label, mapper in (("legacy", legacy_mapping), ("tuple", tuple_mapping)):
+            seconds, blocks, peak = measure(mapper, cls, columns, rows)
+            per_10k = seconds * 10_000 / args.rows
+            print(f"{name:<38}{label:<10}{per_10k * 1000:>13.2f} ms"
+                  f"{blocks / args.rows:>12.2f}{peak / 1024:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
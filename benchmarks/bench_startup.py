@@ -0,0 +1,47 @@
+"""
+Cold start benchmark. Each stage runs in a fresh interpreter so nothing is cached
+between runs; the median of --repeat runs is reported.
+
+    python -m benchmarks.bench_startup --repeat 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+STAGES = {
+    "interpreter": "pass",
+    "import app.schema (registry)": "import app.schema",
+    "get_schema() build + validate": "from app.schema import get_schema; get_schema()",
+    "import app.main (full app)": "import app.main",
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def run_stage(code: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'stage':<34}{'median':>12}{'min':>12}")
+    for name, code in STAGES.items():
+        timings = [run_stage(code) for _ in range(args.repeat)]
+        print(f"{name:<34}{statistics.median(timings) * 1000:>9.1f} ms{min(timings) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+-- Initial schema. Written to be re-runnable: besides creating a fresh database it
+-- adopts databases created by earlier versions of init.sql, adding what they lack.
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+
+-- every write to a doctor or its child rows takes a new value from this
+-- sequence; the change feed (doctorChanges) uses it as its cursor
+CREATE SEQUENCE IF NOT EXISTS doctor_change_seq;
+
+
+CREATE TABLE IF NOT EXISTS doctors (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255),
+    email VARCHAR(255) UNIQUE,
+    register_no VARCHAR(100) UNIQUE,
+    bio TEXT,
+    profile_image_url TEXT,
+    -- uploaded images: storage prefix of the original and the thumbnail sizes ready so far
+    profile_image_key TEXT,
+    profile_image_sizes INTEGER[] NOT NULL DEFAULT '{}',
+    onboarding_status VARCHAR(50) DEFAULT 'in_progress',
+    current_step INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    search_vector TSVECTOR,
+    version BIGINT NOT NULL DEFAULT nextval('doctor_change_seq')
+);
+
+-- columns added after the first release of the schema
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS profile_image_key TEXT;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS profile_image_sizes INTEGER[] NOT NULL DEFAULT '{}';
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('doctor_change_seq');
+
+CREATE OR REPLACE TRIGGER update_doctors_updated_at 
+    BEFORE UPDATE ON doctors 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+
+CREATE TABLE IF NOT EXISTS doctor_mobile_numbers (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+    mobile_number VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+
+CREATE TABLE IF NOT EXISTS departments (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) UNIQUE NOT NULL,
+    icon_name VARCHAR(50)
+);
+
+
+CREATE TABLE IF NOT EXISTS doctor_departments (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+    department_id INTEGER REFERENCES departments(id),
+    UNIQUE(doctor_id, department_id)
+);
+
+
+CREATE TABLE IF NOT EXISTS qualifications (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+    qualification VARCHAR(100) NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS specializations (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+    specialization VARCHAR(100) NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS addresses (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE UNIQUE,
+    country VARCHAR(100),
+    state VARCHAR(100),
+    city VARCHAR(100),
+    pincode VARCHAR(20),
+    flat_house TEXT,
+    latitude DECIMAL(10, 8),
+    longitude DECIMAL(11, 8)
+);
+
+
+CREATE TABLE IF NOT EXISTS appointment_settings (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE UNIQUE,
+    consultation_charge INTEGER,
+    follow_up_charge INTEGER,
+    follow_up_period_days INTEGER,
+    advance_booking_days INTEGER,
+    avg_duration_minutes INTEGER
+);
+
+
+CREATE TABLE IF NOT EXISTS schedules (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+    day_of_week INTEGER,
+    start_time TIME,
+    end_time TIME,
+    is_available BOOLEAN DEFAULT TRUE
+);
+
+
+CREATE INDEX IF NOT EXISTS idx_doctor_mobile_numbers_doctor ON doctor_mobile_numbers(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_doctor_departments_doctor ON doctor_departments(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_qualifications_doctor ON qualifications(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_specializations_doctor ON specializations(doctor_id);
+-- one address per doctor; older databases may hold several, keep the newest
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conrelid = 'addresses'::regclass AND contype = 'u'
+    ) THEN
+        DELETE FROM addresses a USING addresses newer
+        WHERE newer.doctor_id = a.doctor_id AND newer.id > a.id;
+        ALTER TABLE addresses ADD CONSTRAINT addresses_doctor_id_key UNIQUE (doctor_id);
+    END IF;
+END $$;
+DROP INDEX IF EXISTS idx_addresses_doctor;
+CREATE INDEX IF NOT EXISTS idx_appointment_settings_doctor ON appointment_settings(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_schedules_doctor ON schedules(doctor_id);
+
+
+-- full-text search: doctors.search_vector is kept in sync by triggers on
+-- doctors (name, bio) and on the qualifications / specializations tables
+CREATE OR REPLACE FUNCTION doctor_search_vector(p_doctor_id INTEGER, p_name TEXT, p_bio TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(p_name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(
+            (SELECT string_agg(specialization, ' ') FROM specializations WHERE doctor_id = p_doctor_id), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(
+            (SELECT string_agg(qualification, ' ') FROM qualifications WHERE doctor_id = p_doctor_id), '')), 'C')
+        || setweight(to_tsvector('simple', coalesce(p_bio, '')), 'D');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION set_doctor_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector = doctor_search_vector(NEW.id, NEW.name, NEW.bio);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION refresh_doctor_search_vector()
+RETURNS TRIGGER AS $$
+DECLARE
+    target_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        target_id = OLD.doctor_id;
+    ELSE
+        target_id = NEW.doctor_id;
+    END IF;
+    UPDATE doctors SET search_vector = doctor_search_vector(id, name, bio) WHERE id = target_id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER set_doctors_search_vector
+    BEFORE INSERT OR UPDATE OF name, bio ON doctors
+    FOR EACH ROW
+    EXECUTE FUNCTION set_doctor_search_vector();
+
+CREATE OR REPLACE TRIGGER refresh_search_vector_qualifications
+    AFTER INSERT OR UPDATE OR DELETE ON qualifications
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_doctor_search_vector();
+
+CREATE OR REPLACE TRIGGER refresh_search_vector_specializations
+    AFTER INSERT OR UPDATE OR DELETE ON specializations
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_doctor_search_vector();
+
+-- doctors created before search existed; without firing the change feed triggers
+ALTER TABLE doctors DISABLE TRIGGER USER;
+UPDATE doctors SET search_vector = doctor_search_vector(id, name, bio) WHERE search_vector IS NULL;
+ALTER TABLE doctors ENABLE TRIGGER USER;
+
+CREATE INDEX IF NOT EXISTS idx_doctors_search_vector ON doctors USING GIN (search_vector);
+
+-- change feed: bump doctors.version on every doctor write, touch the parent
+-- doctor on every child row write and keep tombstones for deleted doctors
+CREATE TABLE IF NOT EXISTS doctor_deletions (
+    version BIGINT PRIMARY KEY DEFAULT nextval('doctor_change_seq'),
+    doctor_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION bump_doctor_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = nextval('doctor_change_seq');
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION touch_parent_doctor()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE doctors SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.doctor_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE doctors SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.doctor_id;
+    ELSE
+        UPDATE doctors SET updated_at = CURRENT_TIMESTAMP WHERE id IN (OLD.doctor_id, NEW.doctor_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION record_doctor_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO doctor_deletions (doctor_id) VALUES (OLD.id);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER bump_doctors_version
+    BEFORE UPDATE ON doctors
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_doctor_version();
+
+CREATE OR REPLACE TRIGGER record_doctors_deletion
+    AFTER DELETE ON doctors
+    FOR EACH ROW
+    EXECUTE FUNCTION record_doctor_deletion();
+
+CREATE OR REPLACE TRIGGER touch_doctor_mobile_numbers
+    AFTER INSERT OR UPDATE OR DELETE ON doctor_mobile_numbers
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_doctor_departments
+    AFTER INSERT OR UPDATE OR DELETE ON doctor_departments
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_qualifications
+    AFTER INSERT OR UPDATE OR DELETE ON qualifications
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_specializations
+    AFTER INSERT OR UPDATE OR DELETE ON specializations
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_addresses
+    AFTER INSERT OR UPDATE OR DELETE ON addresses
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_appointment_settings
+    AFTER INSERT OR UPDATE OR DELETE ON appointment_settings
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE OR REPLACE TRIGGER touch_schedules
+    AFTER INSERT OR UPDATE OR DELETE ON schedules
+    FOR EACH ROW EXECUTE FUNCTION touch_parent_doctor();
+
+CREATE INDEX IF NOT EXISTS idx_doctors_version ON doctors(version);
+
+-- onboarding progress notifications for GraphQL subscriptions
+CREATE OR REPLACE FUNCTION notify_onboarding_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('onboarding_progress', json_build_object(
+        'doctor_id', NEW.id,
+        'current_step', NEW.current_step,
+        'onboarding_status', NEW.onboarding_status
+    )::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER notify_doctors_onboarding_started
+    AFTER INSERT ON doctors
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_onboarding_progress();
+
+CREATE OR REPLACE TRIGGER notify_doctors_onboarding_progress
+    AFTER UPDATE OF current_step, onboarding_status ON doctors
+    FOR EACH ROW
+    WHEN (OLD.current_step IS DISTINCT FROM NEW.current_step
+          OR OLD.onboarding_status IS DISTINCT FROM NEW.onboarding_status)
+    EXECUTE FUNCTION notify_onboarding_progress();
+
+-- flattened doctor facts for the admin dashboard aggregates (doctorStats),
+-- used when DOCTOR_STATS_SOURCE=materialized and refreshed by the API or a job
+CREATE MATERIALIZED VIEW IF NOT EXISTS doctor_stats_facts AS
+    SELECT d.id AS doctor_id, d.onboarding_status, d.current_step,
+           COALESCE(dd.department_id, 0) AS department_id, dep.name AS department, a.city
+    FROM doctors d
+    LEFT JOIN doctor_departments dd ON dd.doctor_id = d.id
+    LEFT JOIN departments dep ON dep.id = dd.department_id
+    LEFT JOIN LATERAL (
+        SELECT city FROM addresses WHERE doctor_id = d.id ORDER BY id LIMIT 1
+    ) a ON TRUE;
+
+-- required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_doctor_stats_facts_key ON doctor_stats_facts(doctor_id, department_id);
+
+-- background jobs (app.jobs); workers claim queued rows with FOR UPDATE SKIP LOCKED
+-- and delete them once done
+CREATE TABLE IF NOT EXISTS jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    locked_by VARCHAR(100),
+    last_error TEXT,
+    dedupe_key VARCHAR(200),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_queued ON jobs(run_at, id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(locked_at) WHERE status = 'running';
+-- at most one queued job per dedupe key (e.g. one pending stats refresh)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key) WHERE status = 'queued';
+
+-- jobs that failed max_attempts times, kept for inspection and manual requeue
+CREATE TABLE IF NOT EXISTS dead_jobs (
+    id BIGINT PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    created_at TIMESTAMP,
+    failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- some data of departments to show 
+-- added iconname for showing in tempate frontend
+INSERT INTO departments (name, icon_name) VALUES
+    ('Cardiology', 'heart'),
+    ('Casualty', 'ambulance'),
+    ('Dentistry', 'tooth'),
+    ('Gynaecology', 'female'),
+    ('Orthopedic', 'bone'),
+    ('Psychiatry', 'brain'),
+    ('Radiology', 'xray'),
+    ('Paediatrics', 'baby'),
+    ('General Surgery', 'surgery'),
+    ('Intensive Care', 'icu')
+ON CONFLICT (name) DO NOTHING;
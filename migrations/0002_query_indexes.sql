@@ -0,0 +1,40 @@
+-- migrate: no-transaction
+-- Indexes for the queries in app/services, built CONCURRENTLY so they can be added to a
+-- live database (python -m app.index_advisor shows which plans use them).
+
+-- allDoctors and searchDoctors without search text: ORDER BY created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctors_created
+    ON doctors (created_at DESC, id);
+
+-- allDoctors(status:) and the status filter of searchDoctors / doctorStats
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctors_status_created
+    ON doctors (onboarding_status, created_at DESC);
+
+-- child rows by doctor in display order, covering so lists are read from the index alone
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_schedules_doctor_day
+    ON schedules (doctor_id, day_of_week) INCLUDE (id, start_time, end_time, is_available);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctor_mobile_numbers_doctor_id
+    ON doctor_mobile_numbers (doctor_id, id) INCLUDE (mobile_number);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_qualifications_doctor_id
+    ON qualifications (doctor_id, id) INCLUDE (qualification);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_specializations_doctor_id
+    ON specializations (doctor_id, id) INCLUDE (specialization);
+
+-- department filter (EXISTS ... dd.department_id = %s) and department facets
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctor_departments_department
+    ON doctor_departments (department_id, doctor_id);
+
+-- city filter: LOWER(a.city) = LOWER(%s)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_addresses_city_lower
+    ON addresses (LOWER(city), doctor_id);
+
+-- superseded by the covering indexes above (doctor_departments keeps its
+-- UNIQUE (doctor_id, department_id) index)
+DROP INDEX CONCURRENTLY IF EXISTS idx_schedules_doctor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_doctor_mobile_numbers_doctor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_qualifications_doctor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_specializations_doctor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_doctor_departments_doctor;
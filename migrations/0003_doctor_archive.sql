@@ -0,0 +1,67 @@
+-- Archive for completed doctors that have not changed in a while (app.services.archive_services).
+-- An archived doctor is one read-only JSON document, moved out of doctors and its child
+-- tables so the live tables and their indexes only hold the onboarding working set.
+CREATE TABLE IF NOT EXISTS doctor_archive (
+    id INTEGER PRIMARY KEY,
+    email VARCHAR(255) UNIQUE,
+    register_no VARCHAR(100) UNIQUE,
+    onboarding_status VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    document JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_doctor_archive_created ON doctor_archive (created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_doctor_archive_status_created ON doctor_archive (onboarding_status, created_at DESC);
+
+-- email and register_no stay unique across live and archived doctors
+CREATE OR REPLACE FUNCTION reject_archived_duplicate()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM doctor_archive
+        WHERE (email = NEW.email OR register_no = NEW.register_no) AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION 'Doctor already registered' USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER reject_doctors_archived_duplicate
+    BEFORE INSERT OR UPDATE OF email, register_no ON doctors
+    FOR EACH ROW
+    EXECUTE FUNCTION reject_archived_duplicate();
+
+-- archiving deletes the live rows but the doctor still exists: no change feed tombstone
+CREATE OR REPLACE FUNCTION record_doctor_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('app.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO doctor_deletions (doctor_id) VALUES (OLD.id);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- dashboard facts cover archived doctors too
+DROP MATERIALIZED VIEW IF EXISTS doctor_stats_facts;
+
+CREATE MATERIALIZED VIEW doctor_stats_facts AS
+    SELECT d.id AS doctor_id, d.onboarding_status, d.current_step,
+           COALESCE(dd.department_id, 0) AS department_id, dep.name AS department, a.city
+    FROM doctors d
+    LEFT JOIN doctor_departments dd ON dd.doctor_id = d.id
+    LEFT JOIN departments dep ON dep.id = dd.department_id
+    LEFT JOIN LATERAL (
+        SELECT city FROM addresses WHERE doctor_id = d.id ORDER BY id LIMIT 1
+    ) a ON TRUE
+    UNION ALL
+    SELECT x.id, x.onboarding_status, (x.document->>'current_step')::int,
+           COALESCE((dep->>'id')::int, 0), dep->>'name', x.document->'address'->>'city'
+    FROM doctor_archive x
+    LEFT JOIN LATERAL jsonb_array_elements(x.document->'departments') dep ON TRUE;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_doctor_stats_facts_key ON doctor_stats_facts(doctor_id, department_id);
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Abandoned-onboarding sweep (app.services.cleanup_services): stale in-progress doctors
+-- by updated_at. Partial, so it only holds the small in-progress working set.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctors_in_progress_updated
+    ON doctors (updated_at, current_step) WHERE onboarding_status = 'in_progress';
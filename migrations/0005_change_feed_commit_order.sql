@@ -0,0 +1,22 @@
+-- Change feed paging in commit-safe order (app.services.change_feed_services).
+-- doctors.version comes from nextval() at write time, so a transaction that took a low
+-- version and committed after a reader had already paged past it was skipped for good.
+-- Each change now also records the id of the writing transaction; readers only return
+-- changes from transactions older than their snapshot's xmin, which have all finished,
+-- and page on (change_xid, version).
+ALTER TABLE doctors
+    ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE doctor_deletions
+    ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE OR REPLACE FUNCTION bump_doctor_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = nextval('doctor_change_seq');
+    NEW.change_xid = pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE INDEX IF NOT EXISTS idx_doctors_change_xid ON doctors (change_xid, version);
+CREATE INDEX IF NOT EXISTS idx_doctor_deletions_change_xid ON doctor_deletions (change_xid, version);
@@ -0,0 +1,68 @@
+-- Touch the parent doctor once per statement instead of once per child row.
+-- The row-level touch_* and refresh_search_vector_* triggers updated the same doctors
+-- row for every schedule, number or qualification a statement wrote (five schedules,
+-- five doctor updates and five version bumps). These statement-level triggers read the
+-- changed rows from transition tables and update each distinct doctor once; for
+-- qualifications and specializations the same update also refreshes search_vector.
+CREATE OR REPLACE FUNCTION touch_parent_doctors()
+RETURNS TRIGGER AS $$
+DECLARE
+    doctor_ids INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT doctor_id) INTO doctor_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT doctor_id) INTO doctor_ids FROM old_rows;
+    ELSE
+        SELECT array_agg(doctor_id) INTO doctor_ids
+        FROM (SELECT doctor_id FROM old_rows UNION SELECT doctor_id FROM new_rows) changed;
+    END IF;
+
+    IF TG_NARGS > 0 AND TG_ARGV[0] = 'search' THEN
+        UPDATE doctors
+        SET updated_at = CURRENT_TIMESTAMP, search_vector = doctor_search_vector(id, name, bio)
+        WHERE id = ANY(doctor_ids);
+    ELSE
+        UPDATE doctors SET updated_at = CURRENT_TIMESTAMP WHERE id = ANY(doctor_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- a trigger with transition tables handles a single event, so each table gets three
+DO $$
+DECLARE
+    child RECORD;
+BEGIN
+    FOR child IN
+        SELECT * FROM (VALUES
+            ('doctor_mobile_numbers', 'touch_doctor_mobile_numbers', ''),
+            ('doctor_departments', 'touch_doctor_departments', ''),
+            ('qualifications', 'touch_qualifications', 'search'),
+            ('specializations', 'touch_specializations', 'search'),
+            ('addresses', 'touch_addresses', ''),
+            ('appointment_settings', 'touch_appointment_settings', ''),
+            ('schedules', 'touch_schedules', '')
+        ) AS t(table_name, trigger_name, mode)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', child.trigger_name, child.table_name);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION touch_parent_doctors(%L)',
+            child.trigger_name || '_insert', child.table_name, child.mode);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION touch_parent_doctors(%L)',
+            child.trigger_name || '_update', child.table_name, child.mode);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION touch_parent_doctors(%L)',
+            child.trigger_name || '_delete', child.table_name, child.mode);
+    END LOOP;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS refresh_search_vector_qualifications ON qualifications;
+DROP TRIGGER IF EXISTS refresh_search_vector_specializations ON specializations;
+DROP FUNCTION IF EXISTS refresh_doctor_search_vector();
+DROP FUNCTION IF EXISTS touch_parent_doctor();
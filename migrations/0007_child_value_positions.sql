@@ -0,0 +1,8 @@
+-- Keep qualifications and specializations in the order the doctor submitted them.
+-- DoctorService.sync_values wrote them as a set, so reordering a list was not saved and
+-- duplicate entries were dropped; readers returned rows in whatever order the heap held
+-- them. Each row now records its 1-based position in the submitted list. Existing rows
+-- keep position 0 and are read in id (insertion) order until the doctor next saves them;
+-- adding a column with a constant default rewrites no rows and fires no touch triggers.
+ALTER TABLE qualifications ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE specializations ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0;
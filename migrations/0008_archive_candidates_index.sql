@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- Archive sweep (app.services.archive_services): completed doctors by updated_at. The
+-- index advisor, now explaining writes, showed each batch reading every doctor row.
+-- Partial, so it only holds completed doctors.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctors_completed_updated
+    ON doctors (updated_at) WHERE onboarding_status = 'completed';
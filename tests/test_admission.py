@@ -0,0 +1,117 @@
+"""
+Admission control through the real schema: root resolvers run off the event loop, so
+concurrent operations on a controlled field really overlap, queue at the gate and are
+shed with 429 once the queue is full or the wait times out. No database needed; the
+departments resolver is replaced by one that sleeps.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from starlette.responses import Response
+
+from app import admission
+from app.models import Department
+from app.schema import get_schema
+from app.schema import extensions
+from app.services import DepartmentService
+
+RESOLVER_SECONDS = 0.3
+LIMIT = 2
+QUEUE = 2
+
+
+class SlowDepartments:
+    """Stands in for DepartmentService.get_all_departments and records overlap"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(RESOLVER_SECONDS)
+        finally:
+            with self.lock:
+                self.running -= 1
+        return [Department(id=1, name="Cardiology")]
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(admission, "CONTROLLED_FIELDS", frozenset({"departments"}))
+    monkeypatch.setattr(admission, "CONCURRENCY_LIMIT", LIMIT)
+    monkeypatch.setattr(admission, "QUEUE_LIMIT", QUEUE)
+    monkeypatch.setattr(admission, "QUEUE_TIMEOUT", 5.0)
+    monkeypatch.setattr(admission, "RATE_LIMIT_BURST", 1000.0)
+    controller = admission.AdmissionController()
+    monkeypatch.setattr(extensions, "admission_controller", controller)
+    return controller
+
+
+@pytest.fixture
+def slow_departments(monkeypatch):
+    slow = SlowDepartments()
+    monkeypatch.setattr(DepartmentService, "get_all_departments", staticmethod(slow))
+    return slow
+
+
+async def run_operations(count: int):
+    """Start `count` departments operations at once; returns (result, response) pairs"""
+    schema = get_schema()
+
+    async def run():
+        response = Response()
+        result = await schema.execute(
+            "{ departments { id name } }",
+            context_value={"request": None, "response": response}
+        )
+        return result, response
+
+    return await asyncio.gather(*(run() for _ in range(count)))
+
+
+def rejected(outcomes):
+    return [
+        (result, response) for result, response in outcomes
+        if result.errors and result.errors[0].extensions.get("code") == "RATE_LIMITED"
+    ]
+
+
+def test_operations_over_limit_queue_then_get_429(controller, slow_departments):
+    outcomes = asyncio.run(run_operations(LIMIT + QUEUE + 2))
+
+    shed = rejected(outcomes)
+    served = [result for result, _ in outcomes if not result.errors]
+    # LIMIT ran together, QUEUE waited for a slot, the rest found the queue full
+    assert slow_departments.peak == LIMIT
+    assert len(served) == LIMIT + QUEUE
+    assert all(result.data == {"departments": [{"id": 1, "name": "Cardiology"}]} for result in served)
+    assert len(shed) == 2
+    for result, response in shed:
+        assert result.data is None
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    stats = controller.stats()["departments"]
+    assert stats["admitted"] == LIMIT + QUEUE
+    assert stats["queue_full"] == 2
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_queued_operations_time_out_with_429(controller, slow_departments, monkeypatch):
+    monkeypatch.setattr(admission, "QUEUE_TIMEOUT", RESOLVER_SECONDS / 3)
+    outcomes = asyncio.run(run_operations(LIMIT + QUEUE))
+
+    shed = rejected(outcomes)
+    assert slow_departments.peak == LIMIT
+    assert len(shed) == QUEUE
+    assert all(response.status_code == 429 for _, response in shed)
+    stats = controller.stats()["departments"]
+    assert stats["admitted"] == LIMIT
+    assert stats["queue_timeout"] == QUEUE
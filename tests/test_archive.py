@@ -0,0 +1,134 @@
+"""
+Archiving: completed doctors move to doctor_archive in batches and stay readable through
+allDoctors and doctor(id); writing to one restores it, and its email and register_no
+stay taken.
+"""
+import psycopg2.errors
+import pytest
+
+from app.services import ArchiveService
+
+ALL_DOCTORS = """
+    query($status: String, $archived: Boolean!) {
+        allDoctors(status: $status, includeArchived: $archived) { id onboardingStatus }
+    }
+"""
+
+DOCTOR = """
+    query($id: Int!) {
+        doctor(id: $id) { id name onboardingStatus qualifications specializations mobileNumbers
+                          address { city } schedules { dayOfWeek } departments { id } }
+        onboardingMetadata(doctorId: $id) { completedSteps isComplete }
+    }
+"""
+
+
+@pytest.fixture(scope="module", autouse=True)
+def spread_creation_times(database):
+    # seeded doctors share one created_at; interleave them so the merge order matters
+    database.execute_mutation("UPDATE doctors SET created_at = now() - make_interval(mins => (id * 37) % 101)")
+
+
+@pytest.fixture
+def archived(database):
+    """Archive every completed doctor (those restored by an earlier test go back too)"""
+    ArchiveService.archive_completed(older_than_days=-1, pause=0)
+    return database.execute_column("SELECT id FROM doctor_archive ORDER BY id")
+
+
+def all_doctors(graphql, status=None, include_archived=True):
+    result = graphql(ALL_DOCTORS, {"status": status, "archived": include_archived})
+    assert not result.errors, result.errors[0].message
+    return [int(doctor["id"]) for doctor in result.data["allDoctors"]]
+
+
+def newest_first(database):
+    rows = database.execute_query("""
+        SELECT id, created_at FROM doctors UNION ALL SELECT id, created_at FROM doctor_archive
+    """)
+    return [row["id"] for row in sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)]
+
+
+def test_only_completed_doctors_are_archived(database, archived):
+    assert len(archived) == 34
+    assert database.execute_column("SELECT DISTINCT onboarding_status FROM doctor_archive") == ["completed"]
+    assert database.execute_query("SELECT id FROM doctors WHERE onboarding_status = 'completed'") == []
+    assert database.execute_query("SELECT doctor_id FROM doctor_deletions") == []
+
+
+def test_recently_updated_doctors_are_not_archived(database, archived):
+    database.execute_mutation("UPDATE doctors SET onboarding_status = 'completed' WHERE id = %s",
+                              (database.execute_column("SELECT MIN(id) FROM doctors")[0],))
+
+    assert ArchiveService.archive_completed(older_than_days=180, pause=0) == 0
+
+
+def test_batches_call_the_heartbeat(database, archived):
+    ids = database.execute_column("SELECT id FROM doctors ORDER BY id LIMIT 25")
+    database.execute_mutation("UPDATE doctors SET onboarding_status = 'completed' WHERE id = ANY(%s)", (ids,))
+    beats = []
+
+    assert ArchiveService.archive_completed(older_than_days=-1, batch_size=10, pause=0, max_batches=2,
+                                            heartbeat=lambda: beats.append(1)) == 20
+    assert ArchiveService.archive_completed(older_than_days=-1, batch_size=10, pause=0,
+                                            heartbeat=lambda: beats.append(1)) == 5
+    assert len(beats) == 3
+
+
+def test_all_doctors_merges_archived_doctors_newest_first(graphql, database, archived):
+    doctors = all_doctors(graphql)
+
+    assert len(doctors) == database.execute_one("SELECT COUNT(*) AS n FROM doctors")["n"] + len(archived)
+    assert doctors == newest_first(database)
+    assert set(all_doctors(graphql, "completed")) == set(archived)
+
+
+def test_archived_doctors_can_be_left_out(graphql, archived):
+    live = all_doctors(graphql, include_archived=False)
+
+    assert live and not set(live) & set(archived)
+    assert all_doctors(graphql, "in_progress") == all_doctors(graphql, "in_progress", include_archived=False)
+
+
+def test_an_archived_doctor_reads_like_a_live_one(graphql, database, archived):
+    doctor_id = archived[0]
+
+    result = graphql(DOCTOR, {"id": doctor_id})
+
+    assert not result.errors, result.errors[0].message
+    doctor = result.data["doctor"]
+    assert doctor["name"] == f"Doctor {doctor_id}" and doctor["onboardingStatus"] == "COMPLETED"
+    assert doctor["qualifications"] == ["MBBS", "MD"] and len(doctor["schedules"]) == 5
+    assert doctor["address"] and doctor["departments"] and doctor["mobileNumbers"]
+    assert result.data["onboardingMetadata"]["isComplete"]
+
+
+def test_a_write_restores_the_doctor_with_its_children(graphql, database, archived):
+    doctor_id = archived[1]
+    before = graphql(DOCTOR, {"id": doctor_id}).data["doctor"]
+
+    result = graphql('mutation($id: Int!) { updateDoctorName(doctorId: $id, name: "Dr. Back") { name } }',
+                     {"id": doctor_id})
+
+    assert not result.errors, result.errors[0].message
+    assert database.execute_query("SELECT id FROM doctor_archive WHERE id = %s", (doctor_id,)) == []
+    after = graphql(DOCTOR, {"id": doctor_id}).data["doctor"]
+    assert after == {**before, "name": "Dr. Back"}
+
+
+def test_an_archived_doctors_email_and_register_no_stay_taken(graphql, database, archived):
+    taken = database.execute_one("SELECT email, register_no FROM doctor_archive WHERE id = %s", (archived[2],))
+
+    result = graphql(
+        'mutation($r: String!, $e: String!) { startOnboarding(registerNo: $r, email: $e, mobileNumbers: []) { id } }',
+        {"r": "ARCHIVE-NEW", "e": taken["email"]}
+    )
+
+    assert result.errors and result.errors[0].message == "Doctor already registered"
+    with pytest.raises(psycopg2.errors.UniqueViolation):
+        database.execute_mutation("INSERT INTO doctors (register_no, email) VALUES (%s, 'fresh@example.com')",
+                                  (taken["register_no"],))
+
+
+def test_restoring_a_doctor_that_is_not_archived_does_nothing(database, archived):
+    assert ArchiveService.restore(99999) is False
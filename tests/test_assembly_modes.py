@@ -0,0 +1,70 @@
+"""
+Doctor assembly: PER_ROW, BATCHED and JSON build the same doctors, children and their
+order included, for seeded doctors and for a doctor with no child rows at all.
+"""
+import pytest
+
+from app.services.doctor_services import AssemblyMode, DoctorService, assembly_mode
+
+DOCTOR = """
+    query($id: Int!) {
+        doctor(id: $id) {
+            id name qualifications specializations mobileNumbers
+            address { city } appointmentSettings { consultationCharge }
+            schedules { dayOfWeek startTime endTime } departments { id name }
+        }
+    }
+"""
+
+
+def assemble(mode, where="WHERE d.id <= 10", params=()):
+    return DoctorService.find_doctors(where, params, "ORDER BY d.id", mode=mode)
+
+
+def test_every_mode_builds_the_same_doctors(database):
+    DoctorService.sync_qualifications(2, ["PhD", "MBBS", "PhD"])
+
+    batched = assemble(AssemblyMode.BATCHED)
+
+    assert [doctor.id for doctor in batched] == list(range(1, 11))
+    assert batched[1].qualifications == ["PhD", "MBBS", "PhD"]
+    assert all(len(doctor.schedules) == 5 for doctor in batched)
+    assert assemble(AssemblyMode.PER_ROW) == batched
+    assert assemble(AssemblyMode.JSON) == batched
+
+
+def test_a_doctor_without_children_assembles_empty(database):
+    doctor_id = database.execute_mutation(
+        "INSERT INTO doctors (register_no, email, name) VALUES ('BARE-1', 'bare@example.com', 'Dr. Bare') RETURNING id"
+    )["id"]
+
+    doctors = [assemble(mode, "WHERE d.id = %s", (doctor_id,)) for mode in AssemblyMode]
+
+    assert doctors[0] == doctors[1] == doctors[2]
+    (doctor,) = doctors[0]
+    assert doctor.address is None and doctor.appointment_settings is None
+    assert doctor.qualifications == doctor.schedules == doctor.departments == doctor.mobile_numbers == []
+
+
+def test_no_matching_doctors_is_an_empty_list(database):
+    assert [assemble(mode, "WHERE d.id < 0") for mode in AssemblyMode] == [[], [], []]
+
+
+def test_the_resolver_mode_comes_from_the_environment(graphql, monkeypatch):
+    results = []
+    for mode in AssemblyMode:
+        monkeypatch.setenv("DOCTOR_ASSEMBLY_MODE_DOCTOR", mode.value)
+        assert assembly_mode("doctor") == mode
+        result = graphql(DOCTOR, {"id": 3})
+        assert not result.errors, result.errors[0].message
+        results.append(result.data)
+
+    assert results[0]["doctor"]["name"] == "Doctor 3"
+    assert results[0] == results[1] == results[2]
+
+
+def test_an_unknown_mode_is_an_error(monkeypatch):
+    monkeypatch.setenv("DOCTOR_ASSEMBLY_MODE", "eager")
+
+    with pytest.raises(ValueError):
+        assembly_mode("allDoctors")
@@ -0,0 +1,81 @@
+"""
+Change feed: paging every doctor out in (change_xid, version) order, picking up later
+writes and deletes, withholding changes behind a transaction that is still running,
+and touching the parent doctor once per child statement.
+"""
+import psycopg2
+import pytest
+
+from app.services.change_feed_services import ChangeFeedService
+
+
+def drain(since=None, limit=30):
+    """Follow the feed until has_more is false; returns (doctor ids, deleted ids, cursor)"""
+    doctor_ids, deleted_ids = [], []
+    while True:
+        feed = ChangeFeedService.get_doctor_changes(since, limit)
+        doctor_ids += [doctor.id for doctor in feed.doctors]
+        deleted_ids += feed.deleted_ids
+        since = feed.cursor
+        if not feed.has_more:
+            return doctor_ids, deleted_ids, since
+
+
+def test_pages_return_every_doctor_once_then_only_new_changes(database):
+    doctor_ids, deleted_ids, cursor = drain()
+    assert sorted(doctor_ids) == list(range(1, 101))
+    assert deleted_ids == []
+
+    database.execute_mutation("UPDATE doctors SET name = 'Dr. Renamed' WHERE id = 5")
+    database.execute_mutation("INSERT INTO addresses (doctor_id, country, city) VALUES (6, 'India', 'Kochi') "
+                              "ON CONFLICT (doctor_id) DO UPDATE SET city = 'Pune'")
+    database.execute_mutation("DELETE FROM doctors WHERE id = 7")
+
+    doctor_ids, deleted_ids, cursor = drain(cursor)
+    assert doctor_ids == [5, 6]
+    assert deleted_ids == [7]
+    assert drain(cursor)[:2] == ([], [])
+
+
+def test_a_late_commit_is_not_skipped(database):
+    _, _, cursor = drain()
+    slow = psycopg2.connect(database.database_url)
+    try:
+        with slow.cursor() as writer:
+            # takes an older transaction id than the write below and commits after it
+            writer.execute("UPDATE doctors SET name = 'Dr. Slow' WHERE id = 10")
+            database.execute_mutation("UPDATE doctors SET name = 'Dr. Fast' WHERE id = 11")
+
+            feed = ChangeFeedService.get_doctor_changes(cursor)
+            assert feed.doctors == [] and feed.cursor == cursor
+        slow.commit()
+    finally:
+        slow.close()
+
+    doctor_ids, _, _ = drain(cursor)
+    assert doctor_ids == [10, 11]
+
+
+def test_a_child_statement_touches_its_doctor_once(database):
+    last_version = database.execute_one("SELECT last_value FROM doctor_change_seq")["last_value"]
+
+    database.execute_mutation("""
+        INSERT INTO schedules (doctor_id, day_of_week, start_time, end_time)
+        SELECT 20, day, '18:00', '20:00' FROM generate_series(1, 5) day
+    """)
+
+    # one nextval for the single doctors update, not one per schedule row
+    assert database.execute_one("SELECT version FROM doctors WHERE id = 20")["version"] == last_version + 1
+    assert database.execute_one("SELECT last_value FROM doctor_change_seq")["last_value"] == last_version + 1
+
+
+def test_a_bare_version_cursor_restarts_from_the_beginning(database):
+    doctor_ids, _, _ = drain("12345")
+
+    assert len(doctor_ids) == database.execute_one("SELECT COUNT(*) AS count FROM doctors")["count"]
+
+
+@pytest.mark.parametrize("cursor", ["abc", "1.x", "x.1"])
+def test_invalid_cursor_is_an_error(database, cursor):
+    with pytest.raises(ValueError, match="Invalid change cursor"):
+        ChangeFeedService.get_doctor_changes(cursor)
@@ -0,0 +1,94 @@
+"""
+Abandoned onboarding cleanup: stale in-progress doctors up to a step are exported to
+NDJSON and deleted in batches with their uploaded images; a dry run only counts, and a
+batch blocked by a row lock backs off instead of waiting.
+"""
+import json
+
+import psycopg2
+import pytest
+
+from app.services import cleanup_services
+from app.services.cleanup_services import CleanupService
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(cleanup_services, "CLEANUP_EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(cleanup_services, "MEDIA_ROOT", str(tmp_path / "media"))
+    return tmp_path
+
+
+def abandoned(database, max_step=8):
+    return database.execute_column(
+        "SELECT id FROM doctors WHERE onboarding_status = 'in_progress' AND current_step <= %s ORDER BY id",
+        (max_step,)
+    )
+
+
+def test_a_dry_run_only_counts(database, storage):
+    expected = {
+        row["current_step"]: row["count"] for row in database.execute_query(
+            "SELECT current_step, COUNT(*) AS count FROM doctors WHERE onboarding_status = 'in_progress' GROUP BY 1"
+        )
+    }
+
+    report = CleanupService.delete_abandoned(older_than_days=-1, dry_run=True)
+
+    assert report["by_step"] == expected and report["deleted"] == sum(expected.values())
+    assert report["export"] is None
+    assert not (storage / "exports").exists()
+
+
+def test_abandoned_doctors_are_exported_then_deleted(database, storage):
+    doomed = abandoned(database, max_step=3)
+    kept = abandoned(database)[-1]
+    assert kept not in doomed
+    for doctor_id in (doomed[0], kept):
+        image_dir = storage / "media" / "profile_images" / str(doctor_id) / "upload"
+        image_dir.mkdir(parents=True)
+        (image_dir / "original.png").write_bytes(b"png")
+    beats = []
+
+    report = CleanupService.delete_abandoned(older_than_days=-1, max_step=3, batch_size=4, pause=0,
+                                             heartbeat=lambda: beats.append(1))
+
+    assert report["deleted"] == len(doomed) and report["batches"] == len(beats) == len(doomed) // 4 + 1
+    assert sum(report["by_step"].values()) == len(doomed) and max(report["by_step"]) <= 3
+    with open(report["export"]) as export:
+        documents = [json.loads(line) for line in export]
+    assert sorted(document["id"] for document in documents) == doomed
+    assert all(document["mobile_numbers"] and document["schedules"] for document in documents)
+    assert database.execute_query("SELECT id FROM doctors WHERE id = ANY(%s)", (doomed,)) == []
+    assert database.execute_query("SELECT doctor_id FROM schedules WHERE doctor_id = ANY(%s)", (doomed,)) == []
+    # unlike archiving, deleting leaves change feed tombstones
+    assert database.execute_column(
+        "SELECT doctor_id FROM doctor_deletions WHERE doctor_id = ANY(%s) ORDER BY doctor_id", (doomed,)
+    ) == doomed
+    assert not (storage / "media" / "profile_images" / str(doomed[0])).exists()
+    assert (storage / "media" / "profile_images" / str(kept)).exists()
+
+
+def test_nothing_abandoned_leaves_no_export(database, storage):
+    report = CleanupService.delete_abandoned(older_than_days=30, pause=0)
+
+    assert report["deleted"] == 0 and report["export"] is None
+    assert list((storage / "exports").iterdir()) == []
+
+
+def test_a_locked_batch_backs_off(database, storage, monkeypatch):
+    monkeypatch.setattr(cleanup_services, "CLEANUP_LOCK_TIMEOUT", "50ms")
+    target = abandoned(database)[0]
+    beats = []
+    other = psycopg2.connect(database.database_url)
+    try:
+        with other.cursor() as cursor:
+            cursor.execute("SELECT id FROM schedules WHERE doctor_id = %s FOR UPDATE", (target,))
+            report = CleanupService.delete_abandoned(older_than_days=-1, pause=0,
+                                                     heartbeat=lambda: beats.append(1))
+    finally:
+        other.close()
+
+    assert report["lock_timeouts"] == 4 and report["deleted"] == 0
+    assert len(beats) == 3
+    assert database.execute_column("SELECT id FROM doctors WHERE id = %s", (target,)) == [target]
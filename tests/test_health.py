@@ -0,0 +1,104 @@
+"""
+Health probes: /livez never touches the database, /readyz serves the background
+monitor's last snapshot and turns 503 while warming up, when the database is unreachable
+or slow, when the pool is saturated, or when the snapshot itself has gone stale.
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import health
+from app.database import Database
+from app.health import HealthMonitor
+from app.routers import health as health_routes
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = HealthMonitor()
+    monitor.warmed = True
+    monkeypatch.setattr(health_routes, "health_monitor", monitor)
+    return monitor
+
+
+@pytest.fixture
+def scratch_db(database, monkeypatch):
+    """A Database of its own for the monitor, so pool and URL can be changed freely"""
+    scratch = Database()
+    scratch.database_url = database.database_url
+    monkeypatch.setattr(health, "db", scratch)
+    yield scratch
+    scratch.close()
+
+
+def readyz():
+    response = asyncio.run(health_routes.readiness())
+    return response.status_code, json.loads(response.body)
+
+
+def test_a_warmed_worker_with_a_reachable_database_is_ready(monitor, scratch_db):
+    asyncio.run(monitor.refresh())
+
+    status, snapshot = readyz()
+
+    assert status == 200
+    assert snapshot["ready"] and snapshot["reason"] is None
+    assert snapshot["database"]["connected"] and snapshot["database"]["ping_ms"] >= 0
+    assert snapshot["replicas"] == []
+    assert asyncio.run(health_routes.health_check())["status"] == "healthy"
+
+
+def test_a_worker_that_has_not_warmed_up_is_not_ready(monitor, scratch_db):
+    monitor.warmed = False
+    asyncio.run(monitor.refresh())
+
+    status, snapshot = readyz()
+
+    assert status == 503
+    assert snapshot["reason"] == "warming up" and snapshot["database"]["connected"]
+
+
+def test_an_unreachable_database_fails_readiness_but_not_liveness(monitor, scratch_db):
+    scratch_db.database_url = "postgresql://docuser@localhost:1/unreachable"
+    asyncio.run(monitor.refresh())
+
+    status, snapshot = readyz()
+
+    assert status == 503
+    assert snapshot["reason"] == "database unreachable"
+    assert snapshot["database"]["connected"] is False and snapshot["database"]["error"]
+    assert asyncio.run(health_routes.liveness()) == {"status": "alive"}
+
+
+def test_a_database_slower_than_the_timeout_is_unreachable(monitor, scratch_db, monkeypatch):
+    monkeypatch.setattr(health, "HEALTH_CHECK_TIMEOUT", 0.05)
+    monkeypatch.setattr(scratch_db, "execute_one", lambda *args: time.sleep(0.3))
+
+    asyncio.run(monitor.refresh())
+
+    assert readyz()[1]["database"] == {"connected": False, "error": "TimeoutError"}
+
+
+def test_a_saturated_pool_is_not_ready(monitor, scratch_db, monkeypatch):
+    monkeypatch.setattr(health, "POOL_SATURATION_LIMIT", 0.5)
+    scratch_db.open_pool(min_size=1, max_size=2)
+
+    with scratch_db.acquire():
+        asyncio.run(monitor.refresh())
+
+    status, snapshot = readyz()
+    assert status == 503
+    assert snapshot["reason"] == "connection pool saturated"
+    assert snapshot["pool"]["saturation"] == 0.5
+
+
+def test_a_stale_snapshot_is_not_ready(monitor, scratch_db):
+    asyncio.run(monitor.refresh())
+    monitor.snapshot["checked_at"] -= health.HEALTH_CHECK_INTERVAL * 4
+
+    status, snapshot = readyz()
+
+    assert status == 503
+    assert snapshot["reason"] == "health check stale"
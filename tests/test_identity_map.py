@@ -0,0 +1,89 @@
+"""
+Identity map: within one request scope a doctor, its children and the department list
+are loaded once; any write forgets everything loaded so far, and outside a scope nothing
+is cached.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app import identity_map
+from app.schema import extensions
+from app.services import DepartmentService, DoctorService
+from app.services.doctor_services import AssemblyMode
+
+RENAME_TWICE = """
+    mutation {
+        first: updateDoctorName(doctorId: 1, name: "Dr. First") { name }
+        second: updateDoctorName(doctorId: 1, name: "Dr. Second") { name }
+    }
+"""
+
+
+@pytest.fixture
+def statements(database):
+    """Queries run while the fixture is active"""
+    seen = []
+    listener = lambda query, rows: seen.append(query)
+    database.statement_listeners.append(listener)
+    yield seen
+    database.statement_listeners.remove(listener)
+
+
+@contextmanager
+def request_scope():
+    scope, token = identity_map.begin_request_scope()
+    try:
+        yield scope
+    finally:
+        identity_map.end_request_scope(token)
+
+
+@pytest.mark.parametrize("mode", [AssemblyMode.PER_ROW, AssemblyMode.BATCHED])
+def test_a_doctor_is_assembled_once_per_scope(statements, mode):
+    with request_scope() as scope:
+        first = DoctorService.find_doctors("WHERE d.id = %s", (2,), mode=mode)
+        assembled = len(statements)
+        second = DoctorService.find_doctors("WHERE d.id = %s", (2,), mode=mode)
+
+    assert second == first
+    assert second[0] is first[0]
+    # only the doctors row itself is selected again
+    assert len(statements) == assembled + 1
+    assert scope.stats()["hits"] >= 1 and scope.stats()["queriesSaved"] >= 1
+
+
+def test_departments_are_loaded_once_per_scope(statements):
+    with request_scope():
+        DepartmentService.get_all_departments()
+        DepartmentService.get_all_departments()
+
+    assert len(statements) == 1
+
+
+def test_a_write_forgets_what_was_loaded(database):
+    with request_scope() as scope:
+        before = DoctorService.find_doctors("WHERE d.id = %s", (3,))[0]
+        database.execute_mutation("UPDATE qualifications SET qualification = 'DNB' WHERE doctor_id = 3")
+        after = DoctorService.find_doctors("WHERE d.id = %s", (3,))[0]
+
+    assert "DNB" not in before.qualifications and "DNB" in after.qualifications
+    assert scope.stats()["invalidations"] == 1
+
+
+def test_nothing_is_cached_outside_a_scope(statements):
+    DepartmentService.get_all_departments()
+    DepartmentService.get_all_departments()
+
+    assert len(statements) == 2
+    assert identity_map.current_identity_map() is None
+
+
+def test_each_mutation_sees_the_previous_write(graphql, monkeypatch):
+    monkeypatch.setattr(extensions, "DEBUG_EXTENSIONS", True)
+
+    result = graphql(RENAME_TWICE)
+
+    assert not result.errors, result.errors[0].message
+    assert result.data == {"first": {"name": "Dr. First"}, "second": {"name": "Dr. Second"}}
+    assert result.extensions["identityMap"]["invalidations"] >= 1
@@ -0,0 +1,94 @@
+"""
+Index advisor: EXPLAIN ANALYZE classifies sequential scans (selective, unselective, full
+reads), explains writes without keeping their effects, and captures the read and write
+workload without leaving its throwaway doctors behind.
+"""
+import os
+
+import pytest
+
+from app import index_advisor
+from app.services.archive_services import ARCHIVE_BATCH_QUERY
+from app.services.cleanup_services import DELETE_BATCH_QUERY
+
+TABLE_ROWS = {"doctors": 100}
+
+
+def is_submission(query: str) -> bool:
+    return " ".join(query.split()).startswith("WITH doctor AS ( INSERT INTO doctors")
+
+
+def explain(query, params=None, min_rows=50, doctor_ids=()):
+    return index_advisor.explain(query, params, TABLE_ROWS, min_rows, 0.1, list(doctor_ids))
+
+
+def test_a_selective_filter_on_a_large_table_is_flagged(database):
+    report = explain("SELECT id FROM doctors WHERE bio = %s", ("no such bio",))
+
+    assert report["seq_scans"] == ["doctors"]
+    assert report["unselective"] == [] and report["full_reads"] == []
+    assert report["time_ms"] >= 0
+
+
+def test_unselective_filters_and_full_reads_are_not_flagged(database):
+    unselective = explain("SELECT id FROM doctors WHERE current_step >= %s", (1,))
+    full_read = explain("SELECT id FROM doctors")
+
+    assert unselective["seq_scans"] == [] and unselective["unselective"] == ["doctors (100% kept)"]
+    assert full_read["seq_scans"] == [] and full_read["full_reads"] == ["doctors"]
+
+
+def test_small_tables_are_not_flagged(database):
+    report = explain("SELECT id FROM doctors WHERE bio = %s", ("no such bio",), min_rows=1000)
+
+    assert report["seq_scans"] == []
+
+
+def test_a_write_is_explained_and_rolled_back(database):
+    report = explain("UPDATE doctors SET name = %s WHERE id = %s", ("Dr. Explained", 1))
+
+    assert "doctors_pkey" in report["indexes"]
+    assert database.execute_one("SELECT name FROM doctors WHERE id = 1") == {"name": "Doctor 1"}
+    assert database.execute_one("SELECT 1 AS one") == {"one": 1}
+
+
+@pytest.fixture(scope="module")
+def captured(database):
+    doctor_ids = []
+    queries = index_advisor.capture_queries(doctor_ids)
+    yield queries, doctor_ids
+    index_advisor.remove_doctors(doctor_ids)
+
+
+def test_capture_includes_reads_and_writes_and_restores_the_mode(captured):
+    queries, doctor_ids = captured
+
+    kinds = {kind for kind, _ in queries.values()}
+    assert kinds == {"read", "write"}
+    assert queries[ARCHIVE_BATCH_QUERY][0] == "write" and queries[DELETE_BATCH_QUERY][0] == "write"
+    assert any(is_submission(query) for query in queries)
+    assert len(doctor_ids) == 2
+    assert "DOCTOR_ASSEMBLY_MODE" not in os.environ
+
+
+def test_the_submission_insert_is_explained_despite_existing_keys(captured, database):
+    queries, doctor_ids = captured
+    insert = next(query for query in queries if is_submission(query))
+    _, params = queries[insert]
+
+    report = explain(insert, params, doctor_ids=doctor_ids)
+
+    assert report["time_ms"] >= 0
+    # the retry deleted the workload doctors inside the rolled back transaction only
+    assert database.execute_column("SELECT id FROM doctors WHERE id = ANY(%s) ORDER BY id", (doctor_ids,)) == doctor_ids
+
+
+def test_removing_the_workload_doctors_leaves_nothing_behind(captured, database):
+    _, doctor_ids = captured
+
+    index_advisor.remove_doctors(doctor_ids)
+
+    assert database.execute_query("SELECT id FROM doctors WHERE register_no LIKE 'ADV-WRITE-%%'") == []
+    assert database.execute_query(
+        "SELECT id FROM jobs WHERE payload->>'doctor_id' = ANY(%s)", ([str(i) for i in doctor_ids],)
+    ) == []
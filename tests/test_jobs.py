@@ -0,0 +1,148 @@
+"""
+Job queue: claiming with SKIP LOCKED, retries with backoff into dead_jobs, dedupe keys,
+and reclaiming a job whose worker went silent, with heartbeat() stopping the old run.
+"""
+import psycopg2
+import pytest
+
+from app import jobs
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(database):
+    database.execute_mutation("DELETE FROM jobs")
+    database.execute_mutation("DELETE FROM dead_jobs")
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Registers test.record (records payloads), test.fail (raises) and test.slow (heartbeats)"""
+    seen = []
+
+    def fail(payload):
+        raise RuntimeError(f"boom {payload['n']}")
+
+    def slow(payload):
+        seen.append(payload)
+        jobs.heartbeat()
+        seen.append("after heartbeat")
+
+    monkeypatch.setitem(jobs.HANDLERS, "test.record", seen.append)
+    monkeypatch.setitem(jobs.HANDLERS, "test.fail", fail)
+    monkeypatch.setitem(jobs.HANDLERS, "test.slow", slow)
+    return seen
+
+
+def job_row(database, job_id):
+    return database.execute_one("SELECT * FROM jobs WHERE id = %s", (job_id,))
+
+
+def test_a_claimed_job_runs_and_is_deleted(database, calls):
+    job_id = jobs.enqueue("test.record", {"n": 1})
+
+    job = jobs.claim_job("worker-a")
+    jobs.run_job(job)
+
+    assert job["id"] == job_id and job["attempts"] == 1
+    assert calls == [{"n": 1}]
+    assert job_row(database, job_id) is None
+    assert jobs.claim_job("worker-a") is None
+
+
+def test_a_locked_job_is_skipped_not_waited_for(database, calls):
+    first = jobs.enqueue("test.record", {"n": 1})
+    second = jobs.enqueue("test.record", {"n": 2})
+    other = psycopg2.connect(database.database_url)
+    try:
+        with other.cursor() as cursor:
+            cursor.execute("SELECT id FROM jobs WHERE id = %s FOR UPDATE", (first,))
+            assert jobs.claim_job("worker-a")["id"] == second
+    finally:
+        other.close()
+
+    assert jobs.claim_job("worker-b")["id"] == first
+
+
+def test_a_delayed_job_waits_for_its_time(database):
+    jobs.enqueue("test.record", {"n": 1}, delay=60)
+
+    assert jobs.claim_job("worker-a") is None
+
+
+def test_failures_back_off_then_move_to_dead_jobs(database, calls):
+    job_id = jobs.enqueue("test.fail", {"n": 7}, max_attempts=2)
+
+    jobs.run_job(jobs.claim_job("worker-a"))
+    retry = job_row(database, job_id)
+    assert retry["status"] == "queued" and retry["locked_by"] is None
+    assert retry["last_error"] == "RuntimeError: boom 7"
+    delay = database.execute_one(
+        "SELECT EXTRACT(EPOCH FROM run_at - now()) AS seconds FROM jobs WHERE id = %s", (job_id,)
+    )["seconds"]
+    assert jobs.JOB_BACKOFF_SECONDS * 0.5 - 1 <= float(delay) <= jobs.JOB_BACKOFF_SECONDS
+    assert jobs.claim_job("worker-a") is None
+
+    database.execute_mutation("UPDATE jobs SET run_at = now() WHERE id = %s", (job_id,))
+    jobs.run_job(jobs.claim_job("worker-a"))
+
+    assert job_row(database, job_id) is None
+    dead = database.execute_one("SELECT * FROM dead_jobs WHERE id = %s", (job_id,))
+    assert dead["attempts"] == 2 and dead["kind"] == "test.fail"
+
+
+def test_a_job_without_a_handler_goes_straight_to_dead_jobs(database):
+    job_id = jobs.enqueue("test.unknown")
+
+    jobs.run_job(jobs.claim_job("worker-a"))
+
+    assert database.execute_one("SELECT last_error FROM dead_jobs WHERE id = %s", (job_id,)) == {
+        "last_error": "No handler for job kind test.unknown",
+    }
+
+
+def test_only_one_job_per_dedupe_key_is_queued(database, calls):
+    first = jobs.enqueue("test.fail", {"n": 1}, dedupe_key="same")
+    assert jobs.enqueue("test.fail", {"n": 2}, dedupe_key="same") is None
+
+    job = jobs.claim_job("worker-a")
+    # while the first one runs another may be queued; its retry then folds into it
+    second = jobs.enqueue("test.fail", {"n": 3}, dedupe_key="same")
+    assert second is not None
+    jobs.run_job(job)
+
+    assert database.execute_column("SELECT id FROM jobs") == [second]
+    assert job_row(database, first) is None
+
+
+def test_a_silent_workers_job_is_reclaimed_and_its_heartbeat_fails(database, calls):
+    job_id = jobs.enqueue("test.slow", {"n": 1})
+    stale = jobs.claim_job("worker-a")
+    assert jobs.claim_job("worker-b") is None
+
+    database.execute_mutation(
+        "UPDATE jobs SET locked_at = now() - make_interval(secs => %s + 1) WHERE id = %s",
+        (jobs.JOB_LOCK_TIMEOUT, job_id)
+    )
+    reclaimed = jobs.claim_job("worker-b")
+    assert reclaimed["id"] == job_id and reclaimed["attempts"] == 2
+
+    jobs.run_job(stale)
+    assert calls == [{"n": 1}]
+    assert job_row(database, job_id)["locked_by"] == "worker-b"
+
+    jobs.run_job(reclaimed)
+    assert calls == [{"n": 1}, {"n": 1}, "after heartbeat"]
+    assert job_row(database, job_id) is None
+
+
+def test_heartbeat_outside_a_job_does_nothing():
+    assert jobs.heartbeat() is None
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_BACKOFF_SECONDS", 10.0)
+    monkeypatch.setattr(jobs, "JOB_BACKOFF_MAX_SECONDS", 30.0)
+
+    assert 5.0 <= jobs.backoff_seconds(1) <= 10.0
+    assert 10.0 <= jobs.backoff_seconds(2) <= 20.0
+    assert 15.0 <= jobs.backoff_seconds(5) <= 30.0
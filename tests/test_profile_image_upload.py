@@ -0,0 +1,127 @@
+"""
+Profile image upload route, called with a streamed request body: a valid image is stored,
+attached and resized in the image pool, the upload it replaces is deleted, and bad
+uploads are rejected without leaving files behind.
+"""
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.requests import Request
+
+from app import media
+from app.media import ImageProcessor
+from app.routers import media as media_routes
+
+DOCTOR = "query($id: Int!) { doctor(id: $id) { profileImageUrl small: profileImage(size: 64) } }"
+
+
+def png_bytes(size=(300, 200)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def upload_request(doctor_id: int, body: bytes, content_type="image/png", chunk_size=4096) -> Request:
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http", "method": "POST", "path": f"/doctors/{doctor_id}/profile-image",
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())],
+    }
+    return Request(scope, receive)
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "MEDIA_ROOT", str(tmp_path))
+    monkeypatch.setattr(media_routes, "image_processor", ImageProcessor(workers=1))
+    return tmp_path
+
+
+def upload(doctor_id: int, body: bytes, **options):
+    """Run the route and let the background resize finish; returns the response"""
+    async def scenario():
+        try:
+            return await media_routes.upload_profile_image(doctor_id, upload_request(doctor_id, body, **options))
+        finally:
+            await media_routes.image_processor.stop()
+
+    return asyncio.run(scenario())
+
+
+def uploads(media_root, doctor_id):
+    directory = media_root / "profile_images" / str(doctor_id)
+    return sorted(path.name for path in directory.iterdir()) if directory.exists() else []
+
+
+def test_an_upload_is_stored_resized_and_replaces_the_previous_one(media_root, database, graphql):
+    first = upload(1, png_bytes())
+    assert first.status_code == 202
+    (first_key,) = uploads(media_root, 1)
+    assert sorted(os.listdir(media_root / "profile_images" / "1" / first_key)) == ["256.webp", "64.webp", "original.png"]
+
+    second = upload(1, png_bytes((120, 120)))
+
+    (second_key,) = uploads(media_root, 1)
+    assert second_key != first_key
+    doctor = graphql(DOCTOR, {"id": 1}).data["doctor"]
+    assert doctor["profileImageUrl"] == f"/media/profile_images/1/{second_key}/original.png"
+    assert doctor["small"] == f"/media/profile_images/1/{second_key}/64.webp"
+    assert database.execute_one("SELECT current_step FROM doctors WHERE id = 1")["current_step"] == 8
+    assert b'"pending_sizes":[64,256]' in second.body
+
+
+def test_an_external_url_removes_the_uploaded_image(media_root, graphql):
+    upload(2, png_bytes())
+    assert uploads(media_root, 2)
+
+    result = graphql('mutation { updateProfileImage(doctorId: 2, imageUrl: "https://cdn.example.com/2.png") { profileImageUrl } }')
+
+    assert not result.errors, result.errors[0].message
+    assert uploads(media_root, 2) == []
+
+
+@pytest.mark.parametrize("body, content_type, status", [
+    (b"not an image at all", "image/png", 415),
+    (png_bytes(), "image/jpeg", 415),
+    (png_bytes(), "image/gif", 415),
+    (b"", "image/png", 400),
+])
+def test_bad_uploads_are_rejected_without_leaving_files(media_root, database, body, content_type, status):
+    before = database.execute_one("SELECT profile_image_url FROM doctors WHERE id = 3")
+
+    with pytest.raises(HTTPException) as rejected:
+        upload(3, body, content_type=content_type)
+
+    assert rejected.value.status_code == status
+    assert uploads(media_root, 3) == []
+    assert database.execute_one("SELECT profile_image_url FROM doctors WHERE id = 3") == before
+
+
+def test_an_oversized_upload_is_rejected(media_root, monkeypatch):
+    monkeypatch.setattr(media_routes, "PROFILE_IMAGE_MAX_BYTES", 1024)
+
+    with pytest.raises(HTTPException) as rejected:
+        upload(4, png_bytes((800, 800)))
+
+    assert rejected.value.status_code == 413
+
+
+def test_an_unknown_doctor_is_not_found(media_root):
+    with pytest.raises(HTTPException) as rejected:
+        upload(9999, png_bytes())
+
+    assert rejected.value.status_code == 404
+    assert rejected.value.detail == "Doctor 9999 not found"
+    assert uploads(media_root, 9999) == []
@@ -0,0 +1,143 @@
+"""
+Sampling profiler: a GraphQL operation sent with "X-Profile: 1" and the token comes back
+with the collapsed stacks of the threads that worked on it, resolver threads included;
+GET /debug/profile samples the whole worker, and both refuse requests without the token.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import profiler
+from app.profiler import Sampler, profiled_threads, run_profiled
+from app.routers import debug
+from app.schema import get_schema
+
+TOKEN = "profile-secret"
+ALL_DOCTORS = "{ allDoctors { id name schedules { dayOfWeek } } }"
+
+
+def request(headers=None) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER_TOKEN", TOKEN)
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", True)
+
+
+@pytest.fixture
+def profiled_schema(enabled, database):
+    """A schema built with the profiler installed; every SQL statement takes 20ms"""
+    listener = lambda query, rows: time.sleep(0.02)
+    database.statement_listeners.append(listener)
+    yield get_schema.__wrapped__()
+    database.statement_listeners.remove(listener)
+
+
+def execute(schema, headers):
+    result = asyncio.run(schema.execute(ALL_DOCTORS, context_value={"request": request(headers)}))
+    assert not result.errors, result.errors[0].message
+    return result
+
+
+def test_a_profiled_operation_returns_its_stacks(profiled_schema):
+    result = execute(profiled_schema, {"X-Profile": "1", "X-Profile-Token": TOKEN})
+
+    assert len(result.data["allDoctors"]) == 100
+    profile = result.extensions["profile"]
+    assert profile["samples"] > 0 and profile["intervalMs"] == profiler.PROFILER_INTERVAL * 1000
+    stacks = profile["collapsed"].splitlines()
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in stacks)
+    # the resolver ran in a resolver thread and was sampled there
+    assert any(line.startswith("resolver") and "find_doctors" in line for line in stacks)
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"X-Profile": "1"},
+    {"X-Profile": "1", "X-Profile-Token": "wrong"},
+    {"X-Profile-Token": TOKEN},
+])
+def test_operations_without_the_header_and_token_are_not_profiled(profiled_schema, headers):
+    result = execute(profiled_schema, headers)
+
+    assert "profile" not in (result.extensions or {})
+
+
+def test_the_token_is_accepted_as_a_bearer_token_and_never_when_disabled(enabled, monkeypatch):
+    assert profiler.authorized({"authorization": f"Bearer {TOKEN}"})
+    assert not profiler.authorized({"authorization": "Bearer nope"})
+
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", False)
+    assert not profiler.authorized({"x-profile-token": TOKEN})
+
+
+def test_the_sampler_follows_only_the_threads_running_the_operation():
+    threads = set()
+    token = profiled_threads.set(threads)
+    sampler = Sampler(thread_ids=threads, include_idle=True, interval=0.001).start()
+    try:
+        def busy():
+            deadline = time.monotonic() + 0.1
+            while time.monotonic() < deadline:
+                pass
+        # resolver threads run with a copy of the operation's context
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(run_profiled, busy), name="busy-worker")
+        bystander = threading.Thread(target=lambda: busy(), name="bystander")
+        worker.start(), bystander.start()
+        worker.join(), bystander.join()
+    finally:
+        sampler.stop()
+        profiled_threads.reset(token)
+
+    assert threads == set()
+    assert sampler.stacks and all(stack.startswith("busy-worker;") for stack in sampler.stacks)
+    assert any("busy" in stack.rsplit(";", 1)[1] for stack in sampler.stacks)
+
+
+def test_idle_threads_are_left_out_of_worker_profiles():
+    waiting = threading.Event()
+    idler = threading.Thread(target=waiting.wait, name="idler")
+    idler.start()
+    try:
+        sampler = Sampler(interval=0.001).start()
+        time.sleep(0.05)
+        sampler.stop()
+    finally:
+        waiting.set()
+        idler.join()
+
+    assert sampler.samples > 0
+    assert not any(stack.startswith("idler;") for stack in sampler.stacks)
+
+
+def test_the_debug_route_profiles_the_worker(enabled):
+    response = asyncio.run(debug.profile(request({"X-Profile-Token": TOKEN}), seconds=0.05, idle=True))
+
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert response.body.decode().endswith("\n")
+
+
+def test_the_debug_route_needs_the_token_and_runs_one_profile_at_a_time(enabled):
+    with pytest.raises(HTTPException) as unauthorized:
+        asyncio.run(debug.profile(request({"X-Profile-Token": "wrong"}), seconds=0.05, idle=False))
+    assert unauthorized.value.status_code == 401
+
+    async def overlapping():
+        first = asyncio.create_task(debug.profile(request({"X-Profile-Token": TOKEN}), seconds=0.1, idle=False))
+        await asyncio.sleep(0.01)
+        try:
+            await debug.profile(request({"X-Profile-Token": TOKEN}), seconds=0.05, idle=False)
+        finally:
+            await first
+
+    with pytest.raises(HTTPException) as busy:
+        asyncio.run(overlapping())
+    assert busy.value.status_code == 409
@@ -0,0 +1,208 @@
+"""
+Query budgets: every GraphQL query and mutation runs against the seeded test database
+while the Database statement hook counts its SQL statements and rows. An operation
+that needs more statements or rows than recorded in query_budgets.json fails, which
+catches N+1 regressions (allDoctors over 100 doctors is a handful of statements, not
+hundreds).
+
+After an intended change, rerecord the budgets and commit the snapshot:
+
+    UPDATE_QUERY_BUDGETS=1 TEST_DATABASE_URL=... python -m pytest tests/test_query_budgets.py
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from graphql import FieldNode, OperationDefinitionNode, parse
+
+BUDGETS_FILE = Path(__file__).with_name("query_budgets.json")
+UPDATE_BUDGETS = os.getenv("UPDATE_QUERY_BUDGETS", "0") == "1"
+
+DOCTOR_FIELDS = """
+    id name email registerNo bio mobileNumbers qualifications specializations
+    onboardingStatus currentStep profileImage
+    departments { id name iconName }
+    address { city pincode }
+    appointmentSettings { consultationCharge avgDurationMinutes }
+    schedules { dayOfWeek startTime endTime }
+"""
+SCHEDULES = [
+    {"dayOfWeek": day, "startTime": "09:00", "endTime": "17:00", "isAvailable": True}
+    for day in range(1, 6)
+]
+ADDRESS = {"country": "India", "state": "Kerala", "city": "Kochi", "pincode": "682001"}
+SETTINGS = {
+    "consultationCharge": 500, "followUpCharge": 250, "followUpPeriodDays": 7,
+    "advanceBookingDays": 30, "avgDurationMinutes": 15,
+}
+
+# (name, document, variables from the state so far), run in this order: the queries
+# read the seeded doctors, the mutations onboard a new one step by step
+Operation = Tuple[str, str, Callable[[Dict[str, Any]], Dict[str, Any]]]
+OPERATIONS: List[Operation] = [
+    ("departments", "{ departments { id name iconName } }", lambda state: {}),
+    ("searchDepartments", "query($q: String!) { searchDepartments(search: $q) { id name } }",
+     lambda state: {"q": "card"}),
+    ("allDoctors", f"{{ allDoctors {{ {DOCTOR_FIELDS} }} }}", lambda state: {}),
+    ("allDoctors(status)", f"query($s: String) {{ allDoctors(status: $s) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"s": "in_progress"}),
+    ("doctor", f"query($id: Int!) {{ doctor(id: $id) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["doctor_id"]}),
+    ("checkRegistration", f"query($e: String) {{ checkRegistration(email: $e) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"e": state["email"]}),
+    ("onboardingMetadata",
+     "query($id: Int!) { onboardingMetadata(doctorId: $id) { totalSteps completedSteps currentStep isComplete } }",
+     lambda state: {"id": state["doctor_id"]}),
+    ("searchDoctors(text)",
+     f"query($t: String) {{ searchDoctors(text: $t, first: 20) {{ totalCount doctors {{ {DOCTOR_FIELDS} }} }} }}",
+     lambda state: {"t": "doctor"}),
+    ("searchDoctors(filters)",
+     f"""query($f: DoctorFilterInput) {{
+         searchDoctors(filters: $f) {{ totalCount departments {{ value count }} doctors {{ {DOCTOR_FIELDS} }} }}
+     }}""",
+     lambda state: {"f": {"departmentId": state["department_id"], "city": state["city"]}}),
+    ("doctorStats", "{ doctorStats { total byStatus { value count } byCity { value count } byStep { value count } } }",
+     lambda state: {}),
+    ("doctorStats(filters)", "query($f: DoctorFilterInput) { doctorStats(filters: $f) { total byStatus { value count } } }",
+     lambda state: {"f": {"departmentId": state["department_id"]}}),
+    ("doctorChanges", f"{{ doctorChanges(limit: 100) {{ cursor doctors {{ {DOCTOR_FIELDS} }} deletedIds }} }}",
+     lambda state: {}),
+    ("startOnboarding",
+     f"""mutation($r: String!, $e: String!, $m: [String!]!) {{
+         startOnboarding(registerNo: $r, email: $e, mobileNumbers: $m) {{ {DOCTOR_FIELDS} }}
+     }}""",
+     lambda state: {"r": "BUDGET-1", "e": "budget-1@example.com", "m": ["9000000001", "9000000002"]}),
+    ("updateDoctorName",
+     f"mutation($id: Int!) {{ updateDoctorName(doctorId: $id, name: \"Dr. Budget\") {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["new_doctor_id"]}),
+    ("updateQualificationsAndBio",
+     f"""mutation($id: Int!) {{
+         updateQualificationsAndBio(doctorId: $id, qualifications: ["MBBS", "MD"],
+                                    specializations: ["Cardiology"], bio: "Budget doctor") {{ {DOCTOR_FIELDS} }}
+     }}""",
+     lambda state: {"id": state["new_doctor_id"]}),
+    ("updateAddress",
+     f"mutation($id: Int!, $a: AddressInput!) {{ updateAddress(doctorId: $id, addressInput: $a) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["new_doctor_id"], "a": ADDRESS}),
+    ("updateAppointmentSettings",
+     f"""mutation($id: Int!, $s: AppointmentSettingsInput!) {{
+         updateAppointmentSettings(doctorId: $id, settings: $s) {{ {DOCTOR_FIELDS} }}
+     }}""",
+     lambda state: {"id": state["new_doctor_id"], "s": SETTINGS}),
+    ("updateSchedule",
+     f"mutation($id: Int!, $s: [ScheduleInput!]!) {{ updateSchedule(doctorId: $id, schedules: $s) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["new_doctor_id"], "s": SCHEDULES}),
+    ("addDepartments",
+     f"mutation($id: Int!, $d: [Int!]!) {{ addDepartments(doctorId: $id, departmentIds: $d) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["new_doctor_id"], "d": [state["department_id"]]}),
+    ("updateProfileImage",
+     f"""mutation($id: Int!) {{
+         updateProfileImage(doctorId: $id, imageUrl: "https://cdn.example.com/budget.jpg") {{ {DOCTOR_FIELDS} }}
+     }}""",
+     lambda state: {"id": state["new_doctor_id"]}),
+    ("completeOnboarding",
+     f"mutation($id: Int!) {{ completeOnboarding(doctorId: $id) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"id": state["new_doctor_id"]}),
+    ("submitOnboarding",
+     f"mutation($i: OnboardingSubmissionInput!) {{ submitOnboarding(input: $i) {{ {DOCTOR_FIELDS} }} }}",
+     lambda state: {"i": {
+         "registerNo": "BUDGET-2", "email": "budget-2@example.com", "mobileNumbers": ["9000000003"],
+         "name": "Dr. Submitted", "bio": "Submitted in one go", "qualifications": ["MBBS"],
+         "specializations": ["Surgery"], "address": ADDRESS, "appointmentSettings": SETTINGS,
+         "schedules": SCHEDULES, "departmentIds": [state["department_id"]],
+         "profileImageUrl": "https://cdn.example.com/budget-2.jpg",
+     }}),
+]
+
+
+def root_fields(document: str) -> List[str]:
+    return [
+        selection.name.value
+        for definition in parse(document).definitions if isinstance(definition, OperationDefinitionNode)
+        for selection in definition.selection_set.selections if isinstance(selection, FieldNode)
+    ]
+
+
+def load_budgets() -> Dict[str, Dict[str, int]]:
+    return json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {}
+
+
+@pytest.fixture(scope="module")
+def measurements(database) -> Dict[str, Dict[str, Any]]:
+    """Run every operation once, in order; returns its statement and row counts"""
+    from app.schema import get_schema
+
+    schema = get_schema()
+    sample = database.execute_one("""
+        SELECT d.id AS doctor_id, d.email, dd.department_id, a.city
+        FROM doctors d
+        JOIN doctor_departments dd ON dd.doctor_id = d.id
+        JOIN addresses a ON a.doctor_id = d.id
+        ORDER BY d.id LIMIT 1
+    """)
+    state: Dict[str, Any] = dict(sample)
+    statements: List[Tuple[str, int]] = []
+
+    def listener(query: str, rows: int):
+        statements.append((" ".join(query.split()), rows))
+
+    results = {}
+    database.statement_listeners.append(listener)
+    try:
+        for name, document, variables in OPERATIONS:
+            statements.clear()
+            result = asyncio.run(schema.execute(document, variable_values=variables(state)))
+            assert not result.errors, f"{name}: {result.errors[0].message}"
+            if name == "startOnboarding":
+                state["new_doctor_id"] = int(result.data["startOnboarding"]["id"])
+            results[name] = {
+                "statements": len(statements),
+                "rows": sum(rows for _, rows in statements),
+                "log": list(statements),
+            }
+    finally:
+        database.statement_listeners.remove(listener)
+
+    if UPDATE_BUDGETS:
+        budgets = {
+            name: {"statements": measured["statements"], "rows": measured["rows"]}
+            for name, measured in results.items()
+        }
+        BUDGETS_FILE.write_text(json.dumps(budgets, indent=2) + "\n")
+    return results
+
+
+def test_every_root_field_has_an_operation():
+    from app.schema import get_schema
+
+    schema = get_schema()._schema
+    covered = {field for _, document, _ in OPERATIONS for field in root_fields(document)}
+    for root in (schema.query_type, schema.mutation_type):
+        missing = set(root.fields) - covered
+        assert not missing, f"{root.name} fields without a query budget operation: {sorted(missing)}"
+
+
+def test_every_operation_has_a_budget():
+    budgets = load_budgets()
+    missing = [name for name, _, _ in OPERATIONS if name not in budgets]
+    assert UPDATE_BUDGETS or not missing, (
+        f"no recorded budget for {missing}; run with UPDATE_QUERY_BUDGETS=1 and commit {BUDGETS_FILE.name}"
+    )
+
+
+@pytest.mark.parametrize("name", [name for name, _, _ in OPERATIONS])
+def test_operation_within_budget(name, measurements):
+    budget = load_budgets().get(name)
+    if budget is None:
+        pytest.skip(f"no recorded budget for {name}")
+    measured = measurements[name]
+    log = "\n".join(f"  {rows:>5} rows  {query[:150]}" for query, rows in measured["log"])
+    assert measured["statements"] <= budget["statements"], (
+        f"{name} ran {measured['statements']} statements, budget is {budget['statements']}:\n{log}"
+    )
+    assert measured["rows"] <= budget["rows"], (
+        f"{name} read or wrote {measured['rows']} rows, budget is {budget['rows']}:\n{log}"
+    )
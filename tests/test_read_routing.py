@@ -0,0 +1,108 @@
+"""
+Read replicas: query operations read from a replica, mutations and everything after a
+write stay on the primary, the read-your-writes cookie pins a client to the primary, and
+an unreachable or lagging replica is ejected with the read retried on the primary.
+
+The test database stands in for its own replica, told apart by application_name.
+"""
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import read_routing
+
+WHO_ANSWERED = "SELECT current_setting('application_name') AS name"
+
+
+@pytest.fixture
+def routed(database, monkeypatch):
+    """The shared Database with one replica pool, recording which pool served each read"""
+    separator = "&" if "?" in database.database_url else "?"
+    monkeypatch.setattr(database, "replica_urls", [f"{database.database_url}{separator}application_name=replica"])
+    database.close()
+    database.open_pool(min_size=1, max_size=2)
+    served = []
+    acquire = database.acquire
+
+    def recording_acquire(pool=None):
+        served.append("replica" if pool in database.replicas else "primary")
+        return acquire(pool)
+
+    monkeypatch.setattr(database, "acquire", recording_acquire)
+    monkeypatch.setattr(database, "served", served, raising=False)
+    yield database
+    monkeypatch.undo()
+    database.close()
+
+
+def test_reads_in_a_replica_route_go_to_the_replica(routed):
+    with read_routing.replica_reads():
+        assert routed.execute_one(WHO_ANSWERED) == {"name": "replica"}
+
+    assert routed.execute_one(WHO_ANSWERED) != {"name": "replica"}
+
+
+def test_a_write_pins_the_rest_of_the_route_to_the_primary(routed):
+    with read_routing.replica_reads() as route:
+        routed.execute_mutation("UPDATE doctors SET name = 'Dr. Pinned' WHERE id = 1")
+        row = routed.execute_one("SELECT name FROM doctors WHERE id = 1")
+
+    assert route.wrote
+    assert row == {"name": "Dr. Pinned"}
+    assert routed.served[-1] == "primary"
+
+
+def test_queries_use_the_replica_and_mutations_set_the_primary_cookie(routed, graphql):
+    graphql("{ departments { id } }", context={"request": None, "response": Response()})
+    assert "replica" in routed.served
+
+    routed.served.clear()
+    response = Response()
+    result = graphql('mutation { updateDoctorName(doctorId: 2, name: "Dr. Cookie") { name } }',
+                     context={"request": None, "response": response})
+    assert not result.errors, result.errors[0].message
+    assert "replica" not in routed.served
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(f"{read_routing.PRIMARY_COOKIE}=")
+
+    routed.served.clear()
+    value = cookie.split(";")[0].split("=", 1)[1]
+    pinned = Request({"type": "http", "headers": [(b"cookie", f"{read_routing.PRIMARY_COOKIE}={value}".encode())]})
+    result = graphql("query { doctor(id: 2) { name } }", context={"request": pinned, "response": Response()})
+    assert result.data == {"doctor": {"name": "Dr. Cookie"}}
+    assert "replica" not in routed.served
+
+
+def test_an_expired_or_garbled_cookie_does_not_pin():
+    assert not read_routing.pinned_to_primary(f"{time.time() - 1:.3f}")
+    assert not read_routing.pinned_to_primary("not-a-time")
+    assert not read_routing.pinned_to_primary(None)
+    assert read_routing.pinned_to_primary(read_routing.primary_cookie_value())
+
+
+def test_an_unreachable_replica_is_ejected_and_the_read_retried(routed):
+    routed.close()
+    routed.replica_urls = ["postgresql://docuser@localhost:1/unreachable"]
+    routed.open_pool(min_size=1, max_size=2)
+
+    with read_routing.replica_reads():
+        assert routed.execute_one("SELECT 1 AS one") == {"one": 1}
+        assert routed.served[-2:] == ["replica", "primary"]
+        assert routed.replicas[0].ejected_until > time.time()
+        routed.execute_one("SELECT 1 AS one")
+
+    assert routed.served[-1] == "primary" and routed.served[-2] == "primary"
+    (status,) = routed.check_replicas()
+    assert status["connected"] is False and status["ejected"]
+
+
+def test_a_lagging_replica_is_ejected_until_it_catches_up(routed, monkeypatch):
+    monkeypatch.setattr(routed, "replica_max_lag", -1.0)
+    (status,) = routed.check_replicas()
+    assert status["connected"] and status["ejected"]
+
+    routed.replica_max_lag = 10.0
+    (status,) = routed.check_replicas()
+    assert status["lag_seconds"] == 0 and not status["ejected"]
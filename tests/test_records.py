@@ -0,0 +1,79 @@
+"""
+Doctor records: assembled doctors are slotted records without an instance __dict__, a
+list shares one DepartmentRecord per department and one string per repeated value, and
+a JSON document builds the same record as batched assembly.
+"""
+import dataclasses
+
+import pytest
+
+from app import records
+from app.json_codec import loads
+from app.services.doctor_services import DOCTOR_DOCUMENT_QUERY, AssemblyMode, DoctorService
+
+LIST_MODES = [AssemblyMode.BATCHED, AssemblyMode.JSON]
+
+
+def first_doctors(mode, count=20):
+    return DoctorService.find_doctors("WHERE d.id <= %s", (count,), "ORDER BY d.id", mode=mode)
+
+
+def nested(doctor):
+    yield doctor
+    yield from doctor.departments
+    yield from doctor.schedules
+    yield from (record for record in (doctor.address, doctor.appointment_settings) if record is not None)
+
+
+@pytest.mark.parametrize("mode", list(AssemblyMode))
+def test_assembled_doctors_are_slotted_records(database, mode):
+    doctors = first_doctors(mode)
+
+    assert len(doctors) == 20
+    for record in (record for doctor in doctors for record in nested(doctor)):
+        assert dataclasses.is_dataclass(record) and type(record).__module__ == records.__name__
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.not_a_field = 1
+
+
+@pytest.mark.parametrize("mode", LIST_MODES)
+def test_a_list_shares_one_record_per_department(database, mode):
+    doctors = first_doctors(mode)
+
+    by_id = {}
+    for department in (department for doctor in doctors for department in doctor.departments):
+        assert by_id.setdefault(department.id, department) is department
+    # 20 doctors over 10 departments: every department record is reused
+    assert len(by_id) == 10
+
+
+@pytest.mark.parametrize("mode", LIST_MODES)
+def test_repeated_strings_are_one_object(database, mode):
+    first, second = first_doctors(mode, count=2)
+
+    assert first.schedules[0].start_time == "09:00:00" and first.schedules[0].start_time is second.schedules[0].start_time
+    assert first.address.country is second.address.country
+    assert first.qualifications[0] is second.qualifications[0]
+    # a freshly decoded copy interns to the very object the record holds
+    assert records.shared(first.onboarding_status.encode().decode()) is first.onboarding_status
+
+
+def test_a_document_builds_the_same_record_as_batched_assembly(database):
+    (document,) = database.execute_column(f"{DOCTOR_DOCUMENT_QUERY} WHERE d.id = %s", (7,))
+
+    assert DoctorService.doctor_from_document(loads(document)) == first_doctors(AssemblyMode.BATCHED, count=7)[-1]
+
+
+def test_a_document_without_children_or_status_gets_the_defaults(database):
+    doctor_id = database.execute_mutation(
+        "INSERT INTO doctors (register_no, email, onboarding_status, current_step) "
+        "VALUES ('RECORD-1', 'record@example.com', NULL, NULL) RETURNING id"
+    )["id"]
+    (document,) = database.execute_column(f"{DOCTOR_DOCUMENT_QUERY} WHERE d.id = %s", (doctor_id,))
+
+    doctor = DoctorService.doctor_from_document(loads(document))
+
+    assert (doctor.onboarding_status, doctor.current_step) == ("in_progress", 1)
+    assert doctor.address is None and doctor.appointment_settings is None
+    assert doctor.departments == doctor.schedules == doctor.qualifications == []
@@ -0,0 +1,109 @@
+"""
+Round trips: listing doctors costs the same number of SQL statements for a short and a
+long list (BATCHED and JSON assembly), while PER_ROW assembly grows with the list, which
+is the N+1 the query budgets guard against. allDoctors grows with the table (the 100
+seeded doctors, then 100 more), searchDoctors with its page size (at most 100).
+"""
+import asyncio
+import os
+
+import pytest
+
+from app.index_advisor import seed
+from app.schema import get_schema
+from app.services.doctor_services import AssemblyMode
+
+DOCTOR_FIELDS = """
+    id name mobileNumbers qualifications specializations
+    departments { id name } address { city } appointmentSettings { consultationCharge }
+    schedules { dayOfWeek startTime endTime }
+"""
+# name -> (document, variables for a list of `size` doctors, variables for an empty list)
+OPERATIONS = {
+    "allDoctors": (
+        f"query($s: String) {{ allDoctors(status: $s) {{ {DOCTOR_FIELDS} }} }}",
+        lambda size: {"s": None},
+        {"s": "nosuchstatus"},
+    ),
+    "allDoctors(live)": (
+        f"query($s: String) {{ allDoctors(status: $s, includeArchived: false) {{ {DOCTOR_FIELDS} }} }}",
+        lambda size: {"s": None},
+        {"s": "nosuchstatus"},
+    ),
+    "searchDoctors": (
+        f"""query($t: String, $n: Int!) {{
+            searchDoctors(text: $t, first: $n) {{ totalCount doctors {{ {DOCTOR_FIELDS} }} }}
+        }}""",
+        lambda size: {"t": None, "n": size // 2},
+        {"t": "nosuchdoctor", "n": 100},
+    ),
+}
+BATCHED_MODES = [AssemblyMode.BATCHED, AssemblyMode.JSON]
+
+
+def count_statements(database, mode, document, variables):
+    """Statements run by `document` under assembly `mode`, and the number of doctors listed"""
+    statements = []
+    listener = lambda query, rows: statements.append(query)
+    configured = os.environ.get("DOCTOR_ASSEMBLY_MODE")
+    os.environ["DOCTOR_ASSEMBLY_MODE"] = mode.value
+    database.statement_listeners.append(listener)
+    try:
+        result = asyncio.run(get_schema().execute(document, variable_values=variables))
+    finally:
+        database.statement_listeners.remove(listener)
+        if configured is None:
+            os.environ.pop("DOCTOR_ASSEMBLY_MODE", None)
+        else:
+            os.environ["DOCTOR_ASSEMBLY_MODE"] = configured
+    assert not result.errors, result.errors[0].message
+    (data,) = result.data.values()
+    return len(statements), len(data["doctors"] if isinstance(data, dict) else data)
+
+
+@pytest.fixture(scope="module")
+def measured(database):
+    """(statements, doctors listed) per (mode, operation): with 100 doctors, then with 200"""
+    def measure():
+        size = database.execute_one("SELECT COUNT(*) AS n FROM doctors")["n"]
+        return {
+            (mode, name): count_statements(database, mode, document, variables(size))
+            for mode in AssemblyMode for name, (document, variables, _) in OPERATIONS.items()
+        }
+
+    small = measure()
+    seed(100)
+    return small, measure()
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+@pytest.mark.parametrize("mode", BATCHED_MODES)
+def test_batched_lists_take_the_same_round_trips_at_both_sizes(measured, mode, operation):
+    small, large = measured
+    small_statements, small_doctors = small[mode, operation]
+    large_statements, large_doctors = large[mode, operation]
+
+    assert large_doctors == 2 * small_doctors >= 100
+    assert small_statements == large_statements
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+def test_per_row_lists_grow_with_the_list(measured, operation):
+    small, large = measured
+    small_statements, small_doctors = small[AssemblyMode.PER_ROW, operation]
+    large_statements, large_doctors = large[AssemblyMode.PER_ROW, operation]
+
+    assert large_statements >= small_statements + (large_doctors - small_doctors)
+    assert small_statements > small[AssemblyMode.BATCHED, operation][0]
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+@pytest.mark.parametrize("mode", BATCHED_MODES)
+def test_an_empty_list_takes_no_more_round_trips_than_a_full_one(database, measured, mode, operation):
+    _, large = measured
+    document, _, empty = OPERATIONS[operation]
+
+    statements, doctors = count_statements(database, mode, document, empty)
+
+    assert doctors == 0
+    assert statements <= large[mode, operation][0]
@@ -0,0 +1,43 @@
+"""
+Row mapping: execute_as and friends build records straight from the result tuples, with
+one generated factory per (class, columns) and a keyword fallback for column names that
+are not identifiers.
+"""
+from app.records import DepartmentRecord, ScheduleRecord
+from app.row_mapping import object_factory
+
+
+def test_execute_as_builds_one_record_per_row(database):
+    departments = database.execute_as(DepartmentRecord, "SELECT id, name, icon_name FROM departments ORDER BY id")
+    names = database.execute_column("SELECT name FROM departments ORDER BY id")
+
+    assert departments and all(isinstance(department, DepartmentRecord) for department in departments)
+    assert [department.name for department in departments] == names
+
+
+def test_keyed_rows_skip_the_grouping_column(database):
+    keyed = database.execute_keyed_as(ScheduleRecord, """
+        SELECT doctor_id, id, day_of_week, start_time::text AS start_time, end_time::text AS end_time, is_available
+        FROM schedules WHERE doctor_id IN (1, 2) ORDER BY doctor_id, id
+    """)
+
+    assert [doctor_id for doctor_id, _ in keyed] == [1] * 5 + [2] * 5
+    assert all(isinstance(schedule, ScheduleRecord) and schedule.day_of_week for _, schedule in keyed)
+
+
+def test_one_as_returns_none_without_a_row(database):
+    assert database.execute_one_as(DepartmentRecord, "SELECT id, name FROM departments WHERE id = -1") is None
+    assert database.execute_one_as(DepartmentRecord, "SELECT 7 AS id, 'Oncology' AS name") == DepartmentRecord(7, "Oncology")
+
+
+def test_the_factory_is_generated_once_per_class_and_columns():
+    columns = ("id", "name")
+
+    assert object_factory(DepartmentRecord, columns) is object_factory(DepartmentRecord, ("id", "name"))
+    assert object_factory(DepartmentRecord, columns)((3, "Surgery")) == DepartmentRecord(3, "Surgery")
+    assert object_factory(DepartmentRecord, ("doctor_id",) + columns, 1)((9, 3, "Surgery")) == DepartmentRecord(3, "Surgery")
+
+
+def test_columns_that_are_not_identifiers_fall_back_to_keywords(database):
+    assert database.execute_as(dict, 'SELECT 1 AS id, 2 AS "?column?"') == [{"id": 1, "?column?": 2}]
+    assert database.execute_as(dict, 'SELECT 1 AS id, 3 AS "class"') == [{"id": 1, "class": 3}]
@@ -0,0 +1,76 @@
+"""
+Schema registry: importing app.schema loads no resolver modules, get_schema() builds and
+validates the schema once per process, and every sync root resolver is moved off the
+event loop.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+import app.schema as registry
+from app.schema import get_schema
+from app.schema.extensions import ThreadedResolverExtension
+
+COLD_IMPORT = """
+import json, sys
+import app.schema
+loaded_before = sorted(name for name in sys.modules if name.startswith("app.schema."))
+from app.schema import schema
+print(json.dumps({
+    "before": loaded_before,
+    "same": schema is app.schema.get_schema(),
+    "after": "app.schema.queries.doctor_queries" in sys.modules,
+}))
+"""
+
+
+def test_importing_the_registry_is_cheap_and_the_schema_is_built_once():
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT], capture_output=True, text=True, check=True
+    ).stdout
+
+    report = json.loads(output.strip().splitlines()[-1])
+    assert report == {"before": [], "same": True, "after": True}
+
+
+def test_sync_root_resolvers_run_in_the_resolver_threads():
+    schema = get_schema()
+
+    for root in ("Query", "Mutation"):
+        fields = schema.get_type_by_name(root).fields
+        assert fields
+        for field in fields:
+            threaded = any(isinstance(extension, ThreadedResolverExtension) for extension in field.extensions)
+            assert threaded != field.is_async, field.name
+
+
+def test_a_rebuilt_schema_keeps_one_threaded_extension_per_field(graphql):
+    get_schema.__wrapped__()
+
+    for field in get_schema().get_type_by_name("Query").fields:
+        threaded = [extension for extension in field.extensions if isinstance(extension, ThreadedResolverExtension)]
+        assert len(threaded) == (0 if field.is_async else 1), field.name
+    assert not graphql("{ departments { id } }").errors
+
+
+def test_the_built_schema_answers_queries(graphql):
+    result = graphql("{ departments { id name } }")
+
+    assert not result.errors, result.errors[0].message
+    assert len(result.data["departments"]) >= 10
+
+
+def test_a_missing_resolver_class_fails_the_build(monkeypatch):
+    monkeypatch.setattr(registry, "QUERY_TYPES", registry.QUERY_TYPES + ("app.schema.queries.nope:NopeQuery",))
+
+    with pytest.raises(ModuleNotFoundError):
+        get_schema.__wrapped__()
+
+
+def test_the_legacy_modules_are_gone():
+    with pytest.raises(ModuleNotFoundError):
+        __import__("app.schema.helpers")
+    with pytest.raises(AttributeError):
+        registry.not_a_schema_attribute
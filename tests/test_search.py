@@ -0,0 +1,85 @@
+"""
+searchDoctors against the seeded database: prefix full-text matching over name,
+qualifications and specializations, facet counts and offset cursors.
+"""
+import pytest
+
+SEARCH = """
+    query($t: String, $f: DoctorFilterInput, $first: Int!, $after: String) {
+        searchDoctors(text: $t, filters: $f, first: $first, after: $after) {
+            totalCount endCursor hasNextPage
+            departments { value count }
+            cities { value count }
+            doctors { id name specializations }
+        }
+    }
+"""
+
+
+def search(graphql, text=None, filters=None, first=20, after=None):
+    result = graphql(SEARCH, {"t": text, "f": filters, "first": first, "after": after})
+    assert not result.errors, result.errors[0].message
+    return result.data["searchDoctors"]
+
+
+def test_prefix_search_matches_child_rows_and_counts_facets(graphql, database):
+    cardiologists = database.execute_column(
+        "SELECT doctor_id FROM specializations WHERE specialization = 'Cardiology' ORDER BY doctor_id"
+    )
+
+    found = search(graphql, "cardi", first=100)
+
+    assert found["totalCount"] == len(cardiologists)
+    assert sorted(int(doctor["id"]) for doctor in found["doctors"]) == cardiologists
+    assert all(doctor["specializations"] == ["Cardiology"] for doctor in found["doctors"])
+    # every matched doctor has one department and one address in the seed
+    assert sum(facet["count"] for facet in found["departments"]) == len(cardiologists)
+    assert sum(facet["count"] for facet in found["cities"]) == len(cardiologists)
+    assert not found["hasNextPage"]
+
+
+def test_name_and_filters_narrow_the_match(graphql, database):
+    sample = database.execute_one("""
+        SELECT d.id, d.name, dd.department_id, a.city FROM doctors d
+        JOIN doctor_departments dd ON dd.doctor_id = d.id JOIN addresses a ON a.doctor_id = d.id
+        ORDER BY d.id DESC LIMIT 1
+    """)
+
+    found = search(graphql, sample["name"], {"departmentId": sample["department_id"], "city": sample["city"]})
+
+    assert sample["id"] in [int(doctor["id"]) for doctor in found["doctors"]]
+    assert found["cities"] == [{"value": sample["city"], "count": found["totalCount"]}]
+
+
+def test_cursor_pages_do_not_overlap(graphql):
+    first_page = search(graphql, "mbbs", first=30)
+    second_page = search(graphql, "mbbs", first=30, after=first_page["endCursor"])
+
+    assert first_page["totalCount"] == 100 and first_page["hasNextPage"]
+    first_ids = {doctor["id"] for doctor in first_page["doctors"]}
+    second_ids = {doctor["id"] for doctor in second_page["doctors"]}
+    assert len(first_ids) == len(second_ids) == 30
+    assert not first_ids & second_ids
+
+
+def test_text_without_words_lists_every_doctor(graphql):
+    found = search(graphql, " ?! ", first=5)
+
+    assert found["totalCount"] == 100
+    assert len(found["doctors"]) == 5
+
+
+def test_unknown_word_finds_nothing(graphql):
+    found = search(graphql, "zzzunknown")
+
+    assert found == {
+        "totalCount": 0, "endCursor": None, "hasNextPage": False,
+        "departments": [], "cities": [], "doctors": [],
+    }
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "b2Zmc2V0Om5vcGU="])
+def test_invalid_cursor_is_an_error(graphql, cursor):
+    result = graphql(SEARCH, {"t": "mbbs", "first": 5, "after": cursor})
+
+    assert result.errors and result.errors[0].message == f"Invalid cursor: {cursor}"
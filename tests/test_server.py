@@ -0,0 +1,98 @@
+"""
+Server lifecycle: the lifespan handler opens this worker's pool and background tasks and,
+on shutdown, lets queued work finish before closing them; app.server picks gunicorn or
+uvicorn from APP_ENV.
+"""
+import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.main as main
+from app import server
+from app.health import HealthMonitor
+from app.media import image_processor
+from app.notifications import onboarding_listener
+
+
+def test_the_lifespan_opens_and_closes_the_worker_resources(database, monkeypatch):
+    executor = ThreadPoolExecutor(2)
+    monitor = HealthMonitor()
+    monkeypatch.setattr(main, "resolver_executor", executor)
+    monkeypatch.setattr(main, "health_monitor", monitor)
+    finished = []
+
+    async def resize():
+        await asyncio.sleep(0.1)
+        finished.append(True)
+
+    async def scenario():
+        async with main.lifespan(main.app):
+            pool = database.pool
+            assert pool is not None and pool.stats()["size"] >= 1
+            assert monitor.warmed and monitor.task is not None
+            assert onboarding_listener.connection is not None
+            assert await asyncio.to_thread(database.execute_one, "SELECT 1 AS one") == {"one": 1}
+            # an image still resizing when the server stops
+            task = asyncio.create_task(resize())
+            image_processor.tasks.add(task)
+            task.add_done_callback(image_processor.tasks.discard)
+        return pool
+
+    pool = asyncio.run(scenario())
+
+    assert finished == [True]
+    assert database.pool is None and pool.closed
+    assert monitor.task is None
+    assert onboarding_listener.connection is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+    # without a pool the shared connection serves the next caller
+    assert database.execute_one("SELECT 1 AS one") == {"one": 1}
+
+
+class Exec(Exception):
+    """Raised by the stand-in for os.execvp, which never returns"""
+
+
+def test_production_execs_gunicorn_with_the_preloading_config(monkeypatch):
+    def execvp(file, args):
+        raise Exec(args)
+
+    monkeypatch.setattr(server, "APP_ENV", "production")
+    monkeypatch.setattr(server, "MIGRATE_ON_START", False)
+    monkeypatch.setattr(server.os, "execvp", execvp)
+    monkeypatch.setattr(server.sys, "argv", ["app.server", "--workers", "2"])
+
+    with pytest.raises(Exec) as replaced:
+        server.main()
+
+    assert replaced.value.args[0] == ["gunicorn", "app.main:app", "--config", "python:app.gunicorn_conf", "--workers", "2"]
+
+
+def test_development_migrates_then_runs_uvicorn_with_reload(monkeypatch):
+    import uvicorn
+    from app import migrations
+
+    calls = []
+    monkeypatch.setattr(server, "APP_ENV", "development")
+    monkeypatch.setattr(server, "MIGRATE_ON_START", True)
+    monkeypatch.setattr(migrations, "migrate", lambda: calls.append("migrate"))
+    monkeypatch.setattr(uvicorn, "run", lambda app, **options: calls.append((app, options["reload"])))
+
+    server.main()
+
+    assert calls == ["migrate", ("app.main:app", True)]
+
+
+def test_gunicorn_preloads_and_sizes_workers_from_the_environment(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("PORT", "9000")
+    conf = importlib.import_module("app.gunicorn_conf")
+    conf = importlib.reload(conf)
+
+    assert conf.preload_app is True
+    assert conf.workers == 3
+    assert conf.bind.endswith(":9000")
+    assert conf.worker_class == "uvicorn.workers.UvicornWorker"
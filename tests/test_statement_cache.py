@@ -0,0 +1,92 @@
+"""
+Prepared statement cache on a connection of its own (the shared test connection runs
+with DB_PREPARED_STATEMENTS=0): queries are prepared once seen often enough, evicted
+least recently used first, dropped on invalidation and run unprepared when Postgres
+refuses them or has lost them.
+"""
+import pytest
+
+from app.database import Database
+
+DOCTOR_NAME = "SELECT name FROM doctors WHERE id = %s"
+
+
+@pytest.fixture
+def prepared(database):
+    fresh = Database()
+    fresh.database_url = database.database_url
+    fresh.prepare_statements = True
+    fresh.prepared_cache_size = 2
+    fresh.prepare_threshold = 2
+    yield fresh
+    fresh.close()
+
+
+def server_statements(prepared):
+    with prepared.connection.cursor() as cursor:
+        cursor.execute("SELECT statement FROM pg_prepared_statements ORDER BY statement")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def test_a_query_is_prepared_after_the_threshold(prepared):
+    assert prepared.execute_one(DOCTOR_NAME, (1,)) == {"name": "Doctor 1"}
+    assert server_statements(prepared) == []
+
+    assert prepared.execute_one(DOCTOR_NAME, (2,)) == {"name": "Doctor 2"}
+    assert prepared.execute_one(DOCTOR_NAME, (3,)) == {"name": "Doctor 3"}
+
+    assert len(server_statements(prepared)) == 1
+    assert "WHERE id = $1" in server_statements(prepared)[0]
+    stats = prepared.statement_cache_stats()
+    assert (stats["prepares"], stats["hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_literal_percent_signs_survive_preparing(prepared):
+    query = "SELECT COUNT(*) AS count FROM doctors WHERE name LIKE 'Doctor 1%%' AND id <= %s"
+
+    counts = [prepared.execute_one(query, (100,))["count"] for _ in range(3)]
+
+    assert counts == [12, 12, 12]
+    assert prepared.statement_cache_stats()["hits"] == 1
+
+
+def test_the_least_recently_used_statement_is_deallocated(prepared):
+    queries = [f"SELECT {number} + %s AS value" for number in range(3)]
+    for query in queries:
+        prepared.execute_one(query, (1,))
+        prepared.execute_one(query, (1,))
+
+    assert len(server_statements(prepared)) == 2
+    assert all("SELECT 0" not in statement for statement in server_statements(prepared))
+    assert prepared.statement_cache_stats()["evictions"] == 1
+
+
+def test_invalidation_deallocates_on_next_use(prepared):
+    prepared.execute_one(DOCTOR_NAME, (1,))
+    prepared.execute_one(DOCTOR_NAME, (1,))
+    prepared.invalidate_statement_cache()
+
+    assert prepared.execute_one(DOCTOR_NAME, (4,)) == {"name": "Doctor 4"}
+    assert server_statements(prepared) == []
+    assert prepared.statement_cache_stats()["invalidations"] == 1
+
+
+def test_statements_dropped_by_the_server_are_rerun_unprepared(prepared):
+    prepared.execute_one(DOCTOR_NAME, (1,))
+    prepared.execute_one(DOCTOR_NAME, (1,))
+    with prepared.connection.cursor() as cursor:
+        cursor.execute("DEALLOCATE ALL")
+
+    assert prepared.execute_one(DOCTOR_NAME, (5,)) == {"name": "Doctor 5"}
+    assert prepared.statement_cache_stats()["invalidations"] == 1
+
+
+def test_a_query_postgres_cannot_prepare_runs_unprepared(prepared):
+    # PREPARE only takes SELECT, INSERT, UPDATE, DELETE, MERGE and VALUES
+    query = "SHOW search_path"
+
+    results = [prepared.execute_one(query) for _ in range(3)]
+
+    assert results[0]["search_path"] and results == [results[0]] * 3
+    assert prepared.statement_cache_stats()["failures"] == 1
+    assert server_statements(prepared) == []
@@ -0,0 +1,87 @@
+"""
+doctorStats: GROUPING SETS counts from the live tables and from the doctor_stats_facts
+materialized view, which only the worker's doctor_stats.refresh job refreshes.
+"""
+import app.job_handlers  # noqa: F401  registers the handlers
+from app import jobs
+from app.services import stats_services
+
+STATS = """
+    query($f: DoctorFilterInput) {
+        doctorStats(filters: $f) {
+            total
+            byStatus { value count } byDepartment { value count }
+            byCity { value count } byStep { value count }
+        }
+    }
+"""
+
+
+def stats(graphql, filters=None):
+    result = graphql(STATS, {"f": filters})
+    assert not result.errors, result.errors[0].message
+    return result.data["doctorStats"]
+
+
+def counts(facets):
+    return {facet["value"]: facet["count"] for facet in facets}
+
+
+def test_every_grouping_set_adds_up_to_the_total(graphql, database):
+    expected_status = {
+        row["onboarding_status"]: row["count"] for row in database.execute_query(
+            "SELECT onboarding_status, COUNT(*) AS count FROM doctors GROUP BY onboarding_status"
+        )
+    }
+
+    result = stats(graphql)
+
+    assert result["total"] == 100
+    assert counts(result["byStatus"]) == expected_status
+    for facet in ("byDepartment", "byCity", "byStep"):
+        assert sum(counts(result[facet]).values()) == 100
+
+
+def test_filters_apply_to_every_grouping_set(graphql):
+    result = stats(graphql, {"city": "kochi", "status": "COMPLETED"})
+
+    assert result["total"] > 0
+    assert counts(result["byCity"]) == {"Kochi": result["total"]}
+    assert counts(result["byStatus"]) == {"completed": result["total"]}
+
+
+def test_filters_matching_nothing_give_empty_stats(graphql):
+    assert stats(graphql, {"city": "Atlantis"}) == {
+        "total": 0, "byStatus": [], "byDepartment": [], "byCity": [], "byStep": [],
+    }
+
+
+def test_materialized_stats_change_only_after_the_refresh_job(graphql, database, monkeypatch):
+    monkeypatch.setattr(stats_services, "STATS_SOURCE", "materialized")
+    jobs.enqueue("doctor_stats.refresh", dedupe_key="doctor_stats.refresh")
+    jobs.run_job(jobs.claim_job("test"))
+    before = stats(graphql)
+    database.execute_mutation("UPDATE doctors SET onboarding_status = 'completed' WHERE onboarding_status = 'in_progress'")
+
+    assert stats(graphql) == before
+
+    # a second refresh queued meanwhile is folded into the pending one
+    assert jobs.enqueue("doctor_stats.refresh", dedupe_key="doctor_stats.refresh")
+    assert jobs.enqueue("doctor_stats.refresh", dedupe_key="doctor_stats.refresh") is None
+    jobs.run_job(jobs.claim_job("test"))
+    refreshed = stats(graphql)
+    monkeypatch.setattr(stats_services, "STATS_SOURCE", "live")
+    assert refreshed == stats(graphql)
+    assert "in_progress" not in counts(refreshed["byStatus"])
+    assert database.execute_query("SELECT id FROM jobs") == []
+
+
+def test_refresh_is_a_periodic_worker_job_only_for_the_materialized_source():
+    import app.worker as worker
+    import app.main as main
+
+    assert "doctor_stats.refresh" in worker.PERIODIC_JOBS
+    assert worker.PERIODIC_JOBS["doctor_stats.refresh"] == (
+        stats_services.STATS_REFRESH_SECONDS if stats_services.STATS_SOURCE == "materialized" else 0
+    )
+    assert not hasattr(main, "refresh_doctor_stats")
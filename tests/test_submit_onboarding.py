@@ -0,0 +1,99 @@
+"""
+submitOnboarding: the doctor and every child row go in with one statement, together with
+the follow-up jobs; a duplicate or an unknown department leaves nothing behind.
+"""
+import pytest
+
+SUBMIT = """
+    mutation($input: OnboardingSubmissionInput!) {
+        submitOnboarding(input: $input) {
+            id name currentStep onboardingStatus qualifications specializations mobileNumbers
+            address { city } appointmentSettings { consultationCharge }
+            schedules { dayOfWeek startTime } departments { id }
+        }
+    }
+"""
+
+
+def submission(tag, **fields):
+    return {
+        "registerNo": f"SUBMIT-{tag}", "email": f"submit.{tag}@example.com", "mobileNumbers": ["9800000000"],
+        "name": f"Dr. {tag}", "bio": "Cardiologist", "qualifications": ["MBBS", "MD"],
+        "specializations": ["Cardiology"],
+        "address": {"country": "India", "state": "Kerala", "city": "Kochi", "pincode": "682001"},
+        "appointmentSettings": {
+            "consultationCharge": 600, "followUpCharge": 200, "followUpPeriodDays": 7,
+            "advanceBookingDays": 30, "avgDurationMinutes": 15,
+        },
+        "schedules": [{"dayOfWeek": 1, "startTime": "09:00", "endTime": "13:00"}],
+        "departmentIds": [1, 2], "profileImageUrl": "https://example.com/a.png",
+        **fields,
+    }
+
+
+@pytest.fixture
+def statements(database):
+    seen = []
+    listener = lambda query, rows: seen.append(query)
+    database.statement_listeners.append(listener)
+    yield seen
+    database.statement_listeners.remove(listener)
+
+
+def doctor_count(database):
+    return database.execute_one("SELECT COUNT(*) AS count FROM doctors")["count"]
+
+
+def test_a_complete_submission_is_one_insert(graphql, database, statements):
+    result = graphql(SUBMIT, {"input": submission("full")})
+
+    assert not result.errors, result.errors[0].message
+    doctor = result.data["submitOnboarding"]
+    assert doctor["currentStep"] == 8 and doctor["onboardingStatus"] == "COMPLETED"
+    assert doctor["qualifications"] == ["MBBS", "MD"] and doctor["mobileNumbers"] == ["9800000000"]
+    assert doctor["address"] == {"city": "Kochi"}
+    assert doctor["appointmentSettings"] == {"consultationCharge": 600}
+    assert doctor["schedules"] == [{"dayOfWeek": 1, "startTime": "09:00:00"}]
+    assert sorted(department["id"] for department in doctor["departments"]) == [1, 2]
+    inserts = [query for query in statements if "INSERT INTO" in query and "INSERT INTO jobs" not in query]
+    assert len(inserts) == 1
+    jobs = database.execute_column(
+        "SELECT kind FROM jobs WHERE (payload->>'doctor_id')::int = %s ORDER BY kind", (doctor["id"],)
+    )
+    assert jobs == ["onboarding.send_confirmation", "onboarding.verify_registration"]
+
+
+def test_a_partial_submission_stays_in_progress(graphql, database):
+    result = graphql(SUBMIT, {"input": {
+        "registerNo": "SUBMIT-partial", "email": "submit.partial@example.com", "mobileNumbers": [],
+        "name": "Dr. Partial", "complete": False,
+    }})
+
+    assert not result.errors, result.errors[0].message
+    doctor = result.data["submitOnboarding"]
+    assert doctor["currentStep"] == 2 and doctor["onboardingStatus"] == "IN_PROGRESS"
+    assert doctor["address"] is None and doctor["schedules"] == []
+    assert database.execute_query("SELECT id FROM jobs WHERE (payload->>'doctor_id')::int = %s", (doctor["id"],)) == []
+
+
+def test_a_duplicate_registration_is_rejected(graphql, database):
+    graphql(SUBMIT, {"input": submission("twice")})
+    before = doctor_count(database)
+
+    result = graphql(SUBMIT, {"input": submission("twice", registerNo="SUBMIT-other")})
+
+    assert result.errors and result.errors[0].message == "Doctor already registered"
+    assert doctor_count(database) == before
+
+
+def test_an_unknown_department_writes_nothing(graphql, database):
+    before = doctor_count(database)
+
+    result = graphql(SUBMIT, {"input": submission("baddept", departmentIds=[1, 99999])})
+
+    assert result.errors and result.errors[0].message == "Unknown department in departmentIds"
+    assert doctor_count(database) == before
+    assert database.execute_query("SELECT id FROM doctors WHERE register_no = 'SUBMIT-baddept'") == []
+    assert database.execute_query(
+        "SELECT doctor_id FROM doctor_mobile_numbers WHERE doctor_id NOT IN (SELECT id FROM doctors)"
+    ) == []
@@ -0,0 +1,86 @@
+"""
+onboardingProgress subscriptions: the doctors triggers NOTIFY on progress, the worker's
+single LISTEN connection fans the events out to the matching subscribers.
+"""
+import asyncio
+
+from app import notifications
+from app.notifications import onboarding_listener
+from app.schema import get_schema
+
+PROGRESS = """
+    subscription($id: Int) {
+        onboardingProgress(doctorId: $id) { doctorId currentStep onboardingStatus }
+    }
+"""
+
+
+async def listen(doctor_id, count: int):
+    """Run a subscription in its own task, as a websocket handler would; returns the first `count` events"""
+    async def consume():
+        events = await get_schema().subscribe(PROGRESS, variable_values={"id": doctor_id})
+        try:
+            return [await events.__anext__() for _ in range(count)]
+        finally:
+            await events.aclose()
+
+    task = asyncio.ensure_future(consume())
+    while not onboarding_listener.subscribers.get(doctor_id):
+        await asyncio.sleep(0.01)
+    return task
+
+
+async def write(database, query: str):
+    await asyncio.to_thread(database.execute_mutation, query)
+
+
+def test_subscribers_receive_only_their_doctors_progress(database):
+    async def scenario():
+        await onboarding_listener.start()
+        try:
+            for_one = await listen(3, 1)
+            for_all = await listen(None, 2)
+            await write(database, "UPDATE doctors SET current_step = 8 WHERE id = 4")
+            await write(database, "UPDATE doctors SET name = 'Not progress' WHERE id = 3")
+            await write(database, "UPDATE doctors SET current_step = 8, onboarding_status = 'completed' WHERE id = 3")
+            (for_one,), for_all = await asyncio.wait_for(asyncio.gather(for_one, for_all), 5)
+            return for_one, for_all
+        finally:
+            await onboarding_listener.stop()
+
+    database.execute_mutation("UPDATE doctors SET current_step = 1 WHERE id IN (3, 4)")
+    for_one, for_all = asyncio.run(scenario())
+
+    assert not for_one.errors
+    assert for_one.data == {"onboardingProgress": {"doctorId": 3, "currentStep": 8, "onboardingStatus": "COMPLETED"}}
+    assert [event.data["onboardingProgress"]["doctorId"] for event in for_all] == [4, 3]
+    assert onboarding_listener.subscribers == {}
+
+
+def test_malformed_payloads_are_skipped_and_slow_subscribers_drop_the_oldest(database, monkeypatch):
+    monkeypatch.setattr(notifications, "SUBSCRIBER_QUEUE_SIZE", 2)
+
+    async def scenario():
+        await onboarding_listener.start()
+        try:
+            stream = onboarding_listener.subscribe(9)
+            first = asyncio.ensure_future(stream.__anext__())
+            while not onboarding_listener.subscribers.get(9):
+                await asyncio.sleep(0.01)
+            await write(database, "SELECT pg_notify('onboarding_progress', 'not json')")
+            await write(database, "UPDATE doctors SET current_step = 2 WHERE id = 9")
+            received = [await asyncio.wait_for(first, 5)]
+
+            # published back to back while nobody reads: only the newest two are kept
+            for step in (3, 4, 5):
+                onboarding_listener._publish({"doctor_id": 9, "current_step": step, "onboarding_status": "in_progress"})
+            received += [await stream.__anext__(), await stream.__anext__()]
+            await stream.aclose()
+            return received
+        finally:
+            await onboarding_listener.stop()
+
+    database.execute_mutation("UPDATE doctors SET current_step = 1 WHERE id = 9")
+    received = asyncio.run(scenario())
+
+    assert [event["current_step"] for event in received] == [2, 4, 5]
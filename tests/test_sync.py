@@ -0,0 +1,94 @@
+"""
+Child list sync: qualifications and specializations keep the submitted order and
+duplicates through saves, submitOnboarding and an archive round trip; departments stay a
+set. Saving an unchanged list writes nothing.
+"""
+from app.services import ArchiveService, DoctorService
+
+UPDATE_QUALIFICATIONS = """
+    mutation($id: Int!, $q: [String!]!, $s: [String!]!) {
+        updateQualificationsAndBio(doctorId: $id, qualifications: $q, specializations: $s) {
+            qualifications specializations
+        }
+    }
+"""
+
+SUBMIT = """
+    mutation($input: OnboardingSubmissionInput!) {
+        submitOnboarding(input: $input) { id qualifications specializations departments { id } }
+    }
+"""
+
+DOCTOR = "query($id: Int!) { doctor(id: $id) { qualifications specializations } }"
+
+
+def qualifications(database, doctor_id):
+    return database.execute_column(
+        "SELECT qualification FROM qualifications WHERE doctor_id = %s ORDER BY position, id", (doctor_id,)
+    )
+
+
+def test_order_and_duplicates_are_kept(database):
+    assert DoctorService.sync_qualifications(1, ["PhD", "MBBS", "PhD", "MD"]) == 4
+
+    assert qualifications(database, 1) == ["PhD", "MBBS", "PhD", "MD"]
+
+
+def test_saving_the_same_list_changes_nothing(database):
+    DoctorService.sync_qualifications(2, ["MD", "MBBS"])
+    ids = database.execute_column("SELECT id FROM qualifications WHERE doctor_id = 2 ORDER BY id")
+
+    assert DoctorService.sync_qualifications(2, ["MD", "MBBS"]) == 0
+    assert database.execute_column("SELECT id FROM qualifications WHERE doctor_id = 2 ORDER BY id") == ids
+
+
+def test_a_reorder_only_moves_rows(database):
+    DoctorService.sync_qualifications(3, ["MBBS", "MD", "DM"])
+    ids = database.execute_column("SELECT id FROM qualifications WHERE doctor_id = 3 ORDER BY id")
+
+    assert DoctorService.sync_qualifications(3, ["DM", "MBBS", "MD"]) == 3
+    assert qualifications(database, 3) == ["DM", "MBBS", "MD"]
+    assert database.execute_column("SELECT id FROM qualifications WHERE doctor_id = 3 ORDER BY id") == ids
+
+
+def test_an_empty_list_clears_the_rows(database):
+    assert DoctorService.sync_specializations(4, []) == 1
+
+    assert database.execute_column("SELECT id FROM specializations WHERE doctor_id = 4") == []
+
+
+def test_departments_are_a_set(database):
+    DoctorService.sync_departments(5, [1, 2])
+
+    assert DoctorService.sync_departments(5, [2, 2, 1]) == 0
+    assert DoctorService.sync_departments(5, [3]) == 3
+    assert database.execute_column("SELECT department_id FROM doctor_departments WHERE doctor_id = 5") == [3]
+
+
+def test_the_mutation_returns_the_submitted_order(graphql):
+    result = graphql(UPDATE_QUALIFICATIONS, {"id": 6, "q": ["MD", "MBBS", "MD"], "s": ["Surgery", "Cardiology"]})
+
+    assert not result.errors, result.errors[0].message
+    assert result.data["updateQualificationsAndBio"] == {
+        "qualifications": ["MD", "MBBS", "MD"], "specializations": ["Surgery", "Cardiology"],
+    }
+
+
+def test_submission_and_archive_round_trip_keep_the_order(graphql, database):
+    result = graphql(SUBMIT, {"input": {
+        "registerNo": "SYNC-ORDER-1", "email": "sync.order@example.com", "mobileNumbers": ["9000000001"],
+        "name": "Dr. Order", "qualifications": ["MS", "MBBS", "MS"],
+        "specializations": ["Surgery", "Neurology"], "departmentIds": [2, 1, 2],
+    }})
+    assert not result.errors, result.errors[0].message
+    submitted = result.data["submitOnboarding"]
+    doctor_id = int(submitted["id"])
+    assert submitted["qualifications"] == ["MS", "MBBS", "MS"]
+    assert sorted(department["id"] for department in submitted["departments"]) == [1, 2]
+
+    ArchiveService.archive_completed(older_than_days=-1)
+    assert graphql(DOCTOR, {"id": doctor_id}).data["doctor"] == {
+        "qualifications": ["MS", "MBBS", "MS"], "specializations": ["Surgery", "Neurology"],
+    }
+    assert ArchiveService.restore(doctor_id)
+    assert qualifications(database, doctor_id) == ["MS", "MBBS", "MS"]
@@ -0,0 +1,81 @@
+"""
+updateAddress and updateAppointmentSettings: one INSERT .. ON CONFLICT per save, so
+repeated saves keep a single row per doctor with the latest values, and a doctor that
+does not exist is reported without writing anything.
+"""
+import pytest
+
+UPDATE_ADDRESS = """
+    mutation($id: Int!, $address: AddressInput!) {
+        updateAddress(doctorId: $id, addressInput: $address) { currentStep address { city pincode } }
+    }
+"""
+
+UPDATE_SETTINGS = """
+    mutation($id: Int!, $settings: AppointmentSettingsInput!) {
+        updateAppointmentSettings(doctorId: $id, settings: $settings) {
+            currentStep appointmentSettings { consultationCharge avgDurationMinutes }
+        }
+    }
+"""
+
+
+def address(city, pincode):
+    return {"country": "India", "state": "Kerala", "city": city, "pincode": pincode}
+
+
+def settings(charge, minutes):
+    return {
+        "consultationCharge": charge, "followUpCharge": 100, "followUpPeriodDays": 7,
+        "advanceBookingDays": 30, "avgDurationMinutes": minutes,
+    }
+
+
+def mutate(graphql, document, variables):
+    result = graphql(document, variables)
+    assert not result.errors, result.errors[0].message
+    return result.data
+
+
+def test_saving_the_address_twice_keeps_one_row(graphql, database):
+    database.execute_mutation("DELETE FROM addresses WHERE doctor_id = 1")
+    database.execute_mutation("UPDATE doctors SET current_step = 1 WHERE id = 1")
+
+    mutate(graphql, UPDATE_ADDRESS, {"id": 1, "address": address("Kochi", "682001")})
+    saved = mutate(graphql, UPDATE_ADDRESS, {"id": 1, "address": address("Pune", "411001")})
+
+    assert saved["updateAddress"] == {"currentStep": 4, "address": {"city": "Pune", "pincode": "411001"}}
+    assert database.execute_column("SELECT city FROM addresses WHERE doctor_id = 1") == ["Pune"]
+
+
+def test_saving_the_settings_twice_keeps_one_row(graphql, database):
+    mutate(graphql, UPDATE_SETTINGS, {"id": 2, "settings": settings(500, 15)})
+    saved = mutate(graphql, UPDATE_SETTINGS, {"id": 2, "settings": settings(800, 20)})
+
+    assert saved["updateAppointmentSettings"]["appointmentSettings"] == {
+        "consultationCharge": 800, "avgDurationMinutes": 20,
+    }
+    assert saved["updateAppointmentSettings"]["currentStep"] >= 5
+    assert database.execute_column(
+        "SELECT consultation_charge FROM appointment_settings WHERE doctor_id = 2"
+    ) == [800]
+
+
+def test_a_later_save_does_not_move_the_step_back(graphql, database):
+    database.execute_mutation("UPDATE doctors SET current_step = 8 WHERE id = 3")
+
+    saved = mutate(graphql, UPDATE_ADDRESS, {"id": 3, "address": address("Delhi", "110001")})
+
+    assert saved["updateAddress"]["currentStep"] == 8
+
+
+@pytest.mark.parametrize("document, variables", [
+    (UPDATE_ADDRESS, {"address": address("Kochi", "682001")}),
+    (UPDATE_SETTINGS, {"settings": settings(500, 15)}),
+])
+def test_an_unknown_doctor_is_not_found(graphql, database, document, variables):
+    result = graphql(document, {"id": 9999, **variables})
+
+    assert result.errors and result.errors[0].message == "Doctor 9999 not found"
+    assert database.execute_query("SELECT doctor_id FROM addresses WHERE doctor_id = 9999") == []
+    assert database.execute_query("SELECT doctor_id FROM appointment_settings WHERE doctor_id = 9999") == []